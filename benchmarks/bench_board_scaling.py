@@ -0,0 +1,120 @@
+"""盤面サイズに対するエンジン・罠判定・描画コストの伸びを計測するベンチマーク
+
+使い方（リポジトリのルートで実行）:
+    python benchmarks/bench_board_scaling.py > bench_output.txt
+
+各コストを最小盤面との比で表示する。盤面の面積の伸びより十分小さければよい。
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "pcrb"))
+
+import matplotlib
+
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+
+from controller import GameController
+from draw import draw_board_v2
+from robot import Robot
+
+BOARD_SIZES = [(9, 7), (25, 25), (50, 50), (100, 100), (200, 200), (400, 400)]
+
+
+def chaser_logic(robot, game_info, memos):
+    """敵に近づいて攻撃するだけのロジック"""
+    enemy_x, enemy_y = game_info['enemy_position']
+    if robot.sp < 20:
+        return "rest"
+    if abs(robot.x - enemy_x) + abs(robot.y - enemy_y) == 1:
+        return "attack"
+    if robot.x != enemy_x:
+        return "right" if robot.x < enemy_x else "left"
+    return "down" if robot.y < enemy_y else "up"
+
+
+def create_controller(x_max, y_max, max_turn):
+    controller = GameController(
+        max_turn=max_turn, x_max=x_max, y_max=y_max,
+        verbose=False, log_path=None, game_state_path=None)
+    position1 = controller.robot1_initial_position
+    position2 = controller.robot2_initial_position
+    robot1 = Robot("Robot A", position1['x'], position1['y'], chaser_logic, controller)
+    robot2 = Robot("Robot B", position2['x'], position2['y'], chaser_logic, controller)
+    controller.set_robots(robot1, robot2)
+    return controller
+
+
+def bench_engine(x_max, y_max, max_turn):
+    """1 ターンあたりの時間 [us]（コントローラの生成も含む）"""
+    start = time.perf_counter()
+    controller = create_controller(x_max, y_max, max_turn)
+    controller.game_loop()
+    elapsed = time.perf_counter() - start
+    return elapsed / max(controller.turn, 1) * 1e6
+
+
+def bench_trap_lookup(x_max, y_max, n_lookups):
+    """盤面の半分に罠を置いた状態での 1 回あたりの罠判定時間 [us]"""
+    controller = create_controller(x_max, y_max, 1)
+    robot1 = controller.robot1
+    for index in range(0, x_max * y_max, 2):
+        position = (index % x_max, index // x_max)
+        if not controller.is_position_occupied(*position):
+            robot1.trap.place(position)
+
+    cells = [(i % x_max, (i * 7) % y_max) for i in range(1024)]
+    start = time.perf_counter()
+    for i in range(n_lookups):
+        controller.is_trap_at_position(*cells[i & 1023])
+    elapsed = time.perf_counter() - start
+    return elapsed / n_lookups * 1e6
+
+
+def bench_render(x_max, y_max):
+    """1 フレームの描画時間 [ms]"""
+    controller = create_controller(x_max, y_max, 1)
+    controller.save_game_state(controller.robot1.name, "attack")
+    turn_data = controller.game_state[-1]
+
+    start = time.perf_counter()
+    fig = draw_board_v2(turn_data, x_max, y_max, is_show=False)
+    fig.canvas.draw()
+    elapsed = time.perf_counter() - start
+    plt.close(fig)
+    return elapsed * 1e3
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--max-turn", type=int, default=2000)
+    parser.add_argument("--lookups", type=int, default=200000)
+    parser.add_argument("--skip-render", action="store_true")
+    args = parser.parse_args()
+
+    bench_render(9, 7)  # スプライト読み込みなどのウォームアップ
+
+    rows = []
+    for x_max, y_max in BOARD_SIZES:
+        engine = bench_engine(x_max, y_max, args.max_turn)
+        trap = bench_trap_lookup(x_max, y_max, args.lookups)
+        render = None if args.skip_render else bench_render(x_max, y_max)
+        rows.append((x_max, y_max, engine, trap, render))
+
+    base_area = rows[0][0] * rows[0][1]
+    base = rows[0]
+    print(f"{'board':>9} {'area x':>8} {'engine us/turn':>16} {'trap us/lookup':>16} {'render ms':>14}")
+    for x_max, y_max, engine, trap, render in rows:
+        area_ratio = x_max * y_max / base_area
+        render_text = "-" if render is None else f"{render:8.1f} ({render / base[4]:4.1f}x)"
+        print(f"{x_max:>4}x{y_max:<4} {area_ratio:8.0f} "
+              f"{engine:9.2f} ({engine / base[2]:4.1f}x) "
+              f"{trap:9.3f} ({trap / base[3]:4.1f}x) "
+              f"{render_text:>14}")
+
+
+if __name__ == "__main__":
+    main()
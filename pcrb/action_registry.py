@@ -0,0 +1,176 @@
+"""行動名 → (行動コード, ハンドラ) の対応表
+
+GameController.run_logic はこの表を引いて行動を実行する。
+プラグインは ``register_action`` で新しい行動を追加できる。
+
+ハンドラは ``handler(robot, enemy, action, turn)`` の形で呼ばれる。
+``target`` を指定した行動では、enemy はその範囲にいる敵から選ばれる。
+"""
+import enum
+import sys
+
+
+class ActionCode(enum.IntEnum):
+    REST = 0
+    ATTACK = 1
+    DEFEND = 2
+    UP = 3
+    DOWN = 4
+    LEFT = 5
+    RIGHT = 6
+    RANGED_ATTACK = 7
+    PARRY = 8
+    TRAP_UP = 9
+    TRAP_DOWN = 10
+    TRAP_LEFT = 11
+    TRAP_RIGHT = 12
+    STEAL = 13
+    TELEPORT = 14
+    CAMOUFLAGE = 15
+    SCAN = 16
+
+
+# 行動の対象の選び方
+TARGET_ADJACENT = "adjacent"  # 隣接している敵
+TARGET_RANGED = "ranged"      # 距離 2 にいる敵
+
+
+class ActionSpec:
+    __slots__ = ("name", "code", "handler", "target")
+
+    def __init__(self, name, code, handler, target=None):
+        self.name = name
+        self.code = code
+        self.handler = handler
+        self.target = target
+
+    def __repr__(self):
+        return f"ActionSpec(name={self.name!r}, code={int(self.code)})"
+
+
+class ActionRegistry:
+    def __init__(self):
+        self._specs = {}    # 行動名 → ActionSpec
+        self._by_code = {}  # 行動コード → ActionSpec
+
+    def register(self, name, handler, code=None, target=None):
+        """行動を登録する。code を省略すると未使用の番号を割り当てる。
+
+        :param target: 対象の選び方 (TARGET_ADJACENT / TARGET_RANGED / None)
+        """
+        if not isinstance(name, str):
+            raise TypeError(f"Action name must be a string: {name!r}")
+        if name in self._specs:
+            raise ValueError(f"Action '{name}' is already registered.")
+        if code is None:
+            code = max(self._by_code, default=-1) + 1
+        elif code in self._by_code:
+            raise ValueError(f"Action code {int(code)} is already used by '{self._by_code[code].name}'.")
+
+        spec = ActionSpec(sys.intern(name), code, handler, target)
+        self._specs[spec.name] = spec
+        self._by_code[code] = spec
+        return spec
+
+    def unregister(self, name):
+        spec = self._specs.pop(name)
+        del self._by_code[spec.code]
+
+    def get(self, name):
+        """行動名に対応する ActionSpec を返す（未登録なら None）"""
+        return self._specs.get(name)
+
+    def by_code(self, code):
+        return self._by_code.get(code)
+
+    def names(self):
+        return list(self._specs)
+
+    def copy(self):
+        registry = ActionRegistry()
+        registry._specs = dict(self._specs)
+        registry._by_code = dict(self._by_code)
+        return registry
+
+    def __contains__(self, name):
+        return name in self._specs
+
+    def __len__(self):
+        return len(self._specs)
+
+
+# ----------------------------- 標準の行動 -----------------------------
+
+def _rest(robot, enemy, action, turn):
+    robot.rest(turn)
+
+
+def _attack(robot, enemy, action, turn):
+    robot.attack(enemy, turn)
+
+
+def _defend(robot, enemy, action, turn):
+    robot.defend(turn)
+
+
+def _move(robot, enemy, action, turn):
+    robot.move(action, turn)
+
+
+def _ranged_attack(robot, enemy, action, turn):
+    robot.ranged_attack(enemy, turn)
+
+
+def _parry(robot, enemy, action, turn):
+    robot.parry(turn)
+
+
+def _trap(robot, enemy, action, turn):
+    robot.trap(action, turn)
+
+
+def _steal(robot, enemy, action, turn):
+    robot.steal(enemy, turn)
+
+
+def _teleport(robot, enemy, action, turn):
+    robot.teleport(turn)
+
+
+def _camouflage(robot, enemy, action, turn):
+    robot.camouflage(turn)
+
+
+def _scan(robot, enemy, action, turn):
+    robot.scan(turn)
+
+
+def build_default_registry():
+    registry = ActionRegistry()
+    registry.register("rest", _rest, ActionCode.REST)
+    registry.register("attack", _attack, ActionCode.ATTACK, TARGET_ADJACENT)
+    registry.register("defend", _defend, ActionCode.DEFEND)
+    registry.register("up", _move, ActionCode.UP)
+    registry.register("down", _move, ActionCode.DOWN)
+    registry.register("left", _move, ActionCode.LEFT)
+    registry.register("right", _move, ActionCode.RIGHT)
+    registry.register("ranged_attack", _ranged_attack, ActionCode.RANGED_ATTACK, TARGET_RANGED)
+    registry.register("parry", _parry, ActionCode.PARRY)
+    registry.register("trap_up", _trap, ActionCode.TRAP_UP)
+    registry.register("trap_down", _trap, ActionCode.TRAP_DOWN)
+    registry.register("trap_left", _trap, ActionCode.TRAP_LEFT)
+    registry.register("trap_right", _trap, ActionCode.TRAP_RIGHT)
+    registry.register("steal", _steal, ActionCode.STEAL, TARGET_ADJACENT)
+    registry.register("teleport", _teleport, ActionCode.TELEPORT)
+    registry.register("camouflage", _camouflage, ActionCode.CAMOUFLAGE)
+    registry.register("scan", _scan, ActionCode.SCAN)
+    return registry
+
+
+# GameController が既定で参照する表
+ACTION_REGISTRY = build_default_registry()
+
+
+def register_action(name, handler, code=None, target=None):
+    """既定の表に行動を追加する（プラグイン用）"""
+    return ACTION_REGISTRY.register(name, handler, code, target)
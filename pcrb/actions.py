@@ -1,10 +1,33 @@
 from abc import ABC
 from abc import abstractmethod
 
+from board import TrapView
+from events import EventCode
+from robot_state import CAMOUFLAGE_ACTIVE
+from robot_state import CAMOUFLAGE_LAST_POSITION
+from robot_state import CAMOUFLAGE_REMAINING
+from robot_state import DEFEND_ACTIVE
+from robot_state import PARRY_ACTIVE
+from robot_state import PARRY_COOLDOWN
+from robot_state import SCAN_ACTIVE
+from robot_state import SCAN_REMAINING
 from utils import is_adjacent
 
 
+def _state_field(index, doc=None):
+    """actor の状態配列の 1 要素を属性として見せるプロパティを作る"""
+    def getter(self):
+        return self.actor._state[index]
+
+    def setter(self, value):
+        self.actor._state[index] = value
+
+    return property(getter, setter, doc=doc)
+
+
 class Action(ABC):
+    __slots__ = ("actor", "controller")
+
     def __init__(self, actor, controller, **kwargs):
         super().__init__()
         self.actor = actor
@@ -17,6 +40,8 @@ class Action(ABC):
 
 
 class Attack(Action):
+    __slots__ = ()
+
     power = 20
     cost = 10
 
@@ -31,14 +56,16 @@ class Attack(Action):
                 else:
                     damage = target.receive_attack(self.power)
                     self.actor.use_sp(self.cost)
-                    self.controller.log_action(turn, f"{self.actor.name} attacks {target.name} at ({target.x}, {target.y}) for {damage} damage.")
+                    self.controller.emit(turn, EventCode.ATTACK, self.actor.name, target.name, target.x, target.y, damage)
             else:
-                self.controller.log_action(turn, f"{self.actor.name} tried to attack a non-adjacent location.")
+                self.controller.emit(turn, EventCode.ATTACK_OUT_OF_RANGE, self.actor.name)
         else:
-            self.controller.log_action(turn, f"{self.actor.name} does not have enough SP to attack!")
+            self.controller.emit(turn, EventCode.ATTACK_NO_SP, self.actor.name)
 
 
 class Move(Action):
+    __slots__ = ()
+
     cost = 5
 
     def __init__(self, actor, controller):
@@ -46,54 +73,53 @@ class Move(Action):
 
     def __call__(self, direction, turn):
         if self.actor.sp < self.cost:
-            self.controller.log_action(turn, f"{self.actor.name} does not have enough SP to move!")
+            self.controller.emit(turn, EventCode.MOVE_NO_SP, self.actor.name)
             return
 
         # 移動先の座標を計算
-        if direction == "up":
-            new_x, new_y = self.actor.x, max(0, self.actor.y - 1)
-        elif direction == "down":
-            new_x, new_y = self.actor.x, min(self.controller.y_max - 1, self.actor.y + 1)
-        elif direction == "left":
-            new_x, new_y = max(0, self.actor.x - 1), self.actor.y
-        elif direction == "right":
-            new_x, new_y = min(self.controller.x_max - 1, self.actor.x + 1), self.actor.y
-        else:
-            self.controller.log_action(turn, f"{self.actor.name} tried to move in an invalid direction.")
+        board = self.controller.board
+        offset = board.move_offsets.get(direction)
+        if offset is None:
+            self.controller.emit(turn, EventCode.MOVE_INVALID_DIRECTION, self.actor.name)
             return
+        new_x, new_y = board.destination(self.actor.x, self.actor.y, offset)
 
         # 移動先に他のロボットがいないかチェック
         if self.controller.is_position_occupied(new_x, new_y):
-            self.controller.log_action(
-                turn, f"{self.actor.name} tried to move to ({new_x}, {new_y}), but the path is blocked.")
+            self.controller.emit(turn, EventCode.MOVE_BLOCKED, self.actor.name, new_x, new_y)
         else:
             self.actor.set_position(new_x, new_y)
             self.actor.use_sp(self.cost)
-            self.controller.log_action(
-                turn, f"{self.actor.name} moved {direction} to ({self.actor.x}, {self.actor.y}), HP: {self.actor.hp}, SP: {self.actor.sp}")
+            self.controller.emit(
+                turn, EventCode.MOVE, self.actor.name, direction, self.actor.x, self.actor.y, self.actor.hp, self.actor.sp)
 
 
 class Defend(Action):
+    __slots__ = ()
+
     reduction = 0.5  # 防御中のダメージ軽減率
     cost = 10  # 防御のコスト
 
+    is_active = _state_field(DEFEND_ACTIVE, "防御中かどうか")
+
     def __init__(self, actor, controller):
         super().__init__(actor, controller)
-        self.is_active = False
 
     def __call__(self, turn):
         if self.actor.sp >= self.cost:
             self.actor.use_sp(self.cost)
             self.is_active = True
-            self.controller.log_action(turn, f"{self.actor.name} is now in defense mode, reducing incoming damage.")
+            self.controller.emit(turn, EventCode.DEFEND, self.actor.name)
         else:
-            self.controller.log_action(turn, f"{self.actor.name} does not have enough SP to defend!")
+            self.controller.emit(turn, EventCode.DEFEND_NO_SP, self.actor.name)
 
     def update(self):
         self.is_active = False
 
 
 class RangedAttack(Action):
+    __slots__ = ()
+
     cost = 15  # 遠距離攻撃のコスト
     power = 15  # 遠距離攻撃の威力
 
@@ -106,35 +132,35 @@ class RangedAttack(Action):
             if self.actor.sp >= self.cost:
                 self.actor.use_sp(self.cost)
                 damage = target.receive_attack(self.power)
-                self.controller.log_action(
-                    turn, f"{self.actor.name} performs a ranged attack on {target.name} for {damage} damage!")
+                self.controller.emit(turn, EventCode.RANGED_ATTACK, self.actor.name, target.name, damage)
             else:
-                self.controller.log_action(
-                    turn, f"{self.actor.name} does not have enough SP to perform a ranged attack!")
+                self.controller.emit(turn, EventCode.RANGED_ATTACK_NO_SP, self.actor.name)
         else:
-            self.controller.log_action(
-                turn, f"{self.actor.name} cannot perform a ranged attack on {target.name} due to incorrect distance (distance: {distance}).")
+            self.controller.emit(turn, EventCode.RANGED_ATTACK_OUT_OF_RANGE, self.actor.name, target.name, distance)
 
 
 class Parry(Action):
+    __slots__ = ()
+
     cooldown_duration = 2  # クールタイムの初期値(何ターン後に使えるか)
     cost = 15  # パリィのコスト
 
+    is_active = _state_field(PARRY_ACTIVE, "パリィ中かどうか")
+    cooldown_counter = _state_field(PARRY_COOLDOWN, "パリィのクールタイム")
+
     def __init__(self, actor, controller):
         super().__init__(actor, controller)
-        self.is_active = False  # パリィ中かどうか
-        self.cooldown_counter = 0  # パリィのクールタイム
 
     def __call__(self, turn):
         if self.actor.sp >= self.cost and not self.is_active and self.cooldown_counter == 0:
             self.is_active = True
             self.actor.use_sp(self.cost)
             self.cooldown_counter = self.cooldown_duration
-            self.controller.log_action(turn, f"{self.actor.name} started parrying!")
+            self.controller.emit(turn, EventCode.PARRY, self.actor.name)
         elif self.cooldown_counter > 0:
-            self.controller.log_action(turn, f"{self.actor.name}'s parry is on cooldown.")
+            self.controller.emit(turn, EventCode.PARRY_COOLDOWN, self.actor.name)
         else:
-            self.controller.log_action(turn, f"{self.actor.name} doesn't have enough SP.")
+            self.controller.emit(turn, EventCode.PARRY_NO_SP, self.actor.name)
 
     def update(self, is_active=False, is_cooldown=False):
         if is_active:
@@ -147,6 +173,8 @@ class Parry(Action):
 
 
 class Rest(Action):
+    __slots__ = ()
+
     recovery_value = 15
 
     def __init__(self, actor, controller):
@@ -154,59 +182,105 @@ class Rest(Action):
 
     def __call__(self, turn):
         self.actor.recovery_sp(self.recovery_value)
-        self.controller.log_action(turn, f"{self.actor.name} rests and recovers {self.recovery_value} SP. Total SP: {self.actor.sp}")
+        self.controller.emit(turn, EventCode.REST, self.actor.name, self.recovery_value, self.actor.sp)
 
 
 class Trap(Action):
+    __slots__ = ("_positions", "_view")
+
     cost = 15  # 罠設置のコスト
     damage = 25  # 罠のダメージ
 
     def __init__(self, actor, controller):
         super().__init__(actor, controller)
-        self.traps = []  # 設置された罠のリスト
+        self._positions = {}  # 設置された罠の座標（設置順）
+        self._view = None  # traps のスナップショット（変更時に破棄）
+
+    @property
+    def traps(self):
+        """設置された罠の座標リスト（読み取り専用のスナップショット）"""
+        if self._view is None:
+            self._view = TrapView(self._positions)
+        return self._view
 
     def __call__(self, direction, turn):
         if self.actor.sp < self.cost:
-            self.controller.log_action(turn, f"{self.actor.name} does not have enough SP to set a trap!")
+            self.controller.emit(turn, EventCode.TRAP_NO_SP, self.actor.name)
             return
 
         # 罠を設置する位置を計算
-        if direction == "trap_up":
-            position = (self.actor.x, max(0, self.actor.y - 1))
-        elif direction == "trap_down":
-            position = (self.actor.x, min(self.controller.y_max - 1, self.actor.y + 1))
-        elif direction == "trap_left":
-            position = (max(0, self.actor.x - 1), self.actor.y)
-        elif direction == "trap_right":
-            position = (min(self.controller.x_max - 1, self.actor.x + 1), self.actor.y)
-        else:
-            self.controller.log_action(turn, f"{self.actor.name} tried to set a trap in an invalid direction.")
+        board = self.controller.board
+        offset = board.trap_offsets.get(direction)
+        if offset is None:
+            self.controller.emit(turn, EventCode.TRAP_INVALID_DIRECTION, self.actor.name)
             return
+        position = board.destination(self.actor.x, self.actor.y, offset)
 
         # 設置先に他のロボットがいないかチェック
         if self.controller.is_position_occupied(*position):
-            self.controller.log_action(turn, f"{self.actor.name} tried to set a trap at {position}, but the position is occupied.")
+            self.controller.emit(turn, EventCode.TRAP_OCCUPIED, self.actor.name, position)
             return
 
         # 設置先にトラップがないかチェック（自分または相手のトラップ）
         if self.controller.is_trap_at_position(*position):
-            self.controller.log_action(turn, f"{self.actor.name} tried to set a trap at {position}, but a trap is already there.")
+            self.controller.emit(turn, EventCode.TRAP_EXISTS, self.actor.name, position)
             return
 
         # 罠を設置
         self.actor.use_sp(self.cost)
-        self.traps.append(position)
-        self.controller.log_action(turn, f"{self.actor.name} set a trap at {position}.")
+        self.place(position)
+        self.controller.emit(turn, EventCode.TRAP, self.actor.name, position)
+
+    def place(self, position):
+        """罠を (x, y) に置く（盤面の罠グリッドと状態ハッシュにも反映）"""
+        self._positions[position] = None
+        self._view = None
+        if self.actor._board_id:
+            self.controller.board.set_trap(self.actor._board_id, *position)
+            if self.controller.zobrist is not None:
+                self.controller.zobrist.toggle_trap(self.actor._board_id, position)
+
+    def remove(self, position):
+        del self._positions[position]
+        self._view = None
+        if self.actor._board_id:
+            self.controller.board.remove_trap(*position)
+            if self.controller.zobrist is not None:
+                self.controller.zobrist.toggle_trap(self.actor._board_id, position)
+
+    def clear(self):
+        if self.actor._board_id:
+            zobrist = self.controller.zobrist
+            for position in self._positions:
+                self.controller.board.remove_trap(*position)
+                if zobrist is not None:
+                    zobrist.toggle_trap(self.actor._board_id, position)
+        self._positions.clear()
+        self._view = None
+
+    def snapshot(self):
+        """罠の座標を設置順のタプルで返す"""
+        return tuple(self._positions)
+
+    def restore(self, positions):
+        """snapshot() の値に罠を戻す"""
+        if tuple(self._positions) == positions:
+            return
+        self.clear()
+        for position in positions:
+            self.place(position)
 
     def check_trap(self, target):
         """敵が罠にかかったかを確認し、ダメージを与える"""
-        if target.position in self.traps:
-            self.traps.remove(target.position)
+        if target.position in self._positions:
+            self.remove(target.position)
             damage = target.receive_attack(self.damage)
-            self.controller.log_action(self.controller.turn, f"{target.name} stepped on a trap and took {damage} damage!")
+            self.controller.emit(self.controller.turn, EventCode.TRAP_TRIGGERED, target.name, damage)
 
 
 class Steal(Action):
+    __slots__ = ()
+
     cost = 10  # スタミナを盗む行動のコスト
     steal_amount = 15  # 奪うスタミナの量
 
@@ -215,7 +289,7 @@ class Steal(Action):
 
     def __call__(self, target, turn):
         if self.actor.sp < self.cost:
-            self.controller.log_action(turn, f"{self.actor.name} does not have enough SP to steal!")
+            self.controller.emit(turn, EventCode.STEAL_NO_SP, self.actor.name)
             return
 
         if is_adjacent(self.actor, target):
@@ -224,15 +298,16 @@ class Steal(Action):
                 target.use_sp(stolen_sp)
                 self.actor.recovery_sp(stolen_sp)
                 self.actor.use_sp(self.cost)
-                self.controller.log_action(
-                    turn, f"{self.actor.name} steals {stolen_sp} SP from {target.name}.")
+                self.controller.emit(turn, EventCode.STEAL, self.actor.name, stolen_sp, target.name)
             else:
-                self.controller.log_action(turn, f"{target.name} has no SP to steal!")
+                self.controller.emit(turn, EventCode.STEAL_NOTHING, self.actor.name, target.name)
         else:
-            self.controller.log_action(turn, f"{self.actor.name} tried to steal from a non-adjacent target.")
+            self.controller.emit(turn, EventCode.STEAL_OUT_OF_RANGE, self.actor.name)
 
 
 class Teleport(Action):
+    __slots__ = ()
+
     cost = 20  # テレポートのコスト
 
     def __init__(self, actor, controller):
@@ -240,7 +315,7 @@ class Teleport(Action):
 
     def __call__(self, turn):
         if self.actor.sp < self.cost:
-            self.controller.log_action(turn, f"{self.actor.name} does not have enough SP to teleport!")
+            self.controller.emit(turn, EventCode.TELEPORT_NO_SP, self.actor.name)
             return
 
         import random
@@ -250,28 +325,31 @@ class Teleport(Action):
 
         # 移動先に他のロボットがいないかチェック
         if self.controller.is_position_occupied(new_x, new_y):
-            self.controller.log_action(turn, f"{self.actor.name} tried to teleport to ({new_x}, {new_y}), but the position is occupied.")
+            self.controller.emit(turn, EventCode.TELEPORT_OCCUPIED, self.actor.name, new_x, new_y)
             return
 
         # テレポートを実行
         self.actor.use_sp(self.cost)
         self.actor.set_position(new_x, new_y)
-        self.controller.log_action(turn, f"{self.actor.name} teleported to ({new_x}, {new_y}).")
+        self.controller.emit(turn, EventCode.TELEPORT, self.actor.name, new_x, new_y)
 
 
 class Camouflage(Action):
+    __slots__ = ()
+
     cost = 20  # カモフラージュのコスト
     duration = 3  # カモフラージュの持続ターン数
 
+    is_active = _state_field(CAMOUFLAGE_ACTIVE, "カモフラージュ中かどうか")
+    remaining_turns = _state_field(CAMOUFLAGE_REMAINING, "カモフラージュの残りターン数")
+    last_known_position = _state_field(CAMOUFLAGE_LAST_POSITION, "カモフラージュ開始時の位置")
+
     def __init__(self, actor, controller):
         super().__init__(actor, controller)
-        self.is_active = False  # カモフラージュ中かどうか
-        self.remaining_turns = 0  # カモフラージュの残りターン数
-        self.last_known_position = None  # カモフラージュ開始時の位置を保持
 
     def __call__(self, turn):
         if self.actor.sp < self.cost:
-            self.controller.log_action(turn, f"{self.actor.name} does not have enough SP to activate camouflage!")
+            self.controller.emit(turn, EventCode.CAMOUFLAGE_NO_SP, self.actor.name)
             return
 
         if not self.is_active:
@@ -279,9 +357,9 @@ class Camouflage(Action):
             self.is_active = True
             self.remaining_turns = self.duration
             self.last_known_position = self.actor.position  # 現在の位置を記録
-            self.controller.log_action(turn, f"{self.actor.name} activates camouflage and hides its position for {self.duration} turns!")
+            self.controller.emit(turn, EventCode.CAMOUFLAGE, self.actor.name, self.duration)
         else:
-            self.controller.log_action(turn, f"{self.actor.name} is already camouflaged!")
+            self.controller.emit(turn, EventCode.CAMOUFLAGE_ALREADY_ACTIVE, self.actor.name)
 
     def update(self):
         """ターンごとにカモフラージュの状態を更新"""
@@ -289,21 +367,24 @@ class Camouflage(Action):
             self.remaining_turns -= 1
             if self.remaining_turns <= 0:
                 self.is_active = False
-                self.controller.log_action(self.controller.turn, f"{self.actor.name}'s camouflage has worn off.")
+                self.controller.emit(self.controller.turn, EventCode.CAMOUFLAGE_END, self.actor.name)
 
 
 class Scan(Action):
+    __slots__ = ()
+
     cost = 10  # スキャンのコスト
     duration = 1  # スキャンの持続ターン数
 
+    is_active = _state_field(SCAN_ACTIVE, "スキャン中かどうか")
+    remaining_turns = _state_field(SCAN_REMAINING, "スキャンの残りターン数")
+
     def __init__(self, actor, controller):
         super().__init__(actor, controller)
-        self.is_active = False  # スキャン中かどうか
-        self.remaining_turns = 0  # スキャンの残りターン数
 
     def __call__(self, turn):
         if self.actor.sp < self.cost:
-            self.controller.log_action(turn, f"{self.actor.name} does not have enough SP to scan!")
+            self.controller.emit(turn, EventCode.SCAN_NO_SP, self.actor.name)
             return
 
         self.actor.use_sp(self.cost)
@@ -316,4 +397,4 @@ class Scan(Action):
             self.remaining_turns -= 1
             if self.remaining_turns <= 0:
                 self.is_active = False
-                self.controller.log_action(self.controller.turn, f"{self.actor.name}'s scan effect has worn off.")
+                self.controller.emit(self.controller.turn, EventCode.SCAN_END, self.actor.name)
@@ -0,0 +1,288 @@
+"""リプレイ (game_state) を列指向の表にまとめて、行動や与ダメージを集計する
+
+リプレイを 1 手 1 行の pandas.DataFrame（列は NumPy 配列）に変換し、集計は groupby で行う。
+集計結果は名前ごとにキャッシュし、リプレイを追加したときだけ作り直す。
+表は save() / load() で pickle に保存できるので、大量のリプレイも 2 回目からは JSON を読まずに済む。
+
+    analytics = ReplayAnalytics()
+    analytics.add(game_state, bots=("robot_07_basic_bot", "robot_09_trapster"))
+    analytics.action_summary()     # ロボット × 行動ごとの回数・成功率・SP あたりの与ダメージ
+    analytics.trap_summary()       # 罠の命中率
+    analytics.parry_summary()      # パリィで攻撃を防いだ割合
+
+game_state には罠やスタンが記録されていないため、次の出来事は HP と SP の変化から推定する。
+    罠の命中 : 攻撃系の行動で SP を使っていない手番に、相手の HP が減った
+    パリィ成功: 隣接した相手へ SP が足りる状態で攻撃したのに、SP が減らなかった（パリィされてスタンした）
+"""
+import json
+from itertools import chain
+from operator import itemgetter
+
+import numpy as np
+import pandas as pd
+
+from actions import Attack
+
+ATTACK_ACTIONS = ("attack", "ranged_attack")
+TRAP_ACTIONS = ("trap_up", "trap_down", "trap_left", "trap_right")
+
+TURN_COLUMNS = (
+    "match", "turn", "seat", "action", "x", "y", "hp", "sp", "sp_delta",
+    "damage_dealt", "damage_taken", "enemy_seat", "enemy_distance",
+)
+
+
+_HP = itemgetter("hp")
+_SP = itemgetter("sp")
+_POSITION = itemgetter("position")
+_TURN = itemgetter("turn")
+_ACTION = itemgetter("action")
+
+# HP・SP は防御でダメージが半減すると小数になる
+FLOAT_COLUMNS = ("hp", "sp", "sp_delta", "damage_dealt", "damage_taken")
+
+
+def _replay_columns(replays, first_match=0):
+    """game_state のリストを、手番ごとの値の列 {列名: NumPy 配列} と試合ごとの (ロボット名, 勝った席, 手数) にする
+
+    ロボットの数が同じ試合をまとめて 1 つの (局面, 席) の配列に積み、差分や最も近い相手を配列演算で求める。
+    """
+    matches = []
+    groups = {}  # ロボットの数 → 局面ごとの値（席の順に平らに並べる）と、手番ごとの値
+    order = 0
+    for offset, game_state in enumerate(replays):
+        states = [state for state in game_state if "robots" in state]
+        names = [robot["name"] for robot in states[0]["robots"]]
+        seat_of = {name: seat for seat, name in enumerate(names)}
+        group = groups.setdefault(len(names), {
+            "hp": [], "sp": [], "position": [], "row": [],
+            "match": [], "turn": [], "seat": [], "action": [], "order": []})
+        first_row = len(group["hp"]) // len(names)
+        robots = [robot for state in states for robot in state["robots"]]
+        group["hp"] += map(_HP, robots)
+        group["sp"] += map(_SP, robots)
+        group["position"] += chain.from_iterable(map(_POSITION, robots))
+        actions = list(map(_ACTION, states[1:]))
+        turns = len(actions)
+        group["row"] += range(first_row + 1, first_row + 1 + turns)
+        group["match"] += [first_match + offset] * turns
+        group["turn"] += map(_TURN, states[1:])
+        group["seat"] += [seat_of[action["robot_name"]] for action in actions]
+        group["action"] += map(_ACTION, actions)
+        group["order"] += range(order, order + turns)
+        order += turns
+        matches.append((names, [robot["hp"] for robot in states[-1]["robots"]], turns))
+
+    parts = []
+    for robots, group in groups.items():
+        hp = np.asarray(group["hp"], dtype=np.float64).reshape(-1, robots)
+        sp = np.asarray(group["sp"], dtype=np.float64).reshape(-1, robots)
+        position = np.asarray(group["position"], dtype=np.int64).reshape(-1, robots, 2)
+        x, y = position[:, :, 0], position[:, :, 1]
+        after = np.asarray(group["row"], dtype=np.int64)
+        before = after - 1
+        seat = np.asarray(group["seat"], dtype=np.int64)
+        is_self = np.arange(robots) == seat[:, None]
+
+        # 行動の直前に最も近かった相手（同じ距離なら席が先のもの）
+        distance = (np.abs(x[before] - x[before, seat][:, None])
+                    + np.abs(y[before] - y[before, seat][:, None])).astype(np.float64)
+        distance[is_self | (hp[before] <= 0)] = np.inf
+        enemy_seat = np.argmin(distance, axis=1)
+        enemy_distance = distance[np.arange(len(seat)), enemy_seat]
+        no_enemy = np.isinf(enemy_distance)
+        lost = np.maximum(hp[before] - hp[after], 0)
+        parts.append({
+            "match": np.asarray(group["match"], dtype=np.int64),
+            "turn": np.asarray(group["turn"], dtype=np.int64),
+            "seat": seat,
+            "action": np.asarray(group["action"], dtype=object),
+            "x": x[after, seat],
+            "y": y[after, seat],
+            "hp": hp[after, seat],
+            "sp": sp[after, seat],
+            "sp_delta": sp[after, seat] - sp[before, seat],
+            "damage_dealt": np.where(is_self, 0, lost).sum(axis=1),
+            "damage_taken": lost[np.arange(len(seat)), seat],
+            "enemy_seat": np.where(no_enemy, -1, enemy_seat),
+            "enemy_distance": np.where(no_enemy, -1, enemy_distance).astype(np.int64),
+            "order": np.asarray(group["order"], dtype=np.int64),
+        })
+
+    columns = {name: np.concatenate([part[name] for part in parts]) for name in (*TURN_COLUMNS, "order")}
+    if len(parts) > 1:
+        # ロボットの数ごとに分けたので、追加した順に並べ直す
+        rank = np.argsort(columns.pop("order"), kind="stable")
+        columns = {name: values[rank] for name, values in columns.items()}
+    else:
+        columns.pop("order")
+
+    summaries = []
+    for names, final_hp, turns in matches:
+        # エンジンと同じく、HP が同じなら席が後のロボットの勝ち
+        winner = max(reversed(range(len(final_hp))), key=lambda seat: final_hp[seat])
+        summaries.append((names, winner, turns))
+    return columns, summaries
+
+
+class ReplayAnalytics:
+    def __init__(self):
+        self.turns = pd.DataFrame({
+            name: pd.Series(dtype="float64" if name in FLOAT_COLUMNS else "int64") for name in TURN_COLUMNS})
+        self.matches = pd.DataFrame({"match": pd.Series(dtype="int64"), "bots": pd.Series(dtype=object),
+                                     "winner": pd.Series(dtype="int64"), "length": pd.Series(dtype="int64")})
+        self._summaries = {}
+        self._pending = []
+
+    def add(self, game_state, bots=None):
+        """1 試合分のリプレイを加える
+
+        :param bots: 席ごとのロボットの名前（省略時は game_state のロボット名）
+        """
+        self._pending.append((game_state, bots))
+        self._summaries.clear()
+
+    def add_many(self, replays):
+        """(game_state, bots) の反復可能オブジェクトを加える"""
+        for game_state, bots in replays:
+            self.add(game_state, bots)
+
+    def add_files(self, paths, bots=None):
+        """game_state.json のファイルを加える（bots はファイルごとの席の名前のリスト）"""
+        for index, path in enumerate(paths):
+            with open(path) as file:
+                self.add(json.load(file), None if bots is None else bots[index])
+
+    def _materialize(self):
+        """追加されたリプレイをまとめて列に変換し、表に連結する"""
+        if not self._pending:
+            return
+        first_match = len(self.matches)
+        columns, summaries = _replay_columns([game_state for game_state, _ in self._pending], first_match)
+        matches = pd.DataFrame({
+            "match": np.arange(first_match, first_match + len(summaries), dtype=np.int64),
+            "bots": [tuple(names if bots is None else bots)
+                     for (names, _, _), (_, bots) in zip(summaries, self._pending)],
+            "winner": np.asarray([winner for _, winner, _ in summaries], dtype=np.int64),
+            "length": np.asarray([length for _, _, length in summaries], dtype=np.int64),
+        })
+        self._pending.clear()
+
+        self.turns = pd.concat([self.turns, pd.DataFrame(columns)], ignore_index=True)
+        self.turns["action"] = self.turns["action"].astype("category")
+        self.matches = pd.concat([self.matches, matches], ignore_index=True)
+
+    def table(self):
+        """手番ごとの表に、ロボット名・相手のロボット名・勝敗の列を加えたもの"""
+        return self._summary("table", self._build_table)
+
+    def _build_table(self):
+        self._materialize()
+        turns = self.turns
+        matches = self.matches.set_index("match")
+        match_ids = turns["match"].to_numpy()
+        seats = turns["seat"].to_numpy()
+        enemy_seats = turns["enemy_seat"].to_numpy()
+
+        # (試合, 席) → ロボット名の番号 の表を引いて、名前の列をカテゴリ型で作る
+        names = sorted({name for bots in matches["bots"] for name in bots})
+        codes = {name: code for code, name in enumerate(names)}
+        grid = np.full((len(matches), max((len(bots) for bots in matches["bots"]), default=1)), -1)
+        for match, bots in enumerate(matches["bots"]):
+            grid[match, :len(bots)] = [codes[name] for name in bots]
+        table = turns.copy()
+        table["bot"] = pd.Categorical.from_codes(grid[match_ids, seats], names)
+        table["enemy"] = pd.Categorical.from_codes(
+            np.where(enemy_seats >= 0, grid[match_ids, np.maximum(enemy_seats, 0)], -1), names)
+        table["won"] = matches["winner"].to_numpy()[match_ids] == seats
+        spent = np.maximum(-table["sp_delta"].to_numpy(), 0)
+        table["sp_spent"] = spent
+        is_attack = table["action"].isin(ATTACK_ACTIONS).to_numpy()
+        table["succeeded"] = table["sp_delta"].to_numpy() != 0
+        table["trap_hit"] = (table["damage_dealt"].to_numpy() > 0) & ~(is_attack & (spent > 0))
+        table["parried"] = ((table["action"] == "attack").to_numpy() & (table["sp_delta"].to_numpy() == 0)
+                            & (table["enemy_distance"].to_numpy() == 1)
+                            & (table["sp"].to_numpy() >= Attack.cost))
+        return table
+
+    def _summary(self, name, build):
+        summary = self._summaries.get(name)
+        if summary is None:
+            summary = self._summaries[name] = build()
+        return summary
+
+    def action_summary(self, by=("bot", "action")):
+        """行動ごとの回数・成功率・使った SP・与ダメージ・SP あたりの与ダメージ・その行動を使った側の勝率"""
+        by = list(by)
+
+        def build():
+            table = self.table()
+            damage = table["damage_dealt"].where(~table["trap_hit"], 0)
+            grouped = table.assign(attack_damage=damage).groupby(by, observed=True)
+            summary = grouped.agg(
+                count=("turn", "size"),
+                success_rate=("succeeded", "mean"),
+                sp_spent=("sp_spent", "sum"),
+                damage=("attack_damage", "sum"),
+                win_rate=("won", "mean"),
+            )
+            summary["damage_per_sp"] = summary["damage"] / summary["sp_spent"].where(summary["sp_spent"] > 0)
+            return summary
+        return self._summary(("action", tuple(by)), build)
+
+    def trap_summary(self):
+        """ロボットごとの罠の設置数・命中数・命中率"""
+        def build():
+            table = self.table()
+            placed = table["action"].isin(TRAP_ACTIONS) & table["succeeded"]
+            summary = pd.DataFrame({
+                "placed": placed.groupby(table["bot"], observed=True).sum(),
+                "hits": table["trap_hit"].groupby(table["bot"], observed=True).sum(),
+            })
+            summary["hit_rate"] = summary["hits"] / summary["placed"].where(summary["placed"] > 0)
+            return summary
+        return self._summary("trap", build)
+
+    def parry_summary(self):
+        """ロボットごとのパリィの使用数・防いだ攻撃の数・成功率"""
+        def build():
+            table = self.table()
+            used = (table["action"] == "parry") & table["succeeded"]
+            parried = table[table["parried"]]
+            summary = pd.DataFrame({
+                "parries": used.groupby(table["bot"], observed=True).sum(),
+                "blocked": parried.groupby("enemy", observed=True).size(),
+            }).fillna(0)
+            summary["success_rate"] = summary["blocked"] / summary["parries"].where(summary["parries"] > 0)
+            return summary
+        return self._summary("parry", build)
+
+    def turn_summary(self, by=("bot", "turn")):
+        """ターンごとの平均 HP・SP・与ダメージ"""
+        by = list(by)
+
+        def build():
+            return self.table().groupby(by, observed=True).agg(
+                hp=("hp", "mean"), sp=("sp", "mean"), damage=("damage_dealt", "mean"), count=("turn", "size"))
+        return self._summary(("turn", tuple(by)), build)
+
+    def position_summary(self, bot):
+        """bot が各マスで手番を終えた回数（行 = y, 列 = x）"""
+        def build():
+            table = self.table()
+            rows = table[table["bot"] == bot]
+            return pd.crosstab(rows["y"], rows["x"])
+        return self._summary(("position", bot), build)
+
+    def save(self, path):
+        """変換済みの表を pickle に保存する"""
+        self._materialize()
+        pd.to_pickle({"turns": self.turns, "matches": self.matches}, path)
+
+    @classmethod
+    def load(cls, path):
+        data = pd.read_pickle(path)
+        analytics = cls()
+        analytics.turns = data["turns"]
+        analytics.matches = data["matches"]
+        return analytics
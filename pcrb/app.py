@@ -1,51 +1,15 @@
 import streamlit as st
-import ast
-import traceback
 import json
 
+from code_check import ALLOWED_FUNCTIONS
+from code_check import ALLOWED_MODULES
+from code_check import is_safe_code
 from controller import GameController
 from robot import Robot
 
-# 許可する関数とモジュール
-ALLOWED_FUNCTIONS = {"robot_logic"}
-ALLOWED_MODULES = ["random", "math"]
 GAME_STATE_FILE = "./game_state.json"  # 既存の game_state.json ファイル
 
 
-# ----------------------------- セキュリティ関連ユーティリティ -----------------------------
-
-def is_safe_code(file_content: str) -> tuple[bool, str]:
-    """アップロードされたコードを AST 解析し、安全性を判定する。"""
-    try:
-        tree = ast.parse(file_content)
-
-        for node in ast.walk(tree):
-            # インポートのチェック
-            if isinstance(node, ast.Import):
-                for alias in node.names:
-                    if alias.name not in ALLOWED_MODULES:
-                        return False, f"許可されていないモジュールのインポート: {alias.name}"
-            elif isinstance(node, ast.ImportFrom):
-                if node.module not in ALLOWED_MODULES:
-                    return False, f"許可されていないモジュールのインポート: {node.module}"
-
-            # 許可していない関数定義を禁止
-            if isinstance(node, ast.FunctionDef):
-                if node.name not in ALLOWED_FUNCTIONS:
-                    return False, f"許可されていない関数定義: {node.name}"
-
-            # 危険な関数呼び出しの検出
-            if isinstance(node, ast.Call):
-                if isinstance(node.func, ast.Name) and node.func.id in {"exec", "eval"}:
-                    return False, f"禁止されている関数呼び出し: {node.func.id}"
-
-        return True, "安全なコードです"
-    except Exception as e:
-        error_details = traceback.format_exc()
-        print(error_details)
-        return False, f"コード解析中にエラーが発生しました: {e}"
-
-
 # ----------------------------- モジュールロード -----------------------------
 
 def load_player_module(file_content: str):
@@ -66,10 +30,12 @@ def load_player_module(file_content: str):
 
 # ----------------------------- ゲーム実行 -----------------------------
 
-def play_game(robot_logic_a, robot_logic_b):
-    controller = GameController(max_turn=100, x_max=9, y_max=7)
-    robot1 = Robot("Robot A", 1, 3, robot_logic_a, controller)
-    robot2 = Robot("Robot B", 7, 3, robot_logic_b, controller)
+def play_game(robot_logic_a, robot_logic_b, max_turn=100, x_max=9, y_max=7, initial_positions="mirrored"):
+    controller = GameController(max_turn=max_turn, x_max=x_max, y_max=y_max, initial_positions=initial_positions)
+    position1 = controller.robot1_initial_position
+    position2 = controller.robot2_initial_position
+    robot1 = Robot("Robot A", position1['x'], position1['y'], robot_logic_a, controller)
+    robot2 = Robot("Robot B", position2['x'], position2['y'], robot_logic_b, controller)
     controller.set_robots(robot1, robot2)
     winner, game_state = controller.game_loop()
     return winner, game_state
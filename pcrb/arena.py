@@ -0,0 +1,65 @@
+"""画面を使わずに対戦を実行するためのユーティリティ
+
+streamlit に依存しないので、ランキングやマッチングの処理から使える。
+"""
+import importlib
+import os
+
+from controller import GameController
+from policy_table import compile_pool
+from robot import Robot
+
+ROBOTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "robots")
+
+FIRST = 0   # 先攻 (Robot A)
+SECOND = 1  # 後攻 (Robot B)
+
+
+def play_match(robot_logic_a, robot_logic_b, max_turn=100, x_max=9, y_max=7, initial_positions="mirrored",
+               detect_cycles=False, metrics=None):
+    """ログを出さずに 1 試合を行い、勝った側の席 (FIRST / SECOND) を返す
+
+    :param detect_cycles: 局面が繰り返したら打ち切る（決定的なロジック同士の総当たりで使う）
+    :param metrics: 計測値を集計する EngineMetrics（複数の試合で共有できる）
+    """
+    controller = GameController(
+        max_turn=max_turn, x_max=x_max, y_max=y_max, initial_positions=initial_positions,
+        verbose=False, log_path=None, game_state_path=None, detect_cycles=detect_cycles,
+        metrics=metrics)
+    position1 = controller.robot1_initial_position
+    position2 = controller.robot2_initial_position
+    robot1 = Robot("Robot A", position1['x'], position1['y'], robot_logic_a, controller)
+    robot2 = Robot("Robot B", position2['x'], position2['y'], robot_logic_b, controller)
+    controller.set_robots(robot1, robot2)
+    winner, _ = controller.game_loop()
+    return FIRST if winner is robot1 else SECOND
+
+
+def load_robot_pool(robots_dir=ROBOTS_DIR, compiled=False):
+    """robots ディレクトリのロボットを {モジュール名: robot_logic} で返す
+
+    :param compiled: 決定的なロボットを表引き (policy_table.PolicyTable) に置き換える（既定の盤面とターン数で変換）
+    """
+    pool = {}
+    for file_name in sorted(os.listdir(robots_dir)):
+        if not file_name.endswith(".py") or file_name == "__init__.py":
+            continue
+        module_name = file_name[:-3]
+        module = importlib.import_module(f"robots.{module_name}")
+        if hasattr(module, "robot_logic"):
+            pool[module_name] = module.robot_logic
+    if compiled:
+        pool = compile_pool(pool)
+    return pool
+
+
+def load_logic(source):
+    """ロボットのモジュール名（robots/ のファイル名）またはソースコードから robot_logic を返す"""
+    if source.isidentifier():
+        module = importlib.import_module(f"robots.{source}")
+        return module.robot_logic
+    namespace = {}
+    exec(source, namespace)
+    if "robot_logic" not in namespace:
+        raise ValueError("Source does not define robot_logic().")
+    return namespace["robot_logic"]
@@ -0,0 +1,130 @@
+"""盤面の寸法・方向オフセット・占有グリッドを保持するクラス"""
+from collections.abc import Sequence
+
+# 方向名 → (dx, dy)。移動と罠設置で同じオフセットを使う
+DIRECTION_OFFSETS = {
+    "up": (0, -1),
+    "down": (0, 1),
+    "left": (-1, 0),
+    "right": (1, 0),
+}
+
+# 隣接マス（マンハッタン距離 1）と遠距離攻撃の射程（マンハッタン距離 2）のオフセット
+ADJACENT_OFFSETS = tuple(DIRECTION_OFFSETS.values())
+RANGED_OFFSETS = (
+    (-2, 0), (2, 0), (0, -2), (0, 2),
+    (-1, -1), (-1, 1), (1, -1), (1, 1),
+)
+
+
+class TrapView(Sequence):
+    """罠座標の読み取り専用スナップショット
+
+    list と同じように ``in`` / 反復 / 添字 / ``copy()`` で読める。
+    ``in`` は初回に作る frozenset で O(1) で判定する。
+    """
+    __slots__ = ("_positions", "_lookup")
+
+    def __init__(self, positions=()):
+        self._positions = tuple(positions)
+        self._lookup = None
+
+    def __getitem__(self, index):
+        return self._positions[index]
+
+    def __len__(self):
+        return len(self._positions)
+
+    def __iter__(self):
+        return iter(self._positions)
+
+    def __contains__(self, position):
+        if self._lookup is None:
+            self._lookup = frozenset(self._positions)
+        try:
+            return position in self._lookup
+        except TypeError:  # list などハッシュできない値
+            return False
+
+    def __eq__(self, other):
+        if isinstance(other, (list, tuple, TrapView)):
+            return list(self._positions) == list(other)
+        return NotImplemented
+
+    __hash__ = None
+
+    def copy(self):
+        return list(self._positions)
+
+    def __repr__(self):
+        return repr(list(self._positions))
+
+
+class Board:
+    __slots__ = ("x_max", "y_max", "move_offsets", "trap_offsets", "robot_grid", "trap_grid")
+
+    def __init__(self, x_max, y_max):
+        self.x_max = x_max
+        self.y_max = y_max
+        # 行動名 → (dx, dy) を盤面ごとに 1 度だけ作る
+        self.move_offsets = dict(DIRECTION_OFFSETS)
+        self.trap_offsets = {f"trap_{direction}": offset for direction, offset in DIRECTION_OFFSETS.items()}
+        # マスごとの占有者 ID（0 = なし）。ロボットと罠を別々のグリッドで持つ
+        self.robot_grid = bytearray(x_max * y_max)
+        self.trap_grid = bytearray(x_max * y_max)
+
+    def in_bounds(self, x, y):
+        return 0 <= x < self.x_max and 0 <= y < self.y_max
+
+    def destination(self, x, y, offset):
+        """(x, y) から offset だけ進んだ座標を返す（盤外へは出ない）"""
+        new_x = min(max(x + offset[0], 0), self.x_max - 1)
+        new_y = min(max(y + offset[1], 0), self.y_max - 1)
+        return new_x, new_y
+
+    def clear(self):
+        self.robot_grid = bytearray(self.x_max * self.y_max)
+        self.trap_grid = bytearray(self.x_max * self.y_max)
+
+    # ----------------------------- ロボット -----------------------------
+
+    def robot_at(self, x, y):
+        """(x, y) にいるロボットの ID を返す（いなければ 0）"""
+        return self.robot_grid[y * self.x_max + x]
+
+    def place_robot(self, owner, x, y):
+        self.robot_grid[y * self.x_max + x] = owner
+
+    def remove_robot(self, owner, x, y):
+        index = y * self.x_max + x
+        if self.robot_grid[index] == owner:
+            self.robot_grid[index] = 0
+
+    def robot_ids_around(self, x, y, offsets):
+        """(x, y) から各オフセットだけ離れたマスにいるロボットの ID を返す"""
+        ids = []
+        for dx, dy in offsets:
+            nx, ny = x + dx, y + dy
+            if 0 <= nx < self.x_max and 0 <= ny < self.y_max:
+                owner = self.robot_grid[ny * self.x_max + nx]
+                if owner:
+                    ids.append(owner)
+        return ids
+
+    def move_robot(self, owner, old_x, old_y, new_x, new_y):
+        old_index = old_y * self.x_max + old_x
+        if self.robot_grid[old_index] == owner:
+            self.robot_grid[old_index] = 0
+        self.robot_grid[new_y * self.x_max + new_x] = owner
+
+    # ----------------------------- 罠 -----------------------------
+
+    def trap_owner_at(self, x, y):
+        """(x, y) にある罠の持ち主 ID を返す（なければ 0）"""
+        return self.trap_grid[y * self.x_max + x]
+
+    def set_trap(self, owner, x, y):
+        self.trap_grid[y * self.x_max + x] = owner
+
+    def remove_trap(self, x, y):
+        self.trap_grid[y * self.x_max + x] = 0
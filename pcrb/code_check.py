@@ -0,0 +1,53 @@
+"""アップロードされたロボットのコードの検査
+
+streamlit に依存しないので、app のページからも match_server からも使える。
+"""
+import ast
+import traceback
+
+# 許可する関数とモジュール
+ALLOWED_FUNCTIONS = {"robot_logic"}
+ALLOWED_MODULES = ["random", "math"]
+# モジュールの読み込み・ファイル操作・属性をたどって制限を抜ける手段になる名前
+FORBIDDEN_NAMES = {
+    "exec", "eval", "compile", "__import__", "open", "getattr", "setattr", "delattr",
+    "globals", "locals", "vars", "breakpoint", "input",
+}
+
+
+def is_safe_code(file_content: str) -> tuple[bool, str]:
+    """アップロードされたコードを AST 解析し、安全性を判定する。"""
+    try:
+        tree = ast.parse(file_content)
+
+        for node in ast.walk(tree):
+            # インポートのチェック
+            if isinstance(node, ast.Import):
+                for alias in node.names:
+                    if alias.name not in ALLOWED_MODULES:
+                        return False, f"許可されていないモジュールのインポート: {alias.name}"
+            elif isinstance(node, ast.ImportFrom):
+                if node.module not in ALLOWED_MODULES:
+                    return False, f"許可されていないモジュールのインポート: {node.module}"
+
+            # 許可していない関数定義を禁止
+            if isinstance(node, ast.FunctionDef):
+                if node.name not in ALLOWED_FUNCTIONS:
+                    return False, f"許可されていない関数定義: {node.name}"
+
+            # 危険な関数の使用の検出（呼び出しに限らず、別名に入れて呼ぶ場合も防ぐ）
+            if isinstance(node, ast.Name):
+                if node.id in FORBIDDEN_NAMES:
+                    return False, f"禁止されている関数呼び出し: {node.id}"
+                if node.id.startswith("__"):
+                    return False, f"禁止されている名前の使用: {node.id}"
+
+            # __class__ や __globals__ などの特殊属性をたどるのを禁止
+            if isinstance(node, ast.Attribute) and node.attr.startswith("__"):
+                return False, f"禁止されている属性へのアクセス: {node.attr}"
+
+        return True, "安全なコードです"
+    except Exception as e:
+        error_details = traceback.format_exc()
+        print(error_details)
+        return False, f"コード解析中にエラーが発生しました: {e}"
@@ -1,23 +1,100 @@
 import json
-
-from utils import is_valid_memo
+import random
+
+from action_registry import ACTION_REGISTRY
+from action_registry import TARGET_ADJACENT
+from action_registry import TARGET_RANGED
+from board import ADJACENT_OFFSETS
+from board import RANGED_OFFSETS
+from board import Board
+from initial_positions import resolve_initial_positions
+from cycle_detection import CycleDetector
+from cycle_detection import TurnWatchingInfo
+from events import Event
+from events import EventCode
+from events import render_event
+from events import render_log
+from memo_store import MAX_MEMO_BYTES
+from memo_store import MAX_MEMO_KEYS
+from memo_store import MemoStore
+from metrics import EngineMetrics
+from snapshot import GameSnapshot
+from zobrist import HashedState
+from zobrist import ZobristHasher
+
+# 後攻 (robot2) の行動の読み替え表（従来の逐次比較と同じ結果になる対応のみ）
+ROBOT2_ACTION_MAP = {
+    "up": "down",
+    "right": "left",
+}
+
+# 盤面の占有グリッドは 1 バイトで ID を持つ
+MAX_ROBOTS = 255
+
+# 書き込みスレッドを使うとき、試合の途中でもこの数だけ出来事がたまったらログに送る
+LOG_BATCH_EVENTS = 256
+
+TARGET_OFFSETS = {
+    TARGET_ADJACENT: ADJACENT_OFFSETS,
+    TARGET_RANGED: RANGED_OFFSETS,
+}
+
+
+def _dump_game_state(file, game_state):
+    json.dump(game_state, file, indent=4)
 
 
 class GameController:
     def __init__(
-            self, max_turn=100, x_max=9, y_max=7, robot1_initial_position=None, robot2_initial_position=None):
-        self.robot1 = None
-        self.robot2 = None
-        self.memos1 = {}
-        self.memos2 = {}
+            self, max_turn=100, x_max=9, y_max=7, robot1_initial_position=None, robot2_initial_position=None,
+            action_registry=None, initial_positions="mirrored", verbose=True,
+            log_path="game_log.txt", game_state_path="game_state.json", detect_cycles=False,
+            metrics=None, writer=None, max_memo_keys=MAX_MEMO_KEYS, max_memo_bytes=MAX_MEMO_BYTES):
+        """
+        :param initial_positions: 初期位置の戦略名 ("mirrored" / "corners" / "random") または関数。
+            robot1_initial_position / robot2_initial_position を渡した場合はそちらを優先する
+        :param verbose: False にすると標準出力へのログ表示を止める
+        :param log_path: ログの出力先（None でファイル出力しない）。試合の終わりに events から書き出す
+        :param game_state_path: ゲーム状態 JSON の出力先（None でファイル出力しない）
+        :param detect_cycles: True にすると、局面が完全に繰り返したところで試合を打ち切る
+            （ロボットのロジックが決定的で、引数以外の状態を持たない前提）
+        :param metrics: 計測値を集計する EngineMetrics（None なら計測しない）
+        :param writer: ファイルへの書き込みを任せる log_writer.BackgroundWriter（None ならその場で書き込む）
+        :param max_memo_keys: ロボット 1 体のメモのキー数の上限（超えたら ValueError）
+        :param max_memo_bytes: ロボット 1 体のメモのバイト数の上限（超えたら ValueError）
+        """
+        self.robots = []
+        self.memos = []  # ロボットごとの memo_store.MemoStore
+        self.max_memo_keys = max_memo_keys
+        self.max_memo_bytes = max_memo_bytes
+        self.events = []  # 試合中の出来事 (events.Event) の記録。None なら記録しない
+        self.turn_order = []  # 行動する順番（robots の添字）
+        self._order_cursor = 0
+        self._initial_positions = []
         self.turn = 0
         self.max_turn = max_turn
         self.x_max = x_max
         self.y_max = y_max
-        self.robot1_initial_position = {'x': 1, 'y': 3} if robot1_initial_position is None else robot1_initial_position
-        self.robot2_initial_position = {'x': 7, 'y': 3} if robot2_initial_position is None else robot2_initial_position
-        self.log_file = open("game_log.txt", "w")
-        self.game_state_file = open("game_state.json", "w")
+        self.board = Board(x_max, y_max)
+        self.action_registry = ACTION_REGISTRY if action_registry is None else action_registry
+        self.zobrist = None  # enable_hashing() で有効にする状態ハッシュ
+        self.detect_cycles = detect_cycles
+        self.cycle_detected_at = None  # 繰り返しを検出して打ち切ったターン
+        self._turn_observed = False    # ロジックが game_info の turn を読んだか
+        self.metrics = None
+        if metrics is not None:
+            self.enable_metrics(metrics)
+        default_position1, default_position2 = resolve_initial_positions(initial_positions, x_max, y_max)
+        self.robot1_initial_position = default_position1 if robot1_initial_position is None else robot1_initial_position
+        self.robot2_initial_position = default_position2 if robot2_initial_position is None else robot2_initial_position
+        self.verbose = verbose
+        self.log_path = log_path
+        self.game_state_path = game_state_path
+        self.writer = writer
+        self.log_file = None
+        self.game_state_file = None
+        self._events_written = 0  # ログファイルに送った出来事の数
+        self._open_output_files()
 
         self.game_state = [{
             'settings': {
@@ -27,25 +104,194 @@ class GameController:
             }
         }]
 
-    def set_robots(self, robot1, robot2):
-        self.robot1 = robot1
-        self.robot2 = robot2
-        self.memos1 = {}
-        self.memos2 = {}
+    @property
+    def robot1(self):
+        return self.robots[0] if len(self.robots) > 0 else None
+
+    @property
+    def robot2(self):
+        return self.robots[1] if len(self.robots) > 1 else None
+
+    @property
+    def memos1(self):
+        return self.memos[0]
+
+    @property
+    def memos2(self):
+        return self.memos[1]
+
+    def _new_memos(self):
+        return MemoStore(max_keys=self.max_memo_keys, max_bytes=self.max_memo_bytes)
+
+    def set_robots(self, *robots):
+        """対戦するロボットを登録する（2 体以上。登録順が既定の行動順）"""
+        if len(robots) < 2:
+            raise ValueError("At least two robots are required.")
+        if len(robots) > MAX_ROBOTS:
+            raise ValueError(f"At most {MAX_ROBOTS} robots are supported.")
+
+        self.robots = list(robots)
+        self.board.clear()
+        for board_id, robot in enumerate(self.robots, start=1):
+            robot._board_id = board_id
+            self.board.place_robot(board_id, robot.x, robot.y)
+            for position in robot.trap.traps:
+                self.board.set_trap(board_id, *position)
+        self.memos = [self._new_memos() for _ in self.robots]
+        self.turn_order = list(range(len(self.robots)))
+        self._order_cursor = 0
+        self._initial_positions = [{'x': robot.x, 'y': robot.y} for robot in self.robots]
+        if self.zobrist is not None:
+            self.enable_hashing()
         self.save_game_state(None, None)
         self.turn += 1
 
+    def set_turn_order(self, order):
+        """行動順をロボット（または robots の添字）の並びで指定する"""
+        seats = [item if isinstance(item, int) else self.seat_of(item) for item in order]
+        if sorted(seats) != list(range(len(self.robots))):
+            raise ValueError(f"Turn order must contain every robot exactly once: {order}")
+        self.turn_order = seats
+        self._order_cursor = 0
+
+    def seat_of(self, robot):
+        """robots の中での添字を返す"""
+        return robot._board_id - 1
+
+    def next_robot(self):
+        """行動順に従って次に行動する生存ロボットを返す"""
+        for _ in range(len(self.turn_order)):
+            robot = self.robots[self.turn_order[self._order_cursor]]
+            self._order_cursor = (self._order_cursor + 1) % len(self.turn_order)
+            if robot.is_alive():
+                return robot
+        return None
+
+    def alive_robots(self):
+        return [robot for robot in self.robots if robot.is_alive()]
+
+    def enemies_of(self, robot):
+        """robot 以外の生存ロボットを返す"""
+        return [other for other in self.robots if other is not robot and other.is_alive()]
+
+    def nearest_enemy(self, robot):
+        """robot から見て最も近い敵を返す（同じ距離なら登録順が先のもの）
+
+        生存している敵がいない場合は、登録順で最初の他のロボットを返す。
+        """
+        if len(self.robots) == 2:
+            # 1 対 1 では生死に関わらず相手が答えになる
+            first, second = self.robots
+            return second if robot is first else first
+        nearest = None
+        nearest_distance = None
+        for other in self.enemies_of(robot):
+            distance = abs(robot.x - other.x) + abs(robot.y - other.y)
+            if nearest is None or distance < nearest_distance:
+                nearest, nearest_distance = other, distance
+        if nearest is None:
+            nearest = next((other for other in self.robots if other is not robot), None)
+        return nearest
+
+    def enemies_around(self, robot, offsets):
+        """占有グリッドを引いて、各オフセットのマスにいる生存中の敵を返す"""
+        enemies = []
+        for board_id in self.board.robot_ids_around(robot.x, robot.y, offsets):
+            other = self.robots[board_id - 1]
+            if other is not robot and other.is_alive():
+                enemies.append(other)
+        return enemies
+
+    def select_target(self, robot, target):
+        """行動の対象を選ぶ
+
+        範囲内に敵がいれば HP が最も低い敵（同じなら登録順が先）を、
+        いなければ最も近い敵を返す（行動側で「範囲外」として処理される）。
+        """
+        offsets = TARGET_OFFSETS.get(target)
+        if offsets is not None:
+            candidates = self.enemies_around(robot, offsets)
+            if candidates:
+                return min(candidates, key=lambda other: (other.hp, other._board_id))
+        return self.nearest_enemy(robot)
+
+    def _remove_defeated_robots(self):
+        """倒されたロボットと、その罠を盤面から取り除く"""
+        for robot in self.robots:
+            if not robot.is_alive() and self.board.robot_at(robot.x, robot.y) == robot._board_id:
+                self.board.remove_robot(robot._board_id, robot.x, robot.y)
+                robot.trap.clear()
+
+    def _open_output_files(self):
+        if self.writer is not None and (self.log_path is not None or self.game_state_path is not None):
+            # 同じパスへの書き込みが書き込みスレッドに残っていれば、終わってから開き直す
+            self.writer.flush()
+        if self.log_path is not None:
+            self.log_file = open(self.log_path, "w")
+        if self.game_state_path is not None:
+            self.game_state_file = open(self.game_state_path, "w")
+
+    def _close_output_files(self):
+        self._write_pending_log()
+        for file in (self.log_file, self.game_state_file):
+            if file is not None and not file.closed:
+                if self.writer is not None:
+                    self.writer.close_file(file)
+                else:
+                    file.close()
+        self.log_file = None
+        self.game_state_file = None
+
+    def _write_pending_log(self, min_events=1):
+        """まだログファイルに送っていない出来事が min_events 以上あれば書き出す"""
+        if self.log_file is None or self.events is None:
+            return
+        events = self.events[self._events_written:]
+        if len(events) < min_events:
+            return
+        self._events_written = len(self.events)
+        if self.writer is not None:
+            # 文章にするのも書き込みスレッドで行う
+            self.writer.writelines(self.log_file, render_log(events))
+        else:
+            self.log_file.writelines(render_log(events))
+
+    def _write_game_state(self):
+        if self.game_state_file is None:
+            return
+        if self.writer is not None:
+            self.writer.submit(self.game_state_file, _dump_game_state, list(self.game_state))
+        else:
+            _dump_game_state(self.game_state_file, self.game_state)
+
+    def debug(self, message, *args):
+        """verbose のときだけ標準出力へ表示する（args があれば表示するときに message.format で埋める）"""
+        if self.verbose:
+            print(message.format(*args) if args else message)
+
+    def emit(self, turn, code, actor=None, *args):
+        """出来事を記録する（文章にするのは表示するときと書き出すときだけ）"""
+        event = Event(turn, code, actor, args)
+        if self.events is not None:
+            self.events.append(event)
+        if self.verbose:
+            print(render_event(event))
+
     def log_action(self, turn, message):
-        print(message)
-        self.log_file.write(f"Turn {turn}: {message}\n")
+        """任意の文言を記録する"""
+        self.emit(turn, EventCode.TEXT, None, message)
+
+    def write_log(self, file):
+        """記録した出来事を game_log.txt と同じ形式で file に書き出す"""
+        file.writelines(render_log(self.events))
 
     def is_position_occupied(self, x, y):
         """指定された位置にロボットがいるかを確認"""
-        return self.robot1.position == (x, y) or self.robot2.position == (x, y)
+        return self.board.robot_at(x, y) != 0
     
     def is_trap_at_position(self, x, y):
         """指定された位置にトラップがあるかを確認（自分または相手のトラップ）"""
-        return (x, y) in self.robot1.trap.traps or (x, y) in self.robot2.trap.traps
+        return self.board.trap_owner_at(x, y) != 0
     
     @staticmethod
     def adjust_action_for_robot1(action):
@@ -53,78 +299,69 @@ class GameController:
 
     @staticmethod
     def adjust_action_for_robot2(action):
-        if action == "up":
-            action = 'down'
-        if action == "up":
-            action = 'down'
-        if action == "left":
-            action = 'right'
-        if action == "right":
-            action = 'left'
-        return action
+        return ROBOT2_ACTION_MAP.get(action, action)
 
     def run_logic(self, robot):
-        enemy = self.robot1 if robot == self.robot2 else self.robot2
-        memos = self.memos1 if robot == self.robot1 else self.memos2
-        adjust_action = self.adjust_action_for_robot1 if robot == self.robot1 else self.adjust_action_for_robot2
+        seat = self.seat_of(robot)
+        memos = self.memos[seat]
 
-        robot.trap.check_trap(enemy)  # 罠のチェック
+        self.check_traps(robot)
 
         game_info = self.build_game_info(robot)
 
         response = robot.robot_logic(robot, game_info, memos)
-        print(f"DEBUG: response from robot_logic: {response}, type: {type(response)}")
+        self.debug("DEBUG: response from robot_logic: {}, type: {}", response, type(response))
 
         if isinstance(response, str):
             action = response
             memo = {}
         elif isinstance(response, (list, tuple)) and len(response) == 2:
             action, memo = response
-            assert is_valid_memo(memo)
+            if not isinstance(memo, dict):
+                raise ValueError(f"Memo must be a dict: {memo!r}")
         else:
             assert False, f"Unexpected response format from robot_logic: {response} (type: {type(response)})"
 
-        action = adjust_action(action)
+        action = self.adjust_action(robot, action)
 
-        if robot == self.robot1:
-            self.memos1.update(memo)
-        else:
-            self.memos2.update(memo)
+        memos.update(memo)  # 変わったキーだけを検査し、上限を超えれば ValueError
 
-        if robot.stun_counter > 0:
-            print(f"DEBUG: Stunned. Returning ('stun', {{}})")
+        if self.apply_action(robot, action) == "stun":
+            self.debug("DEBUG: Stunned. Returning ('stun', {})")
 
             return "stun", {} # スタン時も2つの値を返す
 
+        self.debug("DEBUG: Returning action: {} (type: {}), memo: {} (type: {})", action, type(action), memo, type(memo))
+        return action, memo
+
+    def check_traps(self, robot):
+        """robot の手番の前に、敵が robot の罠を踏んでいないか調べる"""
+        for enemy in self.enemies_of(robot):
+            robot.trap.check_trap(enemy)  # 罠のチェック
+        if len(self.robots) > 2:
+            self._remove_defeated_robots()
+
+    def adjust_action(self, robot, action):
+        """行動の読み替えは 1 対 1 の後攻 (robot2) だけに適用する"""
+        if len(self.robots) == 2 and self.seat_of(robot) == 1:
+            return self.adjust_action_for_robot2(action)
+        return self.adjust_action_for_robot1(action)
+
+    def apply_action(self, robot, action):
+        """読み替え済みの行動を実行する（スタン中は何もせず "stun" を返す）"""
+        if robot.stun_counter > 0:
+            return "stun"
+
         robot.start_turn()
-        if action == "rest":
-            robot.rest(self.turn)
-        elif action == "attack":
-            robot.attack(enemy, self.turn)
-        elif action == "defend":
-            robot.defend(self.turn)
-        elif action in ["up", "down", "left", "right"]:
-            robot.move(action, self.turn)
-        elif action == "ranged_attack":
-            robot.ranged_attack(enemy, self.turn)
-        elif action == "parry":
-            robot.parry(self.turn)
-        elif action in ["trap_up", "trap_down", "trap_left", "trap_right"]:
-            robot.trap(action, self.turn)
-        elif action == "steal":
-            robot.steal(enemy, self.turn)
-        elif action == "teleport":
-            robot.teleport(self.turn)
-        elif action == "camouflage":
-            robot.camouflage(self.turn)
-        elif action == "scan":
-            robot.scan(self.turn)
-        else:
-            print(f"Invalid action: {action}")
+        spec = self.action_registry.get(action)
+        if spec is None:
+            self.debug("Invalid action: {}", action)
             raise ValueError("Unexpected robot action detected!")
-
-        print(f"DEBUG: Returning action: {action} (type: {type(action)}), memo: {memo} (type: {type(memo)})")
-        return action, memo
+        enemy = self.select_target(robot, spec.target)
+        spec.handler(robot, enemy, spec.name, self.turn)
+        if len(self.robots) > 2:
+            self._remove_defeated_robots()
+        return action
 
     def save_game_state(self, robot_name, action):
         # 現在のターンのゲーム状態を辞書形式で記録
@@ -132,89 +369,212 @@ class GameController:
             "turn": self.turn,
             "robots": [
                 {
-                    "name": self.robot1.name,
-                    "position": self.robot1.position,
-                    "hp": self.robot1.hp,
-                    "sp": self.robot1.sp,
-                    "defense_mode": self.robot1.defend.is_active,
-                },
-                {
-                    "name": self.robot2.name,
-                    "position": self.robot2.position,
-                    "hp": self.robot2.hp,
-                    "sp": self.robot2.sp,
-                    "defense_mode": self.robot2.defend.is_active,
+                    "name": robot.name,
+                    "position": robot.position,
+                    "hp": robot.hp,
+                    "sp": robot.sp,
+                    "defense_mode": robot.defend.is_active,
                 }
+                for robot in self.robots
             ],
             'action': {
                 'robot_name': robot_name,
                 'action': action
             }
         }
+        # 前回の記録からメモが変わったロボットだけ、変わったキーを残す
+        for robot, memos in zip(self.robots, self.memos):
+            changes = memos.take_changes()
+            if changes is not None:
+                changed, deleted = changes
+                if changed:
+                    state.setdefault("memos", {})[robot.name] = changed
+                if deleted:
+                    state.setdefault("memos_deleted", {})[robot.name] = deleted
         self.game_state.append(state)
 
+    def is_game_over(self):
+        return len(self.alive_robots()) <= 1 or self.turn >= self.max_turn
+
+    def winner(self):
+        """HP が最も高いロボット（同じなら登録順が後のもの）を返す"""
+        return max(reversed(self.robots), key=lambda robot: robot.hp)
+
+    def play_turn(self):
+        """次のロボットの手番を 1 つ進めて (ロボット, 行動) を返す"""
+        current_robot = self.next_robot()  # Robot1 (A) が先攻
+        self.emit(self.turn, EventCode.TURN_START, current_robot.name)
+        action, _ = self.run_logic(current_robot)
+        self.save_game_state(current_robot.name, action)  # 各ターンごとの状態を保存
+        for robot in self.robots:
+            self.emit(self.turn, EventCode.STATUS, robot.name, robot.hp, robot.sp)
+        self.turn += 1
+        return current_robot, action
+
     def game_loop(self):
-        while self.robot1.is_alive() and self.robot2.is_alive() and self.turn < self.max_turn:
-            current_robot = self.robot1 if self.turn % 2 != 0 else self.robot2 # Robot1 (A) が先攻になるように変更
-            self.log_action(self.turn, f"\n--- Turn {self.turn} : {current_robot.name} turn ---")
-            action, _ = self.run_logic(current_robot)
-            self.save_game_state(current_robot.name, action)  # 各ターンごとの状態を保存
-            self.log_action(self.turn, f" - {self.robot1.name} : HP: {self.robot1.hp}, SP: {self.robot1.sp}")
-            self.log_action(self.turn, f" - {self.robot2.name} : HP: {self.robot2.hp}, SP: {self.robot2.sp}")
-            self.turn += 1
-
-        winner = self.robot1 if self.robot1.hp > self.robot2.hp else self.robot2
-        self.log_action(self.turn, f"\n{winner.name} wins!")
-        self.log_file.close()
-
-        json.dump(self.game_state, self.game_state_file, indent=4)
-        self.game_state_file.close()
+        cycle_detector = CycleDetector() if self.detect_cycles else None
+        self.cycle_detected_at = None
+        self._turn_observed = False
+        while not self.is_game_over():
+            self.play_turn()
+            if self.writer is not None:
+                self._write_pending_log(LOG_BATCH_EVENTS)
+
+            if cycle_detector is not None and not self._turn_observed and cycle_detector.step(self.cycle_key()):
+                # 以降は同じ局面を繰り返すだけで HP も変わらないので、ここで勝敗が決まる
+                self.cycle_detected_at = self.turn
+                self.emit(self.turn, EventCode.CYCLE)
+                break
+
+        winner = self.winner()
+        self.emit(self.turn, EventCode.WIN, winner.name)
+        self._write_game_state()
+        self._close_output_files()
         return winner, self.game_state
 
     def build_game_info(self, robot):
         """
         指定した robot から見たゲーム状況を辞書で返す。
+        ・enemy_* には最も近い敵の情報を入れる
+        ・enemies には生存している全ての敵の情報をリストで入れる
         ・スキャン中なら敵 SP や罠の座標も渡す
         ・敵がカモフラージュ中で、自分がスキャンしていない場合は
-          敵の位置を None にして隠す
+          敵の位置を最後に知られている位置にして隠す
         """
-        enemy = self.robot1 if robot is self.robot2 else self.robot2
+        enemy = self.nearest_enemy(robot)
 
         info = {
             "turn":            self.turn,
             "enemy_hp":        enemy.hp,
-            "enemy_position":  enemy.position,   # 後で条件付きで None にする
+            "enemy_position":  self._visible_position(robot, enemy),
             "max_turn":        self.max_turn,
             "board_size":      {"x_max": self.x_max, "y_max": self.y_max},
         }
 
-        # カモフラージュによる位置隠蔽
-        if not robot.scan.is_active and enemy.camouflage.is_active:
-            info["enemy_position"] = enemy.camouflage.last_known_position  # 最後に知られている位置を使用
-
         # スキャンしていれば追加情報を開示
         if robot.scan.is_active:
             info["enemy_sp"]    = enemy.sp
-            info["enemy_traps"] = enemy.trap.traps.copy()
-
+            info["enemy_traps"] = enemy.trap.traps  # 読み取り専用のスナップショット
+
+        enemies = []
+        for other in self.enemies_of(robot):
+            enemy_info = {
+                "name":     other.name,
+                "hp":       other.hp,
+                "position": self._visible_position(robot, other),
+            }
+            if robot.scan.is_active:
+                enemy_info["sp"]    = other.sp
+                enemy_info["traps"] = other.trap.traps
+            enemies.append(enemy_info)
+        info["enemies"] = enemies
+
+        if self.detect_cycles:
+            return TurnWatchingInfo(info, self)
         return info
 
+    @staticmethod
+    def _visible_position(robot, enemy):
+        """カモフラージュ中の敵は、スキャンしていなければ最後に知られている位置を返す"""
+        if not robot.scan.is_active and enemy.camouflage.is_active:
+            return enemy.camouflage.last_known_position
+        return enemy.position
+
+    def snapshot(self, include_rng=True):
+        """現在の試合状態を不変の GameSnapshot として返す
+
+        ロボットの状態・罠・メモ・ターン・行動順・乱数の状態を含む。
+        ログファイルへの出力は含まない。
+        """
+        board = self.board
+        return GameSnapshot(
+            turn=self.turn,
+            order_cursor=self._order_cursor,
+            turn_order=tuple(self.turn_order),
+            robots=tuple(tuple(robot._state) for robot in self.robots),
+            on_board=tuple(board.robot_at(robot.x, robot.y) == robot._board_id for robot in self.robots),
+            traps=tuple(robot.trap.snapshot() for robot in self.robots),
+            memos=tuple(memos.snapshot() for memos in self.memos),
+            rng_state=random.getstate() if include_rng else None,
+            game_state_length=len(self.game_state),
+            event_count=None if self.events is None else len(self.events),
+        )
+
+    def restore(self, snapshot):
+        """snapshot() で保存した状態に戻す（以降に記録された game_state は捨てる）"""
+        if len(snapshot.robots) != len(self.robots):
+            raise ValueError("Snapshot does not match the registered robots.")
+
+        board = self.board
+        # 入れ替わりに備えて、先に全員を盤面から外してから置き直す
+        for robot in self.robots:
+            if board.robot_at(robot.x, robot.y) == robot._board_id:
+                board.remove_robot(robot._board_id, robot.x, robot.y)
+        for robot, state, on_board in zip(self.robots, snapshot.robots, snapshot.on_board):
+            robot._state[:] = state
+            if on_board:
+                board.place_robot(robot._board_id, robot.x, robot.y)
+        for robot, traps in zip(self.robots, snapshot.traps):
+            robot.trap.restore(traps)
+        for memos, saved in zip(self.memos, snapshot.memos):
+            memos.restore(saved)
+
+        self.turn = snapshot.turn
+        self._order_cursor = snapshot.order_cursor
+        self.turn_order = list(snapshot.turn_order)
+        if snapshot.rng_state is not None:
+            random.setstate(snapshot.rng_state)
+        del self.game_state[snapshot.game_state_length:]
+        if self.events is not None and snapshot.event_count is not None:
+            del self.events[snapshot.event_count:]
+            self._events_written = min(self._events_written, snapshot.event_count)
+
+    def cycle_key(self):
+        """ターン数を除いた完全な局面（乱数の状態はハッシュ値で代用する）"""
+        snapshot = self.snapshot()
+        return snapshot._replace(turn=None, game_state_length=None, event_count=None, rng_state=hash(snapshot.rng_state))
+
+    def enable_hashing(self):
+        """状態の Zobrist ハッシュを差分更新で保持するようにする（set_robots の後に呼ぶ）"""
+        hasher = ZobristHasher()
+        for robot in self.robots:
+            robot._state = HashedState(robot._state, hasher, robot._board_id)
+            for position in robot.trap.traps:
+                hasher.toggle_trap(robot._board_id, position)
+        self.zobrist = hasher
+        return hasher
+
+    def enable_metrics(self, metrics=None):
+        """行動の回数やターンの所要時間の計測を有効にして、集計先の EngineMetrics を返す"""
+        if self.metrics is not None:
+            return self.metrics
+        self.metrics = EngineMetrics() if metrics is None else metrics
+        self.metrics.instrument(self)
+        return self.metrics
+
+    def state_hash(self):
+        """ロボットの状態・罠・ターンの偶奇から求めた 64 ビットのハッシュ値"""
+        if self.zobrist is None:
+            raise RuntimeError("Call enable_hashing() before state_hash().")
+        return self.zobrist.hash(self.turn)
+
     def reset(self):
         """試合を完全リセットして新しいゲームを開始できるようにする"""
 
         # 1) ターンとメモをクリア
         self.turn   = 0
-        self.memos1 = {}
-        self.memos2 = {}
+        self.memos  = [self._new_memos() for _ in self.robots]
+        self._order_cursor = 0
 
         # 2) ロボットを初期位置・初期ステータスに戻す
-        for robot, init_pos in (
-            (self.robot1, self.robot1_initial_position),
-            (self.robot2, self.robot2_initial_position),
-        ):
-            if robot is not None:
-                # Robot クラス内の reset に委譲
-                robot.reset(init_pos["x"], init_pos["y"])
+        #    (1, 2 体目は robot1/robot2_initial_position、3 体目以降は登録時の位置)
+        initial_positions = [self.robot1_initial_position, self.robot2_initial_position]
+        initial_positions += self._initial_positions[2:]
+        for robot, init_pos in zip(self.robots, initial_positions):
+            # Robot クラス内の reset に委譲
+            robot.reset(init_pos["x"], init_pos["y"])
+        for board_id, robot in enumerate(self.robots, start=1):
+            self.board.place_robot(board_id, robot.x, robot.y)
 
         # 3) ゲームステートを初期化
         self.game_state = [{
@@ -225,14 +585,12 @@ class GameController:
             }
         }]
 
-        # 4) ログファイル／ステートファイルをクリア（追記でなく新規）
-        if not self.log_file.closed:
-            self.log_file.close()
-        self.log_file = open("game_log.txt", "w")
-
-        if not self.game_state_file.closed:
-            self.game_state_file.close()
-        self.game_state_file = open("game_state.json", "w")
+        # 4) 書き残したログを出してから、出来事の記録とログファイル／ステートファイルをクリア（追記でなく新規）
+        self._close_output_files()
+        if self.events is not None:
+            self.events.clear()
+        self._events_written = 0
+        self._open_output_files()
 
         # 5) 完了メッセージ（任意）
-        print("[GameController] Reset complete. Ready for a new match.")
\ No newline at end of file
+        self.debug("[GameController] Reset complete. Ready for a new match.")
\ No newline at end of file
@@ -0,0 +1,68 @@
+"""千日手（同じ局面の繰り返し）の検出
+
+ロボットの状態・罠・メモ・行動順・乱数の状態がすべて一致する局面に戻ったら、
+ロボットのロジックが決定的である限り以降も同じ手順を繰り返す。
+HP は減ることしかないので、繰り返しの間 HP は変わらず、勝敗もその時点で確定する。
+
+局面を全部覚えずに済むよう Brent の方法で比較する（覚える局面は常に 1 つ）。
+"""
+
+
+class CycleDetector:
+    def __init__(self):
+        self._saved = None
+        self._power = 1
+        self._length = 0
+
+    def step(self, key):
+        """次の局面のキーを渡し、以前の局面と一致したら True を返す"""
+        if key == self._saved:
+            return True
+        self._length += 1
+        if self._length >= self._power:
+            self._saved = key
+            self._power *= 2
+            self._length = 0
+        return False
+
+
+class TurnWatchingInfo(dict):
+    """ロジックが turn を読んだかを記録する game_info
+
+    turn によって行動を変えるロジックでは、同じ局面でも次の手が同じとは限らないため、
+    読まれた時点で繰り返しの検出をやめる。
+    """
+    __slots__ = ("_controller",)
+
+    def __init__(self, info, controller):
+        super().__init__(info)
+        self._controller = controller
+
+    def _observe(self):
+        self._controller._turn_observed = True
+
+    def __getitem__(self, key):
+        if key == "turn":
+            self._observe()
+        return super().__getitem__(key)
+
+    def get(self, key, default=None):
+        if key == "turn":
+            self._observe()
+        return super().get(key, default)
+
+    def __iter__(self):
+        self._observe()
+        return super().__iter__()
+
+    def items(self):
+        self._observe()
+        return super().items()
+
+    def values(self):
+        self._observe()
+        return super().values()
+
+    def copy(self):
+        self._observe()
+        return dict(self)
@@ -1,6 +1,7 @@
 import json
 import os
 from collections import defaultdict
+from functools import lru_cache
 from typing import Dict, List, Tuple
 
 import matplotlib.pyplot as plt
@@ -46,10 +47,53 @@ def add_image_to_plot(
     else:
         ax.scatter(x, y, color=fallback_color, s=100, marker=marker, edgecolors="black")
 
+
+@lru_cache(maxsize=None)
+def _load_sprites() -> Dict[str, object]:
+    """スプライトを読み込む（描画のたびにディスクを読まないようキャッシュする）"""
+    asset_dir = "./pcrb/asset"
+    return {
+        "tile": safe_load_image(os.path.join(asset_dir, "tile.png")),
+        "robot_a": safe_load_image(os.path.join(asset_dir, "red_robot.png")),
+        "robot_b": safe_load_image(os.path.join(asset_dir, "blue_robot.png")),
+        "attack": safe_load_image(os.path.join(asset_dir, "attack.png")),
+        "rest": safe_load_image(os.path.join(asset_dir, "rest.png")),
+        "move": safe_load_image(os.path.join(asset_dir, "move.png")),
+        "defend": safe_load_image(os.path.join(asset_dir, "defend.png")),
+        "parry": safe_load_image(os.path.join(asset_dir, "parry.png")),
+        "ranged_attack": safe_load_image(os.path.join(asset_dir, "ranged_attack.png")),
+        "trap": safe_load_image(os.path.join(asset_dir, "trap.png")),
+        "steal": safe_load_image(os.path.join(asset_dir, "steal.png")),
+        "teleport": safe_load_image(os.path.join(asset_dir, "teleport.png")),
+        "camouflage": safe_load_image(os.path.join(asset_dir, "camouflage.png")),
+        "scan": safe_load_image(os.path.join(asset_dir, "scan.png")),
+    }
+
 ###############################################################################
 # 共通ヘルパ
 ###############################################################################
 
+# これを超えるマス数の盤面では、タイルを 1 枚ずつ描かずに背景を 1 枚の画像で描く
+LARGE_BOARD_CELLS = 400
+# スプライトの大きさが 1 マスに収まる盤面の一辺
+BASE_BOARD_SIZE = 9
+
+
+def is_large_board(x_max: int, y_max: int) -> bool:
+    return x_max * y_max > LARGE_BOARD_CELLS
+
+
+def _board_ticks(size: int) -> np.ndarray:
+    """目盛り位置を返す。大きな盤面では目盛りを約 10 個に間引く。"""
+    step = max(1, size // 10) if size > 20 else 1
+    return np.arange(0, size, step)
+
+
+def _sprite_zoom(x_max: int, y_max: int, zoom: float) -> float:
+    """盤面が大きいほどスプライトを縮小して 1 マスに収める。"""
+    return zoom * min(1.0, BASE_BOARD_SIZE / max(x_max, y_max))
+
+
 def _direction_offset(direction: str) -> Tuple[int, int]:
     """移動／罠の方向を (dx, dy) で返します。"""
     mapping = {
@@ -163,8 +207,8 @@ def draw_board(turn_data: dict, x_max: int, y_max: int, *, title: str = "", is_s
     cmap = plt.colormaps.get_cmap("coolwarm").resampled(3)
     plt.imshow(board, cmap=cmap, origin="upper")
     plt.clim(0, 2)
-    plt.xticks(np.arange(0, x_max, 1))
-    plt.yticks(np.arange(0, y_max, 1))
+    plt.xticks(_board_ticks(x_max))
+    plt.yticks(_board_ticks(y_max))
     plt.grid(color="gray", linestyle="-", linewidth=0.5)
 
     # アクション→色
@@ -210,26 +254,9 @@ def draw_board_v2(
     robot_positions = _collect_robot_positions(turn_data)
     markers = _collect_action_targets(turn_data, x_max, y_max, robot_positions)
 
-    # ----------------------------------------------------------------------
-    # スプライト読み込み
-    # ----------------------------------------------------------------------
-    asset_dir = "./pcrb/asset"
-    sprites = {
-        "tile": safe_load_image(os.path.join(asset_dir, "tile.png")),
-        "robot_a": safe_load_image(os.path.join(asset_dir, "red_robot.png")),
-        "robot_b": safe_load_image(os.path.join(asset_dir, "blue_robot.png")),
-        "attack": safe_load_image(os.path.join(asset_dir, "attack.png")),
-        "rest": safe_load_image(os.path.join(asset_dir, "rest.png")),
-        "move": safe_load_image(os.path.join(asset_dir, "move.png")),
-        "defend": safe_load_image(os.path.join(asset_dir, "defend.png")),
-        "parry": safe_load_image(os.path.join(asset_dir, "parry.png")),
-        "ranged_attack": safe_load_image(os.path.join(asset_dir, "ranged_attack.png")),
-        "trap": safe_load_image(os.path.join(asset_dir, "trap.png")),
-        "steal": safe_load_image(os.path.join(asset_dir, "steal.png")),
-        "teleport": safe_load_image(os.path.join(asset_dir, "teleport.png")),
-        "camouflage": safe_load_image(os.path.join(asset_dir, "camouflage.png")),
-        "scan": safe_load_image(os.path.join(asset_dir, "scan.png")),
-    }
+    sprites = _load_sprites()
+    large_board = is_large_board(x_max, y_max)
+    sprite_zoom = _sprite_zoom(x_max, y_max, 0.9)
 
     # ----------------------------------------------------------------------
     # Figure / Axes 準備
@@ -238,18 +265,25 @@ def draw_board_v2(
     fig.patch.set_facecolor("black")
     ax.set_facecolor("black")
     ax.tick_params(colors="white")
+    ax.set_xticks(_board_ticks(x_max))
+    ax.set_yticks(_board_ticks(y_max))
+    ax.grid(color="gray", linestyle="-", linewidth=0.5)
+
+    # 背景タイル（大きな盤面では 1 枚の画像で描いて描画コストを一定に保つ）
+    if large_board:
+        ax.imshow(
+            np.full((y_max, x_max), 0.27), cmap="gray", vmin=0.0, vmax=1.0,
+            origin="lower", extent=(-0.5, x_max - 0.5, -0.5, y_max - 0.5), zorder=0,
+        )
+    else:
+        for x in range(x_max):
+            for y in range(y_max):
+                add_image_to_plot(ax, sprites["tile"], x, y, zoom=1.0, fallback_color="#444")
+
     ax.set_xlim(-0.5, x_max - 0.5)
     ax.set_ylim(-0.5, y_max - 0.5)
-    ax.set_xticks(np.arange(0, x_max, 1))
-    ax.set_yticks(np.arange(0, y_max, 1))
-    ax.grid(color="gray", linestyle="-", linewidth=0.5)
     ax.set_aspect("equal")
 
-    # 背景タイル
-    for x in range(x_max):
-        for y in range(y_max):
-            add_image_to_plot(ax, sprites["tile"], x, y, zoom=1.0, fallback_color="#444")
-
     # ----------------------------------------------------------------------
     # ロボット描画
     # ----------------------------------------------------------------------
@@ -260,7 +294,7 @@ def draw_board_v2(
         else:
             sprite = sprites["robot_b"]
             fallback = "lightblue"
-        add_image_to_plot(ax, sprite, x, y, zoom=0.9, fallback_color=fallback)
+        add_image_to_plot(ax, sprite, x, y, zoom=sprite_zoom, fallback_color=fallback)
 
     # ----------------------------------------------------------------------
     # アクションハイライト描画
@@ -282,7 +316,7 @@ def draw_board_v2(
     for key, positions in markers.items():
         sprite = sprites.get(key)
         for y, x in positions:
-            add_image_to_plot(ax, sprite, x, y, zoom=0.9, fallback_color=colour_fallback[key])
+            add_image_to_plot(ax, sprite, x, y, zoom=sprite_zoom, fallback_color=colour_fallback[key])
 
     # ----------------------------------------------------------------------
     # タイトル／表示
@@ -293,3 +327,4 @@ def draw_board_v2(
         plt.show()
 
     return fig
+
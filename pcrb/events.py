@@ -0,0 +1,166 @@
+"""試合中の出来事を表す構造化イベント
+
+エンジンは文章を組み立てずに (ターン, 出来事のコード, 行動したロボットの名前, 数値などの引数) を記録する。
+人が読む文章は、ログを表示・書き出すときに EVENT_TEMPLATES から組み立てる。
+
+    for event in filter_events(controller.events, codes={EventCode.ATTACK}, actor="Robot A"):
+        print(render_event(event))
+"""
+import enum
+from typing import NamedTuple
+
+
+class EventCode(enum.IntEnum):
+    TEXT = 0  # log_action に渡された任意の文言
+    TURN_START = 1
+    STATUS = 2
+    CYCLE = 3
+    WIN = 4
+    ATTACK = 10
+    ATTACK_OUT_OF_RANGE = 11
+    ATTACK_NO_SP = 12
+    MOVE = 20
+    MOVE_BLOCKED = 21
+    MOVE_INVALID_DIRECTION = 22
+    MOVE_NO_SP = 23
+    DEFEND = 30
+    DEFEND_NO_SP = 31
+    RANGED_ATTACK = 40
+    RANGED_ATTACK_OUT_OF_RANGE = 41
+    RANGED_ATTACK_NO_SP = 42
+    PARRY = 50
+    PARRY_COOLDOWN = 51
+    PARRY_NO_SP = 52
+    REST = 60
+    TRAP = 70
+    TRAP_OCCUPIED = 71
+    TRAP_EXISTS = 72
+    TRAP_INVALID_DIRECTION = 73
+    TRAP_NO_SP = 74
+    TRAP_TRIGGERED = 75
+    STEAL = 80
+    STEAL_NOTHING = 81
+    STEAL_OUT_OF_RANGE = 82
+    STEAL_NO_SP = 83
+    TELEPORT = 90
+    TELEPORT_OCCUPIED = 91
+    TELEPORT_NO_SP = 92
+    CAMOUFLAGE = 100
+    CAMOUFLAGE_ALREADY_ACTIVE = 101
+    CAMOUFLAGE_NO_SP = 102
+    CAMOUFLAGE_END = 103
+    SCAN_NO_SP = 110
+    SCAN_END = 111
+
+
+# コード → 文章のひな形（{actor} と {turn} 以外は引数を順に埋める）
+EVENT_TEMPLATES = {
+    EventCode.TEXT: "{0}",
+    EventCode.TURN_START: "\n--- Turn {turn} : {actor} turn ---",
+    EventCode.STATUS: " - {actor} : HP: {0}, SP: {1}",
+    EventCode.CYCLE: "\nThe same position repeats. The match is decided here.",
+    EventCode.WIN: "\n{actor} wins!",
+    EventCode.ATTACK: "{actor} attacks {0} at ({1}, {2}) for {3} damage.",
+    EventCode.ATTACK_OUT_OF_RANGE: "{actor} tried to attack a non-adjacent location.",
+    EventCode.ATTACK_NO_SP: "{actor} does not have enough SP to attack!",
+    EventCode.MOVE: "{actor} moved {0} to ({1}, {2}), HP: {3}, SP: {4}",
+    EventCode.MOVE_BLOCKED: "{actor} tried to move to ({0}, {1}), but the path is blocked.",
+    EventCode.MOVE_INVALID_DIRECTION: "{actor} tried to move in an invalid direction.",
+    EventCode.MOVE_NO_SP: "{actor} does not have enough SP to move!",
+    EventCode.DEFEND: "{actor} is now in defense mode, reducing incoming damage.",
+    EventCode.DEFEND_NO_SP: "{actor} does not have enough SP to defend!",
+    EventCode.RANGED_ATTACK: "{actor} performs a ranged attack on {0} for {1} damage!",
+    EventCode.RANGED_ATTACK_OUT_OF_RANGE:
+        "{actor} cannot perform a ranged attack on {0} due to incorrect distance (distance: {1}).",
+    EventCode.RANGED_ATTACK_NO_SP: "{actor} does not have enough SP to perform a ranged attack!",
+    EventCode.PARRY: "{actor} started parrying!",
+    EventCode.PARRY_COOLDOWN: "{actor}'s parry is on cooldown.",
+    EventCode.PARRY_NO_SP: "{actor} doesn't have enough SP.",
+    EventCode.REST: "{actor} rests and recovers {0} SP. Total SP: {1}",
+    EventCode.TRAP: "{actor} set a trap at {0}.",
+    EventCode.TRAP_OCCUPIED: "{actor} tried to set a trap at {0}, but the position is occupied.",
+    EventCode.TRAP_EXISTS: "{actor} tried to set a trap at {0}, but a trap is already there.",
+    EventCode.TRAP_INVALID_DIRECTION: "{actor} tried to set a trap in an invalid direction.",
+    EventCode.TRAP_NO_SP: "{actor} does not have enough SP to set a trap!",
+    EventCode.TRAP_TRIGGERED: "{actor} stepped on a trap and took {0} damage!",
+    EventCode.STEAL: "{actor} steals {0} SP from {1}.",
+    EventCode.STEAL_NOTHING: "{0} has no SP to steal!",
+    EventCode.STEAL_OUT_OF_RANGE: "{actor} tried to steal from a non-adjacent target.",
+    EventCode.STEAL_NO_SP: "{actor} does not have enough SP to steal!",
+    EventCode.TELEPORT: "{actor} teleported to ({0}, {1}).",
+    EventCode.TELEPORT_OCCUPIED: "{actor} tried to teleport to ({0}, {1}), but the position is occupied.",
+    EventCode.TELEPORT_NO_SP: "{actor} does not have enough SP to teleport!",
+    EventCode.CAMOUFLAGE: "{actor} activates camouflage and hides its position for {0} turns!",
+    EventCode.CAMOUFLAGE_ALREADY_ACTIVE: "{actor} is already camouflaged!",
+    EventCode.CAMOUFLAGE_NO_SP: "{actor} does not have enough SP to activate camouflage!",
+    EventCode.CAMOUFLAGE_END: "{actor}'s camouflage has worn off.",
+    EventCode.SCAN_NO_SP: "{actor} does not have enough SP to scan!",
+    EventCode.SCAN_END: "{actor}'s scan effect has worn off.",
+}
+
+# 行動が何も起こさなかったことを表すコード → 失敗の理由
+NOT_ENOUGH_SP = "not_enough_sp"
+EVENT_FAILURES = {
+    EventCode.ATTACK_NO_SP: NOT_ENOUGH_SP,
+    EventCode.MOVE_NO_SP: NOT_ENOUGH_SP,
+    EventCode.DEFEND_NO_SP: NOT_ENOUGH_SP,
+    EventCode.RANGED_ATTACK_NO_SP: NOT_ENOUGH_SP,
+    EventCode.PARRY_NO_SP: NOT_ENOUGH_SP,
+    EventCode.TRAP_NO_SP: NOT_ENOUGH_SP,
+    EventCode.STEAL_NO_SP: NOT_ENOUGH_SP,
+    EventCode.TELEPORT_NO_SP: NOT_ENOUGH_SP,
+    EventCode.CAMOUFLAGE_NO_SP: NOT_ENOUGH_SP,
+    EventCode.SCAN_NO_SP: NOT_ENOUGH_SP,
+    EventCode.MOVE_BLOCKED: "blocked",
+    EventCode.TRAP_OCCUPIED: "occupied",
+    EventCode.TELEPORT_OCCUPIED: "occupied",
+    EventCode.TRAP_EXISTS: "trap_exists",
+    EventCode.ATTACK_OUT_OF_RANGE: "out_of_range",
+    EventCode.RANGED_ATTACK_OUT_OF_RANGE: "out_of_range",
+    EventCode.STEAL_OUT_OF_RANGE: "out_of_range",
+    EventCode.MOVE_INVALID_DIRECTION: "invalid_direction",
+    EventCode.TRAP_INVALID_DIRECTION: "invalid_direction",
+    EventCode.PARRY_COOLDOWN: "cooldown",
+    EventCode.CAMOUFLAGE_ALREADY_ACTIVE: "already_active",
+    EventCode.STEAL_NOTHING: "nothing_to_steal",
+}
+
+
+class Event(NamedTuple):
+    turn: int
+    code: EventCode
+    actor: object  # 行動したロボットの名前（試合全体の出来事なら None）
+    args: tuple    # ひな形に埋める値（数値・座標・相手の名前など）
+
+
+def render_event(event):
+    """イベントを人が読む文章にする"""
+    return EVENT_TEMPLATES[event.code].format(*event.args, actor=event.actor, turn=event.turn)
+
+
+def render_log(events):
+    """game_log.txt と同じ形式の行を返す"""
+    for event in events:
+        yield f"Turn {event.turn}: {render_event(event)}\n"
+
+
+def filter_events(events, codes=None, actor=None, turns=None):
+    """コード・ロボットの名前・ターンの範囲 (range など) で絞り込む"""
+    for event in events:
+        if codes is not None and event.code not in codes:
+            continue
+        if actor is not None and event.actor != actor:
+            continue
+        if turns is not None and event.turn not in turns:
+            continue
+        yield event
+
+
+def event_to_dict(event):
+    """JSON に書き出せる辞書にする"""
+    return {
+        "turn": event.turn,
+        "code": event.code.name,
+        "actor": event.actor,
+        "args": list(event.args),
+    }
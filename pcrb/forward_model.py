@@ -0,0 +1,166 @@
+"""探索用のフォワードモデル
+
+本番の GameController の状態を、ログもファイル出力もしない影のコントローラに写し、
+行動を 1 手ずつ適用して先の局面を調べる。本番の状態には一切触れない。
+
+    model = ForwardModel.from_controller(controller)
+    model.load(controller.snapshot(include_rng=False), seat)
+    for action in model.legal_actions():
+        ...
+"""
+from action_registry import ACTION_REGISTRY
+from action_registry import TARGET_ADJACENT
+from action_registry import TARGET_RANGED
+from board import ADJACENT_OFFSETS
+from board import RANGED_OFFSETS
+from controller import GameController
+from robot import Robot
+from robot_state import INITIAL_HP
+
+STUN = "stun"
+
+# 行動名 → コストを持つ Robot の属性名（同じ名前の属性はここに書かなくてよい）
+ACTION_ATTRIBUTES = {
+    "up": "move", "down": "move", "left": "move", "right": "move",
+    "trap_up": "trap", "trap_down": "trap", "trap_left": "trap", "trap_right": "trap",
+}
+
+
+class ForwardModel:
+    def __init__(self, max_turn, x_max, y_max, names, action_registry=None):
+        """
+        :param names: ロボットの名前（登録順）
+        :param action_registry: 本番と同じ行動表（省略時は既定の表）
+        """
+        self.controller = GameController(
+            max_turn=max_turn, x_max=x_max, y_max=y_max,
+            action_registry=ACTION_REGISTRY if action_registry is None else action_registry,
+            verbose=False, log_path=None, game_state_path=None)
+        robots = [Robot(name, index % x_max, index // x_max, None, self.controller) for index, name in enumerate(names)]
+        self.controller.events = None  # 探索中の出来事は記録しない
+        self.controller.set_robots(*robots)
+        self.controller.board.clear()
+        self.controller.enable_hashing()
+        self.current = None  # 次に行動するロボット
+        self._candidates_by_seat = {}
+
+    @classmethod
+    def from_controller(cls, controller):
+        return cls(
+            controller.max_turn, controller.x_max, controller.y_max,
+            [robot.name for robot in controller.robots], controller.action_registry)
+
+    def config(self):
+        """別プロセスで同じモデルを作るための引数（既定の行動表を使う前提）"""
+        controller = self.controller
+        return controller.max_turn, controller.x_max, controller.y_max, [robot.name for robot in controller.robots]
+
+    @property
+    def robots(self):
+        return self.controller.robots
+
+    def load(self, snapshot, seat):
+        """snapshot の局面で seat のロボットが行動する直前の状態にする"""
+        self.controller.restore(snapshot)
+        self.current = self.controller.robots[seat]
+
+    @property
+    def current_seat(self):
+        return self.controller.seat_of(self.current)
+
+    def state_hash(self):
+        return self.controller.state_hash()
+
+    def is_terminal(self):
+        return self.current is None or self.controller.is_game_over()
+
+    def _candidates(self, robot):
+        """席ごとの行動候補 (名前, コスト, 対象, 移動先のオフセット, 罠か) を一度だけ作る"""
+        seat = self.controller.seat_of(robot)
+        candidates = self._candidates_by_seat.get(seat)
+        if candidates is None:
+            controller = self.controller
+            board = controller.board
+            candidates = []
+            for name in controller.action_registry.names():
+                if controller.adjust_action(robot, name) != name:
+                    continue
+                action = getattr(robot, ACTION_ATTRIBUTES.get(name, name), None)
+                cost = getattr(action, "cost", 0)
+                offset = board.move_offsets.get(name) or board.trap_offsets.get(name)
+                candidates.append((name, cost, controller.action_registry.get(name).target, offset,
+                                   name in board.trap_offsets))
+            self._candidates_by_seat[seat] = candidates
+        return candidates
+
+    def legal_actions(self):
+        """現在のロボットが意味のある結果を得られる行動の一覧
+
+        SP が足りない行動・届かない攻撃・動けない移動のように何も起こらない行動と、
+        後攻の読み替えで重複する行動は除く。スタン中は "stun" だけを返す。
+        """
+        controller = self.controller
+        robot = self.current
+        if robot.stun_counter > 0:
+            return [STUN]
+
+        board = controller.board
+        x_max, y_max = board.x_max, board.y_max
+        robot_grid, trap_grid = board.robot_grid, board.trap_grid
+        sp = robot.sp
+        x, y = robot.position
+        adjacent = ranged = None
+        actions = []
+        for name, cost, target, offset, is_trap in self._candidates(robot):
+            if cost > sp:
+                continue
+            if target == TARGET_ADJACENT:
+                if adjacent is None:
+                    adjacent = bool(controller.enemies_around(robot, ADJACENT_OFFSETS))
+                if not adjacent:
+                    continue
+            elif target == TARGET_RANGED:
+                if ranged is None:
+                    ranged = bool(controller.enemies_around(robot, RANGED_OFFSETS))
+                if not ranged:
+                    continue
+            if offset is not None:
+                # 盤外に向かう移動・罠は自分のマスに留まるので何も起こらない
+                nx, ny = x + offset[0], y + offset[1]
+                if not (0 <= nx < x_max and 0 <= ny < y_max):
+                    continue
+                index = ny * x_max + nx
+                if robot_grid[index] or (is_trap and trap_grid[index]):
+                    continue
+            if name == "parry" and (robot.parry.is_active or robot.parry.cooldown_counter > 0):
+                continue
+            actions.append(name)
+        return actions
+
+    def step(self, action):
+        """現在のロボットに（読み替え済みの）行動をさせ、手番を進める"""
+        controller = self.controller
+        robot = self.current
+        controller.check_traps(robot)
+        controller.apply_action(robot, action)
+        controller.turn += 1
+        self.current = None if controller.is_game_over() else controller.next_robot()
+
+    def reward(self, seat):
+        """seat のロボットから見た局面の評価値 (0〜1)
+
+        終局していれば勝ちで 1、負けで 0。途中なら HP 差から求め、
+        差がつかない局面を見分けるために敵との距離が近いほどわずかに高くする。
+        """
+        controller = self.controller
+        me = controller.robots[seat]
+        if controller.is_game_over():
+            return 1.0 if controller.winner() is me else 0.0
+        enemy = controller.nearest_enemy(me)
+        if enemy is None:
+            return 1.0
+        best_enemy_hp = max(robot.hp for robot in controller.enemies_of(me))
+        distance = abs(me.x - enemy.x) + abs(me.y - enemy.y)
+        value = (0.5 + 0.45 * (max(me.hp, 0) - best_enemy_hp) / INITIAL_HP
+                 - 0.05 * distance / (controller.x_max + controller.y_max))
+        return min(max(value, 0.0), 1.0)
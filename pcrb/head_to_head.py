@@ -0,0 +1,147 @@
+"""2 つのロジックの優劣を逐次検定 (SPRT) で判定する対戦ランナー
+
+先攻・後攻を入れ替えた 2 試合を 1 組とし、同じ組の 2 試合は同じ乱数シードで行う
+（共通乱数法）。組ごとのスコアに対して SPRT を行い、結論が出た時点で打ち切る。
+
+    result = compare(logic_a, logic_b)
+    result.decision   # "A" / "B" / "equal" / "undecided"
+"""
+import math
+import random
+from statistics import NormalDist
+
+from arena import FIRST
+from arena import play_match
+
+A_BETTER = "A"
+B_BETTER = "B"
+EQUAL = "equal"
+UNDECIDED = "undecided"
+
+
+class HeadToHeadResult:
+    __slots__ = ("decision", "pairs", "score", "interval", "confidence", "llr_a", "llr_b", "pair_scores")
+
+    def __init__(self, decision, pairs, score, interval, confidence, llr_a, llr_b, pair_scores):
+        self.decision = decision
+        self.pairs = pairs
+        self.score = score            # 組あたりの A の平均スコア (0〜1)
+        self.interval = interval      # score の信頼区間
+        self.confidence = confidence  # 平均スコアが 0.5 からずれている側が正しい確率の近似
+        self.llr_a = llr_a
+        self.llr_b = llr_b
+        self.pair_scores = pair_scores
+
+    @property
+    def matches(self):
+        return 2 * self.pairs
+
+    def __repr__(self):
+        return (f"HeadToHeadResult(decision={self.decision}, matches={self.matches}, score={self.score:.3f}, "
+                f"interval=({self.interval[0]:.3f}, {self.interval[1]:.3f}), confidence={self.confidence:.3f})")
+
+
+class SequentialTest:
+    """組ごとのスコア (0, 0.5, 1) の平均についての両側 SPRT
+
+    H0: 平均 = 0.5 に対して、H_A: 0.5 + delta（A が強い）と H_B: 0.5 - delta（B が強い）を
+    それぞれ正規近似の対数尤度比で検定する。
+    """
+
+    def __init__(self, delta=0.1, alpha=0.05, beta=0.05, min_pairs=5, min_variance=0.01):
+        """
+        :param delta: 差があるとみなす平均スコアのずれ
+        :param alpha: 第 1 種の誤り（差がないのに差ありとする）の確率
+        :param beta: 第 2 種の誤り（差があるのに見逃す）の確率
+        :param min_pairs: 判定を始めるまでに必要な組数
+        :param min_variance: 分散の下限（結果が毎回同じでも対数尤度比が発散しないようにする）
+        """
+        self.delta = delta
+        self.min_pairs = min_pairs
+        self.min_variance = min_variance
+        self.lower = math.log(beta / (1 - alpha))
+        self.upper = math.log((1 - beta) / alpha)
+        self.count = 0
+        self.total = 0.0
+        self.total_squared = 0.0
+
+    def add(self, pair_score):
+        self.count += 1
+        self.total += pair_score
+        self.total_squared += pair_score ** 2
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else 0.5
+
+    @property
+    def variance(self):
+        if self.count == 0:
+            return 0.25
+        return max(self.total_squared / self.count - self.mean ** 2, self.min_variance)
+
+    def _llr(self, s0, s1):
+        return self.count * (s1 - s0) * (2 * self.mean - s0 - s1) / (2 * self.variance)
+
+    def llr(self):
+        """(H_A の対数尤度比, H_B の対数尤度比) を返す"""
+        return self._llr(0.5, 0.5 + self.delta), self._llr(0.5, 0.5 - self.delta)
+
+    def decision(self):
+        if self.count < self.min_pairs:
+            return UNDECIDED
+        llr_a, llr_b = self.llr()
+        if llr_a >= self.upper:
+            return A_BETTER
+        if llr_b >= self.upper:
+            return B_BETTER
+        if llr_a <= self.lower and llr_b <= self.lower:
+            return EQUAL
+        return UNDECIDED
+
+    def interval(self, z=1.96):
+        half_width = z * math.sqrt(self.variance / self.count) if self.count else 0.5
+        return max(self.mean - half_width, 0.0), min(self.mean + half_width, 1.0)
+
+    def confidence(self):
+        if self.count == 0:
+            return 0.5
+        return NormalDist().cdf(abs(self.mean - 0.5) / math.sqrt(self.variance / self.count))
+
+
+def play_pair(robot_logic_a, robot_logic_b, seed, play=play_match, **game_options):
+    """先攻・後攻を入れ替えた 2 試合を同じシードで行い、A のスコア (0, 0.5, 1) を返す"""
+    score = 0.0
+    random.seed(seed)
+    winner = play(robot_logic_a, robot_logic_b, **game_options)
+    score += 0.5 if winner is None else float(winner == FIRST)
+    random.seed(seed)
+    winner = play(robot_logic_b, robot_logic_a, **game_options)
+    score += 0.5 if winner is None else float(winner != FIRST)
+    return score / 2
+
+
+def compare(robot_logic_a, robot_logic_b, seed=0, max_pairs=500, play=play_match, test=None, game_options=None):
+    """A と B を組単位で戦わせ、SPRT で結論が出るか max_pairs に達したら結果を返す
+
+    呼び出し元の乱数の状態は終了時に元に戻す。
+    """
+    test = SequentialTest() if test is None else test
+    game_options = {} if game_options is None else game_options
+    pair_scores = []
+    random_state = random.getstate()
+    try:
+        decision = UNDECIDED
+        while len(pair_scores) < max_pairs:
+            pair_score = play_pair(robot_logic_a, robot_logic_b, seed + len(pair_scores), play, **game_options)
+            pair_scores.append(pair_score)
+            test.add(pair_score)
+            decision = test.decision()
+            if decision != UNDECIDED:
+                break
+    finally:
+        random.setstate(random_state)
+
+    llr_a, llr_b = test.llr()
+    return HeadToHeadResult(
+        decision, len(pair_scores), test.mean, test.interval(), test.confidence(), llr_a, llr_b, pair_scores)
@@ -0,0 +1,68 @@
+"""盤面サイズから 2 体のロボットの初期位置を決める戦略
+
+各戦略は ``strategy(x_max, y_max)`` の形で呼ばれ、
+``({'x': .., 'y': ..}, {'x': .., 'y': ..})`` を返す。
+3 体以上の配置には ``spread_positions`` を使う。
+"""
+import math
+import random
+
+
+def _check_board_size(x_max, y_max):
+    if x_max * y_max < 2:
+        raise ValueError(f"Board {x_max}x{y_max} is too small for two robots.")
+
+
+def mirrored_positions(x_max, y_max):
+    """中央の行で左右対称に向かい合う配置（9x7 では (1, 3) と (7, 3)）"""
+    _check_board_size(x_max, y_max)
+    if x_max < 2:
+        return {'x': 0, 'y': 0}, {'x': 0, 'y': y_max - 1}
+    margin = 1 if x_max >= 4 else 0
+    y = y_max // 2
+    return {'x': margin, 'y': y}, {'x': x_max - 1 - margin, 'y': y}
+
+
+def corner_positions(x_max, y_max):
+    """左上と右下の角に置く配置"""
+    _check_board_size(x_max, y_max)
+    return {'x': 0, 'y': 0}, {'x': x_max - 1, 'y': y_max - 1}
+
+
+def random_positions(x_max, y_max, rng=None):
+    """重ならないランダムな配置"""
+    _check_board_size(x_max, y_max)
+    rng = random if rng is None else rng
+    first, second = rng.sample(range(x_max * y_max), 2)
+    return ({'x': first % x_max, 'y': first // x_max},
+            {'x': second % x_max, 'y': second // x_max})
+
+
+def spread_positions(x_max, y_max, count):
+    """count 体のロボットを盤面全体に格子状に散らばせた配置を返す"""
+    cols = math.ceil(math.sqrt(count * x_max / y_max))
+    cols = min(max(cols, 1), x_max)
+    rows = math.ceil(count / cols)
+    if rows > y_max:
+        raise ValueError(f"Board {x_max}x{y_max} is too small for {count} robots.")
+    positions = []
+    for index in range(count):
+        row, col = divmod(index, cols)
+        positions.append({'x': (2 * col + 1) * x_max // (2 * cols), 'y': (2 * row + 1) * y_max // (2 * rows)})
+    return positions
+
+
+INITIAL_POSITION_STRATEGIES = {
+    "mirrored": mirrored_positions,
+    "corners": corner_positions,
+    "random": random_positions,
+}
+
+
+def resolve_initial_positions(strategy, x_max, y_max):
+    """戦略名または関数から 2 体分の初期位置を求める"""
+    if isinstance(strategy, str):
+        if strategy not in INITIAL_POSITION_STRATEGIES:
+            raise ValueError(f"Unknown initial position strategy: {strategy}")
+        strategy = INITIAL_POSITION_STRATEGIES[strategy]
+    return strategy(x_max, y_max)
@@ -0,0 +1,335 @@
+"""SQLite に保存する、途中から再開できる対戦のジョブキュー
+
+(ロボット A, ロボット B, A の席, シード) の 1 試合を 1 ジョブとして保存する。
+ワーカーはジョブをまとめて借り（リース）、結果をまとめて 1 つのトランザクションで書き込む。
+ワーカーは対戦の途中でリースを延ばし、止まってリースの期限が切れれば別のワーカーが借り直す。
+max_attempts 回失敗したジョブは諦める。
+同じデータベースを複数のプロセスから開いてよい。
+
+    queue = JobQueue("tournament.db")
+    queue.add_round_robin("league", load_robot_pool(), seeds=range(10), max_turn=100)
+    run_workers("tournament.db", workers=4)        # 止まっても、もう一度呼べば続きから
+    queue.standings("league")
+
+    python pcrb/job_queue.py tournament.db add league --seeds 10
+    python pcrb/job_queue.py tournament.db work --workers 4
+    python pcrb/job_queue.py tournament.db status league
+"""
+import argparse
+import json
+import os
+import random
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import combinations
+
+from arena import FIRST
+from arena import load_logic
+from arena import load_robot_pool
+from arena import play_match
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY,
+    tournament TEXT NOT NULL,
+    robot_a TEXT NOT NULL,
+    robot_b TEXT NOT NULL,
+    seat INTEGER NOT NULL,
+    seed INTEGER NOT NULL,
+    options TEXT NOT NULL,
+    state TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    lease_owner TEXT,
+    lease_expires REAL,
+    winner TEXT,
+    error TEXT,
+    UNIQUE (tournament, robot_a, robot_b, seat, seed)
+);
+CREATE INDEX IF NOT EXISTS jobs_state ON jobs (state, lease_expires);
+CREATE TABLE IF NOT EXISTS sources (
+    tournament TEXT NOT NULL,
+    name TEXT NOT NULL,
+    source TEXT NOT NULL,
+    PRIMARY KEY (tournament, name)
+);
+"""
+
+
+class MatchJob:
+    __slots__ = ("id", "tournament", "robot_a", "robot_b", "seat", "seed", "options")
+
+    def __init__(self, job_id, tournament, robot_a, robot_b, seat, seed, options):
+        self.id = job_id
+        self.tournament = tournament
+        self.robot_a = robot_a
+        self.robot_b = robot_b
+        self.seat = seat  # robot_a の席 (FIRST / SECOND)
+        self.seed = seed
+        self.options = json.loads(options)
+
+    def __repr__(self):
+        return f"MatchJob({self.id}, {self.robot_a!r} vs {self.robot_b!r}, seat={self.seat}, seed={self.seed})"
+
+
+class JobQueue:
+    def __init__(self, path, lease_seconds=60.0, max_attempts=3, clock=time.time):
+        """
+        :param lease_seconds: 借りたジョブを返さないまま、別のワーカーに貸し直すまでの秒数
+        :param max_attempts: ジョブを諦めるまでに貸す回数
+        :param clock: 現在時刻を返す関数（テストで差し替える）
+        """
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.clock = clock
+        # トランザクションは自分で BEGIN IMMEDIATE する（読んでから書く間に他のワーカーを割り込ませない）
+        self.connection = sqlite3.connect(path, timeout=30.0, isolation_level=None)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(SCHEMA)
+
+    def close(self):
+        self.connection.close()
+
+    def _transaction(self):
+        return _Transaction(self.connection)
+
+    # ----------------------------- 登録 -----------------------------
+
+    def add_jobs(self, tournament, matches, sources=None, **options):
+        """(ロボット A, ロボット B, A の席, シード) のジョブを登録し、新しく加えた数を返す
+
+        登録済みのジョブは無視するので、同じ呼び出しを繰り返しても重複しない。
+
+        :param sources: {ロボット名: ソースコード}（robots/ にないロボットだけ）
+        :param options: 盤面設定 (max_turn, x_max, y_max, initial_positions)
+        """
+        options = json.dumps(options, sort_keys=True)
+        with self._transaction():
+            for name, source in (sources or {}).items():
+                self.connection.execute(
+                    "INSERT OR REPLACE INTO sources (tournament, name, source) VALUES (?, ?, ?)",
+                    (tournament, name, source))
+            before = self.connection.total_changes
+            self.connection.executemany(
+                "INSERT OR IGNORE INTO jobs (tournament, robot_a, robot_b, seat, seed, options) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                ((tournament, robot_a, robot_b, seat, seed, options) for robot_a, robot_b, seat, seed in matches))
+            return self.connection.total_changes - before
+
+    def add_round_robin(self, tournament, robots, seeds=(0,), sources=None, **options):
+        """robots の全ての組み合わせを、先攻・後攻の両方と seeds の全てで登録する"""
+        matches = (
+            (robot_a, robot_b, seat, seed)
+            for robot_a, robot_b in combinations(sorted(robots), 2)
+            for seat in (FIRST, 1 - FIRST)
+            for seed in seeds
+        )
+        return self.add_jobs(tournament, matches, sources=sources, **options)
+
+    def sources(self, tournament):
+        rows = self.connection.execute("SELECT name, source FROM sources WHERE tournament = ?", (tournament,))
+        return dict(rows)
+
+    # ----------------------------- ワーカー -----------------------------
+
+    def claim(self, worker, batch_size=100, tournament=None):
+        """まだ終わっていないジョブを batch_size 件まで借りて返す
+
+        期限が切れたリースも借り直す。貸した回数が max_attempts に達して期限が切れたジョブは失敗にする。
+        """
+        now = self.clock()
+        condition = "" if tournament is None else " AND tournament = ?"
+        parameters = () if tournament is None else (tournament,)
+        with self._transaction():
+            self.connection.execute(
+                "UPDATE jobs SET state = ?, lease_owner = NULL, lease_expires = NULL, "
+                "error = coalesce(error, 'lease expired') "
+                f"WHERE state = ? AND lease_expires < ? AND attempts >= ?{condition}",
+                (FAILED, RUNNING, now, self.max_attempts, *parameters))
+            rows = self.connection.execute(
+                f"SELECT id FROM jobs WHERE state = ?{condition} ORDER BY id LIMIT ?",
+                (PENDING, *parameters, batch_size)).fetchall()
+            if len(rows) < batch_size:
+                rows += self.connection.execute(
+                    f"SELECT id FROM jobs WHERE state = ? AND lease_expires < ?{condition} ORDER BY id LIMIT ?",
+                    (RUNNING, now, *parameters, batch_size - len(rows))).fetchall()
+            ids = [job_id for job_id, in rows]
+            self.connection.executemany(
+                "UPDATE jobs SET state = ?, lease_owner = ?, lease_expires = ?, attempts = attempts + 1 WHERE id = ?",
+                ((RUNNING, worker, now + self.lease_seconds, job_id) for job_id in ids))
+            jobs = []
+            for start in range(0, len(ids), 500):
+                chunk = ids[start:start + 500]
+                jobs += self.connection.execute(
+                    "SELECT id, tournament, robot_a, robot_b, seat, seed, options FROM jobs "
+                    f"WHERE id IN ({','.join('?' * len(chunk))}) ORDER BY id", chunk).fetchall()
+        return [MatchJob(*row) for row in jobs]
+
+    def renew(self, worker, ids):
+        """借りているジョブのリースを今から lease_seconds 後まで延ばし、延ばせた数を返す
+
+        期限が切れて他のワーカーに取られたジョブや、もう返したジョブは延ばさない。
+        """
+        expires = self.clock() + self.lease_seconds
+        with self._transaction():
+            before = self.connection.total_changes
+            self.connection.executemany(
+                "UPDATE jobs SET lease_expires = ? WHERE id = ? AND state = ? AND lease_owner = ?",
+                ((expires, job_id, RUNNING, worker) for job_id in ids))
+            return self.connection.total_changes - before
+
+    def complete(self, worker, results):
+        """[(ジョブ ID, 勝ったロボット名)] をまとめて書き込み、受け付けた数を返す
+
+        リースを他のワーカーに取られたジョブの結果は捨てる（同じ試合を 2 度数えない）。
+        """
+        with self._transaction():
+            before = self.connection.total_changes
+            self.connection.executemany(
+                "UPDATE jobs SET state = ?, winner = ?, error = NULL, lease_owner = NULL, lease_expires = NULL "
+                "WHERE id = ? AND state = ? AND lease_owner = ?",
+                ((DONE, winner, job_id, RUNNING, worker) for job_id, winner in results))
+            return self.connection.total_changes - before
+
+    def fail(self, worker, job_id, error):
+        """借りたジョブを失敗として返す。max_attempts に達するまでは、また貸し出す"""
+        with self._transaction():
+            self.connection.execute(
+                "UPDATE jobs SET state = CASE WHEN attempts >= ? THEN ? ELSE ? END, error = ?, "
+                "lease_owner = NULL, lease_expires = NULL WHERE id = ? AND state = ? AND lease_owner = ?",
+                (self.max_attempts, FAILED, PENDING, error, job_id, RUNNING, worker))
+
+    # ----------------------------- 集計 -----------------------------
+
+    def progress(self, tournament=None):
+        """{状態: ジョブ数}"""
+        counts = dict.fromkeys((PENDING, RUNNING, DONE, FAILED), 0)
+        if tournament is None:
+            rows = self.connection.execute("SELECT state, COUNT(*) FROM jobs GROUP BY state")
+        else:
+            rows = self.connection.execute(
+                "SELECT state, COUNT(*) FROM jobs WHERE tournament = ? GROUP BY state", (tournament,))
+        counts.update(rows)
+        return counts
+
+    def standings(self, tournament):
+        """終わった試合の {ロボット名: (勝ち数, 試合数)}"""
+        standings = {}
+        rows = self.connection.execute(
+            "SELECT robot_a, robot_b, winner FROM jobs WHERE tournament = ? AND state = ?", (tournament, DONE))
+        for robot_a, robot_b, winner in rows:
+            for name in (robot_a, robot_b):
+                wins, matches = standings.get(name, (0, 0))
+                standings[name] = (wins + (winner == name), matches + 1)
+        return standings
+
+
+class _Transaction:
+    """BEGIN IMMEDIATE から COMMIT まで（例外なら ROLLBACK）"""
+    __slots__ = ("connection",)
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def __enter__(self):
+        self.connection.execute("BEGIN IMMEDIATE")
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.connection.execute("COMMIT" if exc_type is None else "ROLLBACK")
+
+
+def play_job(job, logics):
+    """ジョブの試合を行い、勝ったロボットの名前を返す"""
+    random.seed(job.seed)
+    logic_a, logic_b = logics[job.robot_a], logics[job.robot_b]
+    if job.seat == FIRST:
+        return job.robot_a if play_match(logic_a, logic_b, **job.options) == FIRST else job.robot_b
+    return job.robot_b if play_match(logic_b, logic_a, **job.options) == FIRST else job.robot_a
+
+
+def run_worker(path, worker=None, batch_size=100, tournament=None, **queue_options):
+    """ジョブがなくなるまで借りて対戦し、こなした数を返す"""
+    worker = worker or f"{os.uname().nodename}:{os.getpid()}"
+    queue = JobQueue(path, **queue_options)
+    logics = {}
+    processed = 0
+    try:
+        while True:
+            jobs = queue.claim(worker, batch_size, tournament)
+            if not jobs:
+                return processed
+            renewed = queue.clock()
+            results = []
+            for job in jobs:
+                try:
+                    for name in (job.robot_a, job.robot_b):
+                        if (job.tournament, name) not in logics:
+                            source = queue.sources(job.tournament).get(name, name)
+                            logics[job.tournament, name] = load_logic(source)
+                    logic_of = {name: logics[job.tournament, name] for name in (job.robot_a, job.robot_b)}
+                    results.append((job.id, play_job(job, logic_of)))
+                except Exception as e:
+                    queue.fail(worker, job.id, f"{type(e).__name__}: {e}")
+                # バッチが長くかかってもリースが切れないよう、期限の半分が過ぎるごとに延ばす
+                now = queue.clock()
+                if now - renewed > queue.lease_seconds / 2:
+                    queue.renew(worker, [job.id for job in jobs])
+                    renewed = now
+            processed += queue.complete(worker, results)
+    finally:
+        queue.close()
+
+
+def run_workers(path, workers=1, batch_size=100, tournament=None, **queue_options):
+    """workers 個のプロセスで run_worker を走らせ、こなした数の合計を返す"""
+    if workers <= 1:
+        return run_worker(path, batch_size=batch_size, tournament=tournament, **queue_options)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(run_worker, path, None, batch_size, tournament, **queue_options)
+            for _ in range(workers)
+        ]
+        return sum(future.result() for future in futures)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Resumable robot battle tournaments")
+    parser.add_argument("database")
+    commands = parser.add_subparsers(dest="command", required=True)
+    add = commands.add_parser("add", help="robots/ の総当たりを登録する")
+    add.add_argument("tournament")
+    add.add_argument("--seeds", type=int, default=1)
+    add.add_argument("--max-turn", type=int, default=100)
+    work = commands.add_parser("work", help="ジョブがなくなるまで対戦する")
+    work.add_argument("--workers", type=int, default=1)
+    work.add_argument("--batch-size", type=int, default=100)
+    work.add_argument("--lease-seconds", type=float, default=60.0)
+    status = commands.add_parser("status", help="進み具合と順位を表示する")
+    status.add_argument("tournament")
+    args = parser.parse_args()
+
+    if args.command == "add":
+        queue = JobQueue(args.database)
+        added = queue.add_round_robin(args.tournament, load_robot_pool(), seeds=range(args.seeds),
+                                      max_turn=args.max_turn)
+        print(f"Added {added} jobs.")
+    elif args.command == "work":
+        played = run_workers(args.database, args.workers, args.batch_size, lease_seconds=args.lease_seconds)
+        print(f"Played {played} matches.")
+    else:
+        queue = JobQueue(args.database)
+        print(queue.progress(args.tournament))
+        standings = queue.standings(args.tournament)
+        for name, (wins, matches) in sorted(standings.items(), key=lambda item: -item[1][0] / item[1][1]):
+            print(f"{name:40s} {wins:6d} / {matches:6d}")
+
+
+if __name__ == '__main__':
+    main()
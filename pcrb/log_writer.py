@@ -0,0 +1,112 @@
+"""ログとゲーム状態のファイル書き込みを別スレッドで行う
+
+GameController(writer=BackgroundWriter()) とすると、game_log.txt と game_state.json への書き込みを
+上限付きのキューに積んで、別スレッドがまとめて書き出す。キューが一杯のときだけ積む側が待つ。
+1 つの BackgroundWriter を複数のコントローラで共有できる。
+
+    with BackgroundWriter() as writer:
+        controller = GameController(writer=writer)
+        ...
+        controller.game_loop()
+    # with を抜けると書き残しを全て書き出してスレッドを止める
+"""
+import queue
+import threading
+
+_STOP = object()
+
+
+def _write_text(file, text):
+    file.write(text)
+
+
+def _write_lines(file, lines):
+    file.writelines(lines)
+
+
+class BackgroundWriter:
+    def __init__(self, max_pending=256, batch_size=64):
+        """
+        :param max_pending: キューに積んでおける書き込みの数（これを超えると積む側が待つ）
+        :param batch_size: スレッドが 1 度にまとめて処理する書き込みの数
+        """
+        self.batch_size = batch_size
+        self._queue = queue.Queue(max_pending)
+        self._error = None
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="pcrb-log-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, file, write, payload):
+        """write(file, payload) を書き込みスレッドで実行する（write が None ならファイルを閉じる）"""
+        if self._closed:
+            raise RuntimeError("BackgroundWriter is already closed.")
+        self._queue.put((file, write, payload))
+
+    def write(self, file, text):
+        self.submit(file, _write_text, text)
+
+    def writelines(self, file, lines):
+        self.submit(file, _write_lines, lines)
+
+    def close_file(self, file):
+        """それまでに積んだ書き込みの後でファイルを閉じる"""
+        self.submit(file, None, None)
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            touched = {}
+            stop = False
+            for item in batch:
+                if item is _STOP:
+                    stop = True
+                    continue
+                file, write, payload = item
+                try:
+                    if write is None:
+                        touched.pop(id(file), None)
+                        file.close()
+                    elif self._error is None:
+                        write(file, payload)
+                        touched[id(file)] = file
+                except Exception as error:  # 書き込みの失敗は flush / close で呼び出し側に伝える
+                    self._error = error
+            for file in touched.values():
+                try:
+                    file.flush()
+                except Exception as error:
+                    self._error = error
+            for _ in batch:
+                self._queue.task_done()
+            if stop:
+                return
+
+    def _raise_error(self):
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
+
+    def flush(self):
+        """積んだ書き込みが全て終わるまで待つ"""
+        self._queue.join()
+        self._raise_error()
+
+    def close(self):
+        """書き残しを全て書き出してからスレッドを止める"""
+        if not self._closed:
+            self._closed = True
+            self._queue.put(_STOP)
+            self._thread.join()
+        self._raise_error()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,85 @@
+"""match_server の HTTP API を呼ぶクライアント（標準ライブラリだけで動く）
+
+    client = MatchClient("http://127.0.0.1:8765")
+    job = client.submit_gauntlet(source_code, max_turn=100)
+    results = client.wait(job["id"])
+    client.replay(results[0]["replay"])
+"""
+import json
+import time
+from urllib.error import HTTPError
+from urllib.parse import urlencode
+from urllib.request import Request
+from urllib.request import urlopen
+
+
+class MatchClient:
+    def __init__(self, url="http://127.0.0.1:8765", timeout=10):
+        self.url = url.rstrip("/")
+        self.timeout = timeout
+
+    def _request(self, method, path, body=None):
+        data = None if body is None else json.dumps(body).encode("utf-8")
+        request = Request(self.url + path, data=data, method=method, headers={"Content-Type": "application/json"})
+        try:
+            with urlopen(request, timeout=self.timeout) as response:
+                return json.load(response)
+        except HTTPError as e:
+            payload = json.load(e)
+            if e.code == 400:
+                raise ValueError(payload["error"]) from None
+            if e.code == 403:
+                raise PermissionError(payload["error"]) from None
+            if e.code == 404:
+                raise LookupError(payload["error"]) from None
+            raise
+
+    def robots(self):
+        """サーバーにある robots/ のロボット名"""
+        return self._request("GET", "/robots")
+
+    def submit_match(self, robot_a, robot_b, seed=0, names=None, **options):
+        """1 試合のジョブを投げる。robot_a / robot_b はモジュール名かソースコード"""
+        request = {"type": "match", "robots": [robot_a, robot_b], "seed": seed, "options": options}
+        if names is not None:
+            request["names"] = names
+        return self._request("POST", "/jobs", request)
+
+    def submit_gauntlet(self, robot, opponents=None, name=None, seed=0, **options):
+        """robot と opponents（None なら全ロボット）の先攻・後攻の試合をまとめたジョブを投げる"""
+        request = {"type": "gauntlet", "robot": robot, "seed": seed, "options": options}
+        if opponents is not None:
+            request["opponents"] = list(opponents)
+        if name is not None:
+            request["name"] = name
+        return self._request("POST", "/jobs", request)
+
+    def status(self, job_id):
+        return self._request("GET", f"/jobs/{job_id}")
+
+    def results(self, job_id):
+        """終わったジョブの結果のリスト"""
+        return self._request("GET", f"/jobs/{job_id}/results")["results"]
+
+    def wait(self, job_id, interval=0.2, timeout=None):
+        """ジョブが終わるまで待って結果を返す。失敗したら RuntimeError"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            status = self.status(job_id)
+            if status["status"] == "done":
+                return self.results(job_id)
+            if status["status"] == "failed":
+                raise RuntimeError(f"Job {job_id} failed: {status['error']}")
+            if deadline is not None and time.monotonic() > deadline:
+                raise TimeoutError(f"Job {job_id} did not finish in {timeout} seconds.")
+            time.sleep(interval)
+
+    def replay(self, replay_id):
+        """保存されたリプレイの game_state"""
+        return self._request("GET", f"/replays/{replay_id}")
+
+    def query_replays(self, **criteria):
+        """ReplayStore.query と同じ条件でリプレイの ID を探す（ngram は行動名の並び）"""
+        if "ngram" in criteria:
+            criteria["ngram"] = ",".join(criteria["ngram"])
+        return self._request("GET", "/replays?" + urlencode(criteria))
@@ -0,0 +1,373 @@
+"""対戦を HTTP/JSON で受け付けるサーバー
+
+asyncio で HTTP を受け、試合はプロセスプールで行う。標準ライブラリだけで動く。
+ジョブを投げたらすぐに ID が返り、状態を問い合わせて結果とリプレイを受け取る。
+リプレイは ReplayStore に保存するので、サーバーを止めても残る（ジョブはメモリ上だけ）。
+
+    python pcrb/match_server.py --port 8765 --workers 4 --root match_server_data
+
+    POST /jobs               {"type": "match", "robots": [A, B], "options": {"max_turn": 100}, "seed": 0}
+                             {"type": "gauntlet", "robot": A, "opponents": [B, ...], "name": "player"}
+    GET  /jobs/<id>          状態と進み具合
+    GET  /jobs/<id>/results  結果（終わっていなければ 409）
+    GET  /replays?bot=...    リプレイの検索（ReplayStore.query と同じ条件）
+    GET  /replays/<id>       リプレイの game_state
+    GET  /robots             robots/ のロボット名
+
+ロボットは robots/ のモジュール名で渡す。--allow-source で起動したときだけソースコードも受け付け、
+code_check.is_safe_code で検査してから実行する（検査は完全ではないので、信頼できる相手にだけ開くこと）。
+ブラウザから別のサイト経由で投げられないよう、POST は Content-Type: application/json で、
+Host と Origin（あれば）がこのサーバーを指すものだけを受け付ける。
+gauntlet は opponents（省略すると robots/ の全ロボット）と先攻・後攻で 1 試合ずつ行う。
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from http import HTTPStatus
+from urllib.parse import parse_qs
+from urllib.parse import urlsplit
+
+from arena import ROBOTS_DIR
+from arena import load_logic
+from code_check import is_safe_code
+from controller import GameController
+from initial_positions import INITIAL_POSITION_STRATEGIES
+from replay_store import ReplayStore
+from robot import Robot
+
+GAME_OPTIONS = {"max_turn": int, "x_max": int, "y_max": int, "initial_positions": str}
+# 対戦ページ (select_game_options) と同じ範囲
+OPTION_RANGES = {"max_turn": (1, 100000), "x_max": (3, 1000), "y_max": (1, 1000)}
+REPLAY_CRITERIA = {
+    "bot": str, "winner": str, "loser": str, "ngram_bot": str,
+    "min_length": int, "max_length": int, "min_margin": float, "max_margin": float,  # HP 差は小数にもなる
+}
+MAX_BODY_BYTES = 1024 * 1024
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+
+def robot_names(robots_dir=ROBOTS_DIR):
+    """robots/ のロボットのモジュール名"""
+    return sorted(
+        file_name[:-3] for file_name in os.listdir(robots_dir)
+        if file_name.endswith(".py") and file_name != "__init__.py")
+
+
+def play(sources, options, seed):
+    """1 試合を行い、(勝った席, game_state) を返す（プロセスプールで呼ぶ）"""
+    random.seed(seed)
+    controller = GameController(**options, verbose=False, log_path=None, game_state_path=None)
+    position1 = controller.robot1_initial_position
+    position2 = controller.robot2_initial_position
+    robot1 = Robot("Robot A", position1['x'], position1['y'], load_logic(sources[0]), controller)
+    robot2 = Robot("Robot B", position2['x'], position2['y'], load_logic(sources[1]), controller)
+    controller.set_robots(robot1, robot2)
+    winner, game_state = controller.game_loop()
+    return controller.robots.index(winner), game_state
+
+
+class Job:
+    __slots__ = ("id", "type", "options", "matches", "status", "results", "completed", "error")
+
+    def __init__(self, job_id, job_type, options, matches):
+        """:param matches: [(ソースの組, ロボット名の組, シード, 付け加える結果)]"""
+        self.id = job_id
+        self.type = job_type
+        self.options = options
+        self.matches = matches
+        self.status = QUEUED
+        self.results = [None] * len(matches)
+        self.completed = 0
+        self.error = None
+
+    def to_dict(self):
+        return {
+            "id": self.id, "type": self.type, "status": self.status,
+            "completed": self.completed, "total": len(self.matches), "error": self.error,
+        }
+
+
+class MatchServer:
+    def __init__(self, root, host="127.0.0.1", port=8765, workers=None, allow_source=False, allowed_hosts=()):
+        """
+        :param root: リプレイを保存する ReplayStore のディレクトリ
+        :param port: 0 なら空いているポートを使う（start() の後に self.port で分かる）
+        :param workers: 試合を行うプロセス数（None なら CPU 数）
+        :param allow_source: robots/ にないロボットのソースコードを受け付ける
+        :param allowed_hosts: POST の Host / Origin として受け付ける、host 以外のホスト名
+        """
+        self.store = ReplayStore(root)
+        self.host = host
+        self.port = port
+        self.workers = workers
+        self.allow_source = allow_source
+        self.allowed_hosts = {host, "localhost", "127.0.0.1", "[::1]", *allowed_hosts}
+        self.jobs = {}
+        self._names = set(robot_names())
+        self._executor = None
+        self._server = None
+        self._tasks = set()
+
+    async def start(self):
+        self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self):
+        await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self):
+        self._server.close()
+        await self._server.wait_closed()
+        for task in list(self._tasks):
+            task.cancel()
+        self._executor.shutdown(cancel_futures=True)
+
+    # ----------------------------- ジョブ -----------------------------
+
+    def _check_source(self, source):
+        if not isinstance(source, str):
+            raise ValueError("Robot must be a module name or source code.")
+        if source.isidentifier():
+            if source not in self._names:
+                raise ValueError(f"Unknown robot: {source}")
+            return
+        if not self.allow_source:
+            raise ValueError("Robot source is not accepted (start the server with --allow-source).")
+        is_safe, message = is_safe_code(source)
+        if not is_safe:
+            raise ValueError(f"Unsafe code: {message}")
+        try:
+            compile(source, "<robot>", "exec")
+        except SyntaxError as e:
+            raise ValueError(f"Syntax error in robot source: {e}")
+
+    @staticmethod
+    def _check_options(options):
+        if not isinstance(options, dict):
+            raise ValueError("options must be an object.")
+        for key, value in options.items():
+            if key not in GAME_OPTIONS:
+                raise ValueError(f"Unknown option: {key}")
+            if not isinstance(value, GAME_OPTIONS[key]) or isinstance(value, bool):
+                raise ValueError(f"Option {key} must be {GAME_OPTIONS[key].__name__}.")
+            if key in OPTION_RANGES:
+                low, high = OPTION_RANGES[key]
+                if not low <= value <= high:
+                    raise ValueError(f"Option {key} must be between {low} and {high}.")
+            elif value not in INITIAL_POSITION_STRATEGIES:
+                raise ValueError(f"Unknown initial positions: {value}")
+        return options
+
+    def submit(self, request):
+        """リクエストの JSON からジョブを作って走らせる"""
+        if not isinstance(request, dict):
+            raise ValueError("Request must be an object.")
+        options = self._check_options(request.get("options", {}))
+        seed = request.get("seed", 0)
+        if not isinstance(seed, int):
+            raise ValueError("seed must be an integer.")
+
+        job_type = request.get("type")
+        if job_type == "match":
+            sources = request.get("robots")
+            if not isinstance(sources, list) or len(sources) != 2:
+                raise ValueError("A match needs two robots.")
+            for source in sources:
+                self._check_source(source)
+            bots = request.get("names") or [source if source.isidentifier() else f"robot_{seat}"
+                                            for seat, source in enumerate(sources)]
+            if not isinstance(bots, list) or len(bots) != 2 or not all(isinstance(bot, str) for bot in bots):
+                raise ValueError("names must be two strings.")
+            matches = [(tuple(sources), tuple(bots), seed, {})]
+        elif job_type == "gauntlet":
+            source = request.get("robot")
+            self._check_source(source)
+            opponents = request.get("opponents") or sorted(self._names)
+            if not isinstance(opponents, list):
+                raise ValueError("opponents must be a list.")
+            for opponent in opponents:
+                if not isinstance(opponent, str) or opponent not in self._names:
+                    raise ValueError(f"Unknown robot: {opponent}")
+            name = request.get("name") or (source if source.isidentifier() else "player")
+            if not isinstance(name, str):
+                raise ValueError("name must be a string.")
+            matches = []
+            for opponent in opponents:
+                # 先攻と後攻で 1 試合ずつ
+                matches.append(((source, opponent), (name, opponent), seed + len(matches),
+                                {"opponent": opponent, "seat": 0}))
+                matches.append(((opponent, source), (opponent, name), seed + len(matches),
+                                {"opponent": opponent, "seat": 1}))
+        else:
+            raise ValueError(f"Unknown job type: {job_type}")
+
+        job = Job(f"{len(self.jobs):06d}", job_type, options, matches)
+        self.jobs[job.id] = job
+        task = asyncio.get_running_loop().create_task(self._run(job))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return job
+
+    async def _run(self, job):
+        job.status = RUNNING
+        # 全ての試合が終わってから状態を決める（失敗した試合があっても、他の試合は結果を書き続けるため）
+        outcomes = await asyncio.gather(
+            *(self._run_match(job, index) for index in range(len(job.matches))), return_exceptions=True)
+        errors = [outcome for outcome in outcomes if isinstance(outcome, BaseException)]
+        if errors:
+            job.error = f"{type(errors[0]).__name__}: {errors[0]}"
+            job.status = FAILED
+        else:
+            job.status = DONE
+
+    async def _run_match(self, job, index):
+        sources, bots, seed, extra = job.matches[index]
+        loop = asyncio.get_running_loop()
+        winner, game_state = await loop.run_in_executor(self._executor, play, sources, job.options, seed)
+        replay = self.store.add(game_state, bots=bots)
+        job.results[index] = {
+            "bots": list(bots),
+            "winner": winner,
+            "hp": [robot["hp"] for robot in game_state[-1]["robots"]],
+            "length": self.store.index.summaries[replay]["length"],
+            "replay": replay,
+            **extra,
+        }
+        job.completed += 1
+
+    # ----------------------------- HTTP -----------------------------
+
+    def _find_job(self, job_id):
+        if job_id not in self.jobs:
+            raise LookupError(f"Job '{job_id}' not found.")
+        return self.jobs[job_id]
+
+    def _check_post(self, headers):
+        """別のサイトのページから投げられた POST を断る（text/plain なら事前確認なしで届いてしまう）"""
+        content_type = headers.get("content-type", "").split(";")[0].strip().lower()
+        if content_type != "application/json":
+            raise PermissionError("POST requests must use Content-Type: application/json.")
+        host = headers.get("host", "")
+        if self._hostname(host) not in self.allowed_hosts:
+            raise PermissionError(f"Host '{host}' is not allowed.")
+        origin = headers.get("origin")
+        if origin is not None:
+            url = urlsplit(origin)
+            if url.scheme != "http" or self._hostname(url.netloc) not in self.allowed_hosts:
+                raise PermissionError(f"Origin '{origin}' is not allowed.")
+
+    @staticmethod
+    def _hostname(netloc):
+        """'host:port' のホスト名の部分（IPv6 は [::1] の形のまま）"""
+        if netloc.startswith("["):
+            return netloc[:netloc.find("]") + 1]
+        return netloc.rsplit(":", 1)[0] if ":" in netloc else netloc
+
+    def _route(self, method, path, query, body, headers):
+        """(ステータス, 返す JSON) を返す"""
+        parts = [part for part in path.split("/") if part]
+        if method == "GET" and parts == ["robots"]:
+            return HTTPStatus.OK, sorted(self._names)
+        if parts == ["jobs"] and method == "POST":
+            self._check_post(headers)
+            try:
+                request = json.loads(body or b"{}")
+            except json.JSONDecodeError as e:
+                raise ValueError(f"Invalid JSON: {e}")
+            return HTTPStatus.ACCEPTED, self.submit(request).to_dict()
+        if method == "GET" and len(parts) == 2 and parts[0] == "jobs":
+            return HTTPStatus.OK, self._find_job(parts[1]).to_dict()
+        if method == "GET" and len(parts) == 3 and parts[0] == "jobs" and parts[2] == "results":
+            job = self._find_job(parts[1])
+            if job.status != DONE:
+                return HTTPStatus.CONFLICT, job.to_dict()
+            return HTTPStatus.OK, {**job.to_dict(), "results": job.results}
+        if method == "GET" and parts == ["replays"]:
+            criteria = {}
+            for key, values in query.items():
+                if key == "ngram":
+                    criteria[key] = tuple(values[-1].split(","))
+                elif key in REPLAY_CRITERIA:
+                    try:
+                        criteria[key] = REPLAY_CRITERIA[key](values[-1])
+                    except ValueError:
+                        raise ValueError(f"Invalid {key}: {values[-1]}")
+                else:
+                    raise ValueError(f"Unknown criterion: {key}")
+            return HTTPStatus.OK, self.store.query(**criteria)
+        if method == "GET" and len(parts) == 2 and parts[0] == "replays":
+            # 索引にない ID はファイルを開かない（パスを組み立てないため）
+            if parts[1] not in self.store.index.summaries:
+                raise LookupError(f"Replay '{parts[1]}' not found.")
+            return HTTPStatus.OK, self.store.load(parts[1])
+        raise LookupError(f"No route for {method} {path}")
+
+    async def _read_request(self, reader):
+        request_line = await reader.readline()
+        method, target, _ = request_line.decode("latin-1").split()
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        length = int(headers.get("content-length", 0))
+        if length > MAX_BODY_BYTES:
+            raise ValueError(f"Request body is too large ({length} bytes).")
+        body = await reader.readexactly(length) if length else b""
+        url = urlsplit(target)
+        return method, url.path, parse_qs(url.query), body, headers
+
+    async def _handle(self, reader, writer):
+        try:
+            status, payload = self._route(*await self._read_request(reader))
+        except PermissionError as e:
+            status, payload = HTTPStatus.FORBIDDEN, {"error": str(e)}
+        except ValueError as e:
+            status, payload = HTTPStatus.BAD_REQUEST, {"error": str(e)}
+        except LookupError as e:
+            status, payload = HTTPStatus.NOT_FOUND, {"error": str(e)}
+        except Exception as e:
+            status, payload = HTTPStatus.INTERNAL_SERVER_ERROR, {"error": f"{type(e).__name__}: {e}"}
+        body = json.dumps(payload).encode("utf-8")
+        writer.write(
+            f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: close\r\n\r\n".encode("latin-1") + body)
+        try:
+            await writer.drain()
+        finally:
+            writer.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Robot battle match server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--root", default="match_server_data")
+    parser.add_argument("--allow-source", action="store_true",
+                        help="robots/ にないロボットのソースコードも受け付ける（信頼できる環境でだけ使う）")
+    parser.add_argument("--allowed-host", action="append", default=[],
+                        help="POST の Host / Origin として受け付けるホスト名を加える")
+    args = parser.parse_args()
+    server = MatchServer(args.root, host=args.host, port=args.port, workers=args.workers,
+                         allow_source=args.allow_source, allowed_hosts=args.allowed_host)
+    print(f"Serving on http://{args.host}:{args.port}")
+    asyncio.run(server.serve_forever())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,179 @@
+"""新しいロボットを少ない試合数で既存のロボット群の中に順位付けする
+
+全員と先攻・後攻で 2 試合ずつ戦う代わりに、TrueSkill の不確かさ (sigma) が
+最も減ると期待できる相手と席を 1 試合ずつ選ぶ（スイス式）。
+新ロボットの順位の信頼区間が十分狭くなったら打ち切る。
+
+    service = rate_pool(load_robot_pool())
+    ranker = AdaptiveRanker(service, "my_robot", my_logic, load_robot_pool())
+    placement = ranker.run()
+"""
+import itertools
+import math
+from statistics import NormalDist
+
+from arena import FIRST
+from arena import SECOND
+from arena import play_match
+from rating import DRAW
+from rating import LOSS
+from rating import WIN
+from rating import Rating
+from rating import RatingService
+from rating import TrueSkillModel
+
+
+def rate_pool(pool, rounds=1, play=play_match, service=None, **game_options):
+    """pool の総当たり（先攻・後攻の両方）でレーティングの初期値を作る"""
+    service = RatingService(TrueSkillModel()) if service is None else service
+    for _ in range(rounds):
+        for name_a, name_b in itertools.permutations(pool, 2):
+            winner = play(pool[name_a], pool[name_b], **game_options)
+            service.record(name_a, name_b, WIN if winner == FIRST else LOSS)
+    return service
+
+
+class Placement:
+    """順位付けの結果"""
+    __slots__ = ("name", "rank", "best_rank", "worst_rank", "rating", "matches", "settled")
+
+    def __init__(self, name, rank, best_rank, worst_rank, rating, matches, settled):
+        self.name = name
+        self.rank = rank
+        self.best_rank = best_rank
+        self.worst_rank = worst_rank
+        self.rating = rating
+        self.matches = matches  # (相手, 席, score) のリスト
+        self.settled = settled
+
+    def __repr__(self):
+        return (f"Placement({self.name}: rank={self.rank} [{self.best_rank}-{self.worst_rank}], "
+                f"matches={len(self.matches)}, settled={self.settled})")
+
+
+class AdaptiveRanker:
+    def __init__(self, service, name, robot_logic, pool, play=play_match, z=1.96, rank_tolerance=None,
+                 min_relative_gain=0.02, max_matches=None, max_repeats=2, game_options=None):
+        """
+        :param service: 既存ロボットのレーティングを持つ RatingService（TrueSkillModel を使うこと）
+        :param pool: {名前: robot_logic} の対戦相手
+        :param play: play(logic_first, logic_second, **game_options) で勝った席を返す関数
+        :param z: 順位の信頼区間の幅（1.96 で約 95%）
+        :param rank_tolerance: 最良・最悪の順位の差がこれ以下になったら打ち切る（省略時はロボット数の 1 割）
+        :param min_relative_gain: 1 試合で減ると期待できる sigma^2 の割合がこれ未満なら打ち切る
+        :param max_matches: 試合数の上限（省略時は全員と 2 試合ずつの数）
+        :param max_repeats: 同じ相手と戦う回数の上限
+        """
+        if name in pool:
+            raise ValueError(f"Robot '{name}' is already in the pool.")
+        self.service = service
+        self.name = name
+        self.robot_logic = robot_logic
+        self.pool = pool
+        self.play = play
+        self.z = z
+        self.rank_tolerance = max(2, len(pool) // 10) if rank_tolerance is None else rank_tolerance
+        self.min_relative_gain = min_relative_gain
+        self.max_matches = 2 * len(pool) if max_matches is None else max_matches
+        self.max_repeats = max_repeats
+        self.game_options = {} if game_options is None else game_options
+        self.matches = []
+        self._seats_used = {opponent: set() for opponent in pool}
+        self._seat_counts = [0, 0]
+
+    # ----------------------------- 相手と席の選択 -----------------------------
+
+    def expected_information_gain(self, opponent):
+        """opponent と 1 試合した後の sigma^2 の期待減少量"""
+        model = self.service.model
+        me = self.service.rating(self.name)
+        other = self.service.rating(opponent)
+        p_win = model.expected_score(me, other)
+
+        expected_variance = 0.0
+        for probability, score in ((p_win, WIN), (1 - p_win, LOSS)):
+            my_copy = Rating(me.mu, me.sigma)
+            model.update(my_copy, Rating(other.mu, other.sigma), score)
+            expected_variance += probability * my_copy.sigma ** 2
+        return me.sigma ** 2 - expected_variance
+
+    def _available_opponents(self):
+        return [opponent for opponent, seats in self._seats_used.items() if len(seats) < self.max_repeats]
+
+    def _choose_seat(self, opponent):
+        used = self._seats_used[opponent]
+        free = [seat for seat in (FIRST, SECOND) if seat not in used] or [FIRST, SECOND]
+        # 全体で少ない方の席を優先して先攻・後攻の偏りを抑える
+        return min(free, key=lambda seat: self._seat_counts[seat])
+
+    def next_pairing(self):
+        """次に戦う (相手, 席) を返す（候補がなければ None）"""
+        candidates = self._available_opponents()
+        if not candidates:
+            return None
+        opponent = max(candidates, key=lambda other: (self.expected_information_gain(other), other))
+        return opponent, self._choose_seat(opponent)
+
+    # ----------------------------- 試合と打ち切り判定 -----------------------------
+
+    def play_next(self):
+        """1 試合を行って結果を記録する（候補がなければ None を返す）"""
+        pairing = self.next_pairing()
+        if pairing is None:
+            return None
+        opponent, seat = pairing
+        if seat == FIRST:
+            winner = self.play(self.robot_logic, self.pool[opponent], **self.game_options)
+        else:
+            winner = self.play(self.pool[opponent], self.robot_logic, **self.game_options)
+        if winner is None:
+            score = DRAW
+        else:
+            score = WIN if winner == seat else LOSS
+
+        self.service.record(self.name, opponent, score)
+        self._seats_used[opponent].add(seat)
+        self._seat_counts[seat] += 1
+        self.matches.append((opponent, seat, score))
+        return opponent, seat, score
+
+    def rank_interval(self):
+        """(最良の順位, 推定順位, 最悪の順位) を返す
+
+        既存ロボットとの勝率の推定 P(新ロボット > 相手) が信頼区間の外にあれば上下が確定、
+        区間内にあれば順位がどちらにも転びうる相手として数える。
+        """
+        me = self.service.rating(self.name)
+        confidence = NormalDist().cdf(self.z)
+        best = worst = rank = 1
+        for opponent in self.pool:
+            other = self.service.rating(opponent)
+            spread = math.sqrt(me.sigma ** 2 + other.sigma ** 2) or 1e-12
+            p_above = NormalDist().cdf((me.mu - other.mu) / spread)
+            if other.mu > me.mu:
+                rank += 1
+            if p_above < confidence:
+                worst += 1
+                if p_above < 1 - confidence:
+                    best += 1
+        return best, rank, worst
+
+    def is_settled(self):
+        best, _, worst = self.rank_interval()
+        return worst - best <= self.rank_tolerance
+
+    def _worth_playing(self):
+        """次の 1 試合で sigma^2 が十分減ると期待できるか"""
+        pairing = self.next_pairing()
+        if pairing is None:
+            return False
+        variance = self.service.rating(self.name).sigma ** 2
+        return self.expected_information_gain(pairing[0]) >= self.min_relative_gain * variance
+
+    def run(self):
+        """順位が定まるか、試合をしても情報が増えなくなるまで対戦し、Placement を返す"""
+        while not self.is_settled() and len(self.matches) < self.max_matches and self._worth_playing():
+            self.play_next()
+        best, rank, worst = self.rank_interval()
+        return Placement(
+            self.name, rank, best, worst, self.service.rating(self.name), list(self.matches), self.is_settled())
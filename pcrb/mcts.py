@@ -0,0 +1,257 @@
+"""モンテカルロ木探索 (MCTS) で行動を選ぶロボットの枠組み
+
+エンジン自体をフォワードモデルにして、1 手ごとの時間予算の中で
+選択 → 展開 → ロールアウト → 逆伝播 を繰り返す。
+木は行動の列で表し（open-loop）、次の手番では実際に指された手をたどって部分木を再利用する。
+workers を指定すると、同じ局面から別プロセスでも探索して根の統計を合算する。
+
+盤面の状態は robot.controller から直接読むため、カモフラージュで隠れた位置も見える
+（参照用の対戦相手として使う想定）。
+
+    from mcts import MCTSBot
+    robot_logic = MCTSBot(time_budget=0.05)
+"""
+import math
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from forward_model import ForwardModel
+from zobrist import TranspositionTable
+
+
+class Node:
+    __slots__ = ("mover", "children", "visits", "value")
+
+    def __init__(self, mover=None):
+        self.mover = mover  # この節点に至る行動を選んだロボットの席
+        self.children = {}  # 行動名 → Node
+        self.visits = 0
+        self.value = 0.0    # mover から見た評価値の合計
+
+
+def default_rollout_policy(model, legal, rng):
+    """ロールアウトの方策：攻撃できれば攻撃し、そうでなければ多くの場合は最も近い敵に近づく"""
+    if "attack" in legal and rng.random() < 0.8:
+        return "attack"
+    if rng.random() < 0.6:
+        robot = model.current
+        enemy = model.controller.nearest_enemy(robot)
+        if enemy is not None:
+            toward = []
+            if enemy.x != robot.x:
+                toward.append("right" if enemy.x > robot.x else "left")
+            if enemy.y != robot.y:
+                toward.append("down" if enemy.y > robot.y else "up")
+            toward = [action for action in toward if action in legal]
+            if toward:
+                return rng.choice(toward)
+    return rng.choice(legal)
+
+
+class MCTSSearch:
+    def __init__(self, model, exploration=1.4, rollout_depth=20, rng=None, rollout_policy=default_rollout_policy,
+                 transpositions=None, min_samples=4):
+        """
+        :param transpositions: 展開した局面の評価を状態ハッシュで共有する TranspositionTable
+            （同じ局面で min_samples 回ロールアウトした後は、その平均を使ってロールアウトを省く）
+        """
+        self.model = model
+        self.exploration = exploration
+        self.rollout_depth = rollout_depth
+        self.rng = random.Random() if rng is None else rng
+        self.rollout_policy = rollout_policy
+        self.transpositions = transpositions
+        self.min_samples = min_samples
+
+    def _select_child(self, node, legal):
+        log_visits = math.log(node.visits + 1)
+        best_action, best_score = None, -1.0
+        for action in legal:
+            child = node.children[action]
+            score = child.value / child.visits + self.exploration * math.sqrt(log_visits / child.visits)
+            if score > best_score:
+                best_action, best_score = action, score
+        return best_action
+
+    def iterate(self, root, snapshot, seat):
+        """1 回分の 選択・展開・ロールアウト・逆伝播 を行う"""
+        model = self.model
+        rng = self.rng
+        model.load(snapshot, seat)
+        node = root
+        path = [root]
+
+        # 選択と展開
+        while not model.is_terminal():
+            mover = model.current_seat
+            legal = model.legal_actions()
+            untried = [action for action in legal if action not in node.children]
+            if untried:
+                action = rng.choice(untried)
+                node.children[action] = child = Node(mover)
+                model.step(action)
+                path.append(child)
+                break
+            action = self._select_child(node, legal)
+            model.step(action)
+            node = node.children[action]
+            path.append(node)
+
+        rewards = self._evaluate()
+
+        # 逆伝播
+        for node in path:
+            node.visits += 1
+            if node.mover is not None:
+                node.value += rewards[node.mover]
+
+    def _rollout(self):
+        model = self.model
+        for _ in range(self.rollout_depth):
+            if model.is_terminal():
+                break
+            model.step(self.rollout_policy(model, model.legal_actions(), self.rng))
+        return [model.reward(index) for index in range(len(model.robots))]
+
+    def _evaluate(self):
+        """展開した局面の評価値（席ごと）を返す"""
+        table = self.transpositions
+        if table is None:
+            return self._rollout()
+        # 終局判定はターン数で変わるので、置換表のキーにはターン数も含める
+        key = (self.model.state_hash(), self.model.controller.turn)
+        count, totals = table.get(key, (0, None))
+        if count >= self.min_samples:
+            return [total / count for total in totals]
+        rewards = self._rollout()
+        totals = rewards if totals is None else [total + reward for total, reward in zip(totals, rewards)]
+        table.put(key, (count + 1, totals))
+        return rewards
+
+    def run(self, root, snapshot, seat, time_budget=None, iterations=None):
+        """時間予算か反復回数の上限まで探索する"""
+        deadline = None if time_budget is None else time.perf_counter() + time_budget
+        count = 0
+        while iterations is None or count < iterations:
+            if deadline is not None and time.perf_counter() >= deadline:
+                break
+            self.iterate(root, snapshot, seat)
+            count += 1
+        return count
+
+
+def _search_worker(config, snapshot, seat, settings, seed, time_budget, iterations):
+    """別プロセスで同じ局面を探索し、根の子の (visits, value) を返す"""
+    state = random.getstate()
+    try:
+        search = MCTSSearch(ForwardModel(*config), rng=random.Random(seed), **settings)
+        root = Node()
+        search.run(root, snapshot, seat, time_budget, iterations)
+    finally:
+        random.setstate(state)
+    return {action: (child.visits, child.value) for action, child in root.children.items()}
+
+
+class MCTSBot:
+    """robot_logic として使える MCTS ロボット"""
+
+    def __init__(self, time_budget=0.05, iterations=None, exploration=1.4, rollout_depth=20,
+                 workers=0, seed=None, reuse_tree=True, transposition_size=1 << 16):
+        """
+        :param time_budget: 1 手あたりの探索時間（秒）
+        :param iterations: 1 手あたりの反復回数の上限（time_budget=None と組み合わせると再現性のある探索になる）
+        :param rollout_depth: 展開後に乱択で進める手数
+        :param workers: 別プロセスで並列に探索する数（0 なら使わない。既定の行動表が前提）
+        :param reuse_tree: 前の手番の木から、実際に指された手の先の部分木を引き継ぐ
+        :param transposition_size: 局面の評価を使い回す置換表の大きさ（0 なら使わない）
+        """
+        self.time_budget = time_budget
+        self.iterations = iterations
+        self.settings = {"exploration": exploration, "rollout_depth": rollout_depth}
+        self.workers = workers
+        self.reuse_tree = reuse_tree
+        self.rng = random.Random(seed)
+        self._controller = None  # 直近に探索した試合のコントローラ
+        self._model = None
+        self._trees = {}  # 席 → (根, 判断時の game_state の長さ)
+        self._executor = None
+        self.transpositions = TranspositionTable(transposition_size) if transposition_size else None
+
+    def _model_for(self, controller):
+        """試合ごとにフォワードモデルを作り直し、前の試合の木を捨てる"""
+        if controller is not self._controller:
+            self._controller = controller
+            self._model = ForwardModel.from_controller(controller)
+            self._trees.clear()
+            if self.transpositions is not None:
+                self.transpositions.clear()
+        return self._model
+
+    def _reused_root(self, controller, seat):
+        """前回の根から、その後に記録された行動をたどった部分木を返す"""
+        entry = self._trees.get(seat)
+        if not self.reuse_tree or entry is None:
+            return Node()
+        node, length = entry
+        history = controller.game_state[length:]
+        if not history:
+            return Node()
+        for state in history:
+            node = node.children.get(state['action']['action'])
+            if node is None:
+                return Node()
+        node.mover = None
+        return node
+
+    def _submit_workers(self, model, snapshot, seat):
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        return [
+            self._executor.submit(
+                _search_worker, model.config(), snapshot, seat, self.settings,
+                self.rng.randrange(2 ** 32), self.time_budget, self.iterations)
+            for _ in range(self.workers)
+        ]
+
+    def choose_action(self, robot):
+        """robot の手番で指す行動名を返す"""
+        controller = robot.controller
+        seat = controller.seat_of(robot)
+        model = self._model_for(controller)
+        snapshot = controller.snapshot(include_rng=False)
+        root = self._reused_root(controller, seat)
+
+        model.load(snapshot, seat)
+        legal = model.legal_actions()
+        if len(legal) == 1:
+            action = legal[0]
+        else:
+            random_state = random.getstate()  # テレポートなどが使う乱数を本番から切り離す
+            try:
+                search = MCTSSearch(model, rng=self.rng, transpositions=self.transpositions, **self.settings)
+                futures = self._submit_workers(model, snapshot, seat) if self.workers else []
+                search.run(root, snapshot, seat, self.time_budget, self.iterations)
+            finally:
+                random.setstate(random_state)
+
+            visits = {name: child.visits for name, child in root.children.items() if name in legal}
+            for future in futures:
+                for name, (count, _) in future.result().items():
+                    if name in legal:
+                        visits[name] = visits.get(name, 0) + count
+            action = max(legal, key=lambda name: visits.get(name, 0))
+
+        self._trees[seat] = (root, len(controller.game_state))
+        return action
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def __call__(self, robot, game_info, memos):
+        return self.choose_action(robot)
+
+
+robot_logic = MCTSBot()
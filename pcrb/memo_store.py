@@ -0,0 +1,206 @@
+"""ロボット 1 体分のメモ
+
+キーの数とバイト数に上限を設け、変わったキーだけを検査する。
+snapshot() は中身を写さずに共有し、次に書き込むときに初めて写す（コピーオンライト）。
+前回の take_changes() 以降に変わったキーを覚えていて、GameController はそれを手番ごとに game_state に残す。
+
+    memos = MemoStore()
+    memos.update({"target": "left", "count": 1})
+    saved = memos.snapshot()        # 写さない
+    memos["count"] = 2              # ここで初めて写す
+    memos.restore(saved)
+"""
+from collections.abc import Mapping
+from collections.abc import MutableMapping
+
+from utils import is_valid_memo
+
+MAX_MEMO_KEYS = 256
+MAX_MEMO_BYTES = 64 * 1024
+
+_MISSING = object()
+
+
+def memo_size(key, value):
+    """メモ 1 件のおおよそのバイト数"""
+    if isinstance(value, str):
+        size = len(value.encode("utf-8"))
+    elif isinstance(value, int):
+        size = value.bit_length() // 8 + 1
+    elif isinstance(value, float):
+        size = 8
+    else:
+        size = 1
+    return len(key.encode("utf-8")) + size
+
+
+class MemoSnapshot(Mapping):
+    """MemoStore.snapshot() の戻り値（読み取り専用）"""
+    __slots__ = ("_data", "_nbytes", "_hash")
+
+    def __init__(self, data, nbytes):
+        self._data = data
+        self._nbytes = nbytes
+        self._hash = None
+
+    def __getitem__(self, key):
+        return self._data[key]
+
+    def __iter__(self):
+        return iter(self._data)
+
+    def __len__(self):
+        return len(self._data)
+
+    def __eq__(self, other):
+        if isinstance(other, MemoSnapshot):
+            return self._data is other._data or self._data == other._data
+        return Mapping.__eq__(self, other)
+
+    def __hash__(self):
+        if self._hash is None:
+            self._hash = hash(frozenset(self._data.items()))
+        return self._hash
+
+    def __reduce__(self):
+        return MemoSnapshot, (dict(self._data), self._nbytes)
+
+    def __repr__(self):
+        return f"MemoSnapshot({self._data!r})"
+
+
+class MemoStore(MutableMapping):
+    __slots__ = ("max_keys", "max_bytes", "_data", "_nbytes", "_shared", "_changed", "_deleted")
+
+    def __init__(self, items=(), max_keys=MAX_MEMO_KEYS, max_bytes=MAX_MEMO_BYTES):
+        self.max_keys = max_keys
+        self.max_bytes = max_bytes
+        self._data = {}
+        self._nbytes = 0
+        self._shared = False  # _data を snapshot と共有しているか
+        self._changed = {}    # take_changes() 以降に書き込まれたキーと値
+        self._deleted = set()  # take_changes() 以降に消されたキー
+        self.update(items)
+
+    @property
+    def nbytes(self):
+        return self._nbytes
+
+    def __getitem__(self, key):
+        return self._data[key]
+
+    def get(self, key, default=None):
+        return self._data.get(key, default)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def __iter__(self):
+        return iter(self._data)
+
+    def __len__(self):
+        return len(self._data)
+
+    def __repr__(self):
+        return f"MemoStore({self._data!r})"
+
+    def __setitem__(self, key, value):
+        self.update({key: value})
+
+    def __delitem__(self, key):
+        value = self._data[key]
+        self._own()
+        del self._data[key]
+        self._nbytes -= memo_size(key, value)
+        self._changed.pop(key, None)
+        self._deleted.add(key)
+
+    def clear(self):
+        for key in list(self._data):
+            del self[key]
+
+    def update(self, memo=(), **kwargs):
+        """memo の内容を書き込む。変わったキーだけを検査し、上限を超えるなら何も書かずに ValueError"""
+        if not memo and not kwargs:
+            return
+        if type(memo) is not dict and not isinstance(memo, Mapping):
+            memo = dict(memo)
+        if kwargs:
+            memo = {**memo, **kwargs}
+        data = self._data
+        changed = {}
+        for key, value in memo.items():
+            old = data.get(key, _MISSING)
+            if old is _MISSING or type(old) is not type(value) or old != value:
+                changed[key] = value
+        if not changed:
+            return
+        if not is_valid_memo(changed):
+            raise ValueError(f"Invalid memo: {changed!r}")
+
+        keys = len(data)
+        nbytes = self._nbytes
+        for key, value in changed.items():
+            old = data.get(key, _MISSING)
+            if old is _MISSING:
+                keys += 1
+            else:
+                nbytes -= memo_size(key, old)
+            nbytes += memo_size(key, value)
+        if keys > self.max_keys:
+            raise ValueError(f"Memo has {keys} keys (max {self.max_keys}).")
+        if nbytes > self.max_bytes:
+            raise ValueError(f"Memo uses {nbytes} bytes (max {self.max_bytes}).")
+
+        self._own()
+        self._data.update(changed)
+        self._nbytes = nbytes
+        self._changed.update(changed)
+        self._deleted.difference_update(changed)
+
+    def _own(self):
+        """snapshot と共有している中身を、書き込む前に写す"""
+        if self._shared:
+            self._data = dict(self._data)
+            self._shared = False
+
+    def snapshot(self):
+        """今の中身を MemoSnapshot で返す（次に書き込むまで写さない）"""
+        self._shared = True
+        return MemoSnapshot(self._data, self._nbytes)
+
+    def restore(self, snapshot):
+        """snapshot() の時点の中身に戻す（記録中の変更は捨てる）"""
+        if isinstance(snapshot, MemoSnapshot):
+            self._data = snapshot._data
+            self._nbytes = snapshot._nbytes
+            self._shared = True
+        else:
+            self._data = dict(snapshot)
+            self._nbytes = sum(memo_size(key, value) for key, value in self._data.items())
+            self._shared = False
+        self._changed = {}
+        self._deleted = set()
+
+    def take_changes(self):
+        """前回からの変更を (書き込まれたキーと値, 消されたキーのリスト) で返して忘れる。変更がなければ None"""
+        if not self._changed and not self._deleted:
+            return None
+        changes = self._changed, sorted(self._deleted)
+        self._changed = {}
+        self._deleted = set()
+        return changes
+
+
+def memo_history(game_state):
+    """game_state に残したメモの変更をたどり、(ターン, ロボット名, その時点のメモ) を順に返す"""
+    memos = {}
+    for state in game_state:
+        changed = state.get("memos", {})
+        deleted = state.get("memos_deleted", {})
+        for name in [*changed, *(name for name in deleted if name not in changed)]:
+            memo = memos.setdefault(name, {})
+            memo.update(changed.get(name, {}))
+            for key in deleted.get(name, ()):
+                memo.pop(key, None)
+            yield state["turn"], name, dict(memo)
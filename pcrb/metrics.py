@@ -0,0 +1,223 @@
+"""エンジンの計測（行動の回数・失敗の理由・ターンの所要時間・試合数）
+
+GameController.enable_metrics() を呼ぶと、そのコントローラの run_logic / check_traps / apply_action /
+emit / save_game_state / game_loop を計測付きのものに差し替える。
+呼ばなければ何も差し替えないので、計測しないときの負担はない。
+
+ターンの所要時間は次の 3 つに分けて、ターンごとにヒストグラムへ入れる。
+    logic     : ロジックの呼び出し（game_info の組み立てを含む）
+    rules     : 罠の判定と行動の実行
+    recording : 出来事と game_state の記録
+
+    metrics = EngineMetrics()
+    controller = GameController(metrics=metrics)
+    ...
+    print(metrics.to_prometheus())
+"""
+import json
+from bisect import bisect_left
+from collections import Counter
+from time import perf_counter
+
+from events import EVENT_FAILURES
+
+LOGIC = "logic"
+RULES = "rules"
+RECORDING = "recording"
+PHASES = (LOGIC, RULES, RECORDING)
+
+# ヒストグラムの上限（秒）。最後の無限大は Prometheus の "+Inf"
+DEFAULT_BUCKETS = (
+    0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005,
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, float("inf"),
+)
+
+
+class Histogram:
+    __slots__ = ("bounds", "counts", "total", "count")
+
+    def __init__(self, bounds=DEFAULT_BUCKETS):
+        self.bounds = bounds
+        self.counts = [0] * len(bounds)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.total += value
+        self.count += 1
+
+    def cumulative(self):
+        """(上限, その上限以下の観測数) の列"""
+        running = 0
+        for bound, count in zip(self.bounds, self.counts):
+            running += count
+            yield bound, running
+
+    def to_dict(self):
+        return {
+            "buckets": [["+Inf" if bound == float("inf") else bound, count] for bound, count in self.cumulative()],
+            "sum": self.total,
+            "count": self.count,
+        }
+
+
+class EngineMetrics:
+    """1 つ以上のコントローラの計測値を集計する"""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.actions = Counter()   # 行動名 → 実行回数（スタンは "stun"）
+        self.failures = Counter()  # (行動名, 理由) → 回数
+        self.phases = {phase: Histogram(buckets) for phase in PHASES}
+        self.turns = 0
+        self.matches = 0
+        self.match_seconds = 0.0
+        self._stack = []         # 計測中の呼び出しごとの [子の所要時間]
+        self._actions = []       # 実行中の行動名
+        self._turn = None        # 集計中のターン (コントローラ, ターン数)
+        self._turn_acted = False  # 集計中のターンにロボットが行動したか
+        self._turn_times = dict.fromkeys(PHASES, 0.0)
+
+    def instrument(self, controller):
+        """controller のメソッドを計測付きのものに差し替える"""
+        controller.run_logic = self._timed(controller, LOGIC, controller.run_logic)
+        controller.check_traps = self._timed(controller, RULES, controller.check_traps)
+        controller.apply_action = self._timed(controller, RULES, self._counting(controller.apply_action))
+        controller.emit = self._timed(controller, RECORDING, self._classifying(controller.emit))
+        controller.save_game_state = self._timed(controller, RECORDING, controller.save_game_state)
+        controller.game_loop = self._match(controller.game_loop)
+
+    def _timed(self, controller, phase, function):
+        """呼び出しの所要時間から、計測付きの内側の呼び出しの分を除いて phase に加える"""
+        stack = self._stack
+
+        def wrapper(*args, **kwargs):
+            turn = self._turn
+            if turn is None or turn[0] is not controller or turn[1] != controller.turn:
+                self._end_turn()
+                self._turn = (controller, controller.turn)
+            if phase != RECORDING:
+                self._turn_acted = True
+            frame = [0.0]
+            stack.append(frame)
+            start = perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                elapsed = perf_counter() - start
+                stack.pop()
+                if stack:
+                    stack[-1][0] += elapsed
+                self._turn_times[phase] += elapsed - frame[0]
+        return wrapper
+
+    def _counting(self, apply_action):
+        def wrapper(robot, action):
+            self._actions.append(action)
+            try:
+                result = apply_action(robot, action)
+            finally:
+                self._actions.pop()
+            self.actions[result] += 1
+            return result
+        return wrapper
+
+    def _classifying(self, emit):
+        def wrapper(turn, code, *args):
+            if self._actions:
+                reason = EVENT_FAILURES.get(code)
+                if reason is not None:
+                    self.failures[self._actions[-1], reason] += 1
+            return emit(turn, code, *args)
+        return wrapper
+
+    def _match(self, game_loop):
+        def wrapper():
+            start = perf_counter()
+            try:
+                return game_loop()
+            finally:
+                self.match_seconds += perf_counter() - start
+                self.matches += 1
+                self._end_turn()
+        return wrapper
+
+    def _end_turn(self):
+        """集計中のターンの所要時間をヒストグラムに入れる
+
+        試合前の記録や勝敗のログのように、ロボットが行動しなかったターンは数えない。
+        """
+        if self._turn is None:
+            return
+        for phase, elapsed in self._turn_times.items():
+            if self._turn_acted:
+                self.phases[phase].observe(elapsed)
+            self._turn_times[phase] = 0.0
+        if self._turn_acted:
+            self.turns += 1
+        self._turn = None
+        self._turn_acted = False
+
+    @property
+    def matches_per_second(self):
+        """試合の実行時間あたりの試合数"""
+        return self.matches / self.match_seconds if self.match_seconds else 0.0
+
+    def to_dict(self):
+        self._end_turn()
+        return {
+            "actions": dict(self.actions),
+            "failed_actions": [
+                {"action": action, "reason": reason, "count": count}
+                for (action, reason), count in sorted(self.failures.items())
+            ],
+            "turn_phase_seconds": {phase: histogram.to_dict() for phase, histogram in self.phases.items()},
+            "turns": self.turns,
+            "matches": self.matches,
+            "match_seconds": self.match_seconds,
+            "matches_per_second": self.matches_per_second,
+        }
+
+    def to_json(self, **kwargs):
+        return json.dumps(self.to_dict(), **kwargs)
+
+    def to_prometheus(self, prefix="pcrb"):
+        """Prometheus のテキスト形式で返す"""
+        self._end_turn()
+        lines = [
+            f"# HELP {prefix}_actions_total Actions executed, by action name.",
+            f"# TYPE {prefix}_actions_total counter",
+        ]
+        for action, count in sorted(self.actions.items()):
+            lines.append(f'{prefix}_actions_total{{action="{action}"}} {count}')
+        lines += [
+            f"# HELP {prefix}_failed_actions_total Actions that had no effect, by action name and reason.",
+            f"# TYPE {prefix}_failed_actions_total counter",
+        ]
+        for (action, reason), count in sorted(self.failures.items()):
+            lines.append(f'{prefix}_failed_actions_total{{action="{action}",reason="{reason}"}} {count}')
+        lines += [
+            f"# HELP {prefix}_turn_phase_seconds Time spent per turn, by phase.",
+            f"# TYPE {prefix}_turn_phase_seconds histogram",
+        ]
+        for phase, histogram in self.phases.items():
+            for bound, count in histogram.cumulative():
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f'{prefix}_turn_phase_seconds_bucket{{phase="{phase}",le="{le}"}} {count}')
+            lines.append(f'{prefix}_turn_phase_seconds_sum{{phase="{phase}"}} {histogram.total}')
+            lines.append(f'{prefix}_turn_phase_seconds_count{{phase="{phase}"}} {histogram.count}')
+        lines += [
+            f"# HELP {prefix}_turns_total Turns measured.",
+            f"# TYPE {prefix}_turns_total counter",
+            f"{prefix}_turns_total {self.turns}",
+            f"# HELP {prefix}_matches_total Matches played.",
+            f"# TYPE {prefix}_matches_total counter",
+            f"{prefix}_matches_total {self.matches}",
+            f"# HELP {prefix}_match_seconds_total Time spent in game_loop.",
+            f"# TYPE {prefix}_match_seconds_total counter",
+            f"{prefix}_match_seconds_total {self.match_seconds}",
+            f"# HELP {prefix}_matches_per_second Matches per second of game_loop time.",
+            f"# TYPE {prefix}_matches_per_second gauge",
+            f"{prefix}_matches_per_second {self.matches_per_second}",
+        ]
+        return "\n".join(lines) + "\n"
@@ -4,7 +4,9 @@ import streamlit as st
 import sys
 sys.path.append('./pcrb')
 
+from arena import load_robot_pool
 from draw import draw_board_v2 as draw_board
+from win_probability import win_probability_curve
 
 def st_draw_board(data):
     title_holder = st.empty()
@@ -70,6 +72,35 @@ def st_draw_board(data):
     board_holder.pyplot(fig)
 
 
+def st_win_probability(data):
+    """リプレイの各ターンから先攻が勝つ確率を見積もり、折れ線グラフで表示する"""
+    st.subheader("Win Probability")
+    st.caption("各ターンの局面から試合の終わりまでを何度も打ち切り、Robot A の勝ち・引き分け・負けの割合を見積もります。")
+    names = sorted(load_robot_pool())
+    col1, col2 = st.columns(2)
+    with col1:
+        robot_a = st.selectbox("Robot A logic", names, key="win_probability_a")
+    with col2:
+        robot_b = st.selectbox("Robot B logic", names, key="win_probability_b")
+    col1, col2 = st.columns(2)
+    with col1:
+        rollouts = st.number_input("Rollouts", min_value=10, max_value=5000, value=200, step=10)
+    with col2:
+        every = st.number_input("Every N turns", min_value=1, max_value=100, value=5)
+
+    if st.button("Estimate", key="btn_win_probability"):
+        with st.spinner("Running rollouts..."):
+            curve = win_probability_curve(data, (robot_a, robot_b), rollouts=int(rollouts), every=int(every))
+        st.session_state.win_probability = {
+            "turn": [turn for turn, _ in curve],
+            "win": [result.win for _, result in curve],
+            "draw": [result.draw for _, result in curve],
+            "loss": [result.loss for _, result in curve],
+        }
+    if "win_probability" in st.session_state:
+        st.line_chart(st.session_state.win_probability, x="turn", y=["win", "draw", "loss"])
+
+
 def main():
     st.title("Drawer Page") 
     st.caption("対戦ログをアップロードして、ボードを描画します。")
@@ -78,6 +109,7 @@ def main():
     if uploaded_file is not None:
         data = json.load(uploaded_file)
         st_draw_board(data)
+        st_win_probability(data)
 
 
 if __name__ == '__main__':
@@ -3,10 +3,10 @@ import streamlit as st
 import sys
 sys.path.append('./pcrb')
 
-from app import is_safe_code
 from app import load_player_module
 from app import play_game
 from app import game_state_download_button
+from code_check import is_safe_code
 from pages.drawer import st_draw_board
 
 # ----------------------------- メイン UI -----------------------------
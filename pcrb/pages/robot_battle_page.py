@@ -5,15 +5,26 @@ import traceback
 import pandas as pd
 import json
 import base64  
+import time
 
 import sys
 sys.path.append('./pcrb')
 
-from app import is_safe_code
 from app import load_player_module
 from app import play_game
+from arena import FIRST
+from arena import load_robot_pool
+from code_check import is_safe_code
+from match_client import MatchClient
+from matchmaking import AdaptiveRanker
+from matchmaking import rate_pool
+from rating import WIN
+from rating import RatingService
 
 ROBOTS_DIR = "./pcrb/robots"
+# 設定すると、対戦を match_server に任せる（例: http://127.0.0.1:8765）。
+# アップロードしたソースを送るので、サーバーは --allow-source で起動しておく
+MATCH_SERVER_URL = os.environ.get("PCRB_MATCH_SERVER")
 
 
 def upload_and_display_file():
@@ -50,8 +61,11 @@ def get_robot_files():
     return [f for f in os.listdir(ROBOTS_DIR) if f.endswith(".py") and f != "__init__.py"]
 
 
-def battle_with_saved_robots(player_robot_logic):
-    """保存されているロボットと対戦する"""
+def battle_with_saved_robots(player_robot_logic, **game_options):
+    """保存されているロボットと対戦する
+
+    :param game_options: play_game に渡す盤面設定 (max_turn, x_max, y_max, initial_positions)
+    """
     python_files = sorted(get_robot_files())
     results = []
 
@@ -63,7 +77,7 @@ def battle_with_saved_robots(player_robot_logic):
                 enemy_robot_logic = getattr(module, "robot_logic")
 
                 # 先攻: プレイヤーロボット vs 敵ロボット
-                winner, game_state = play_game(player_robot_logic, enemy_robot_logic)
+                winner, game_state = play_game(player_robot_logic, enemy_robot_logic, **game_options)
                 result, color = determine_result(winner, player_robot_name="Robot A", enemy_robot_name="Robot B")
                 game_state_json = json.dumps(game_state, indent=4)
                 b64 = base64.b64encode(game_state_json.encode()).decode()
@@ -71,7 +85,7 @@ def battle_with_saved_robots(player_robot_logic):
                 results.append((module_name + " (プレイヤー:先攻)", f'<span style="color:{color}; font-weight:bold;">{result}</span>', download_link))
 
                 # 後攻: 敵ロボット vs プレイヤーロボット
-                winner, game_state = play_game(enemy_robot_logic, player_robot_logic)
+                winner, game_state = play_game(enemy_robot_logic, player_robot_logic, **game_options)
                 result, color = determine_result(winner, player_robot_name="Robot B", enemy_robot_name="Robot A")
                 game_state_json = json.dumps(game_state, indent=4)
                 b64 = base64.b64encode(game_state_json.encode()).decode()
@@ -85,6 +99,68 @@ def battle_with_saved_robots(player_robot_logic):
     return results
 
 
+def battle_on_match_server(file_content, **game_options):
+    """保存されているロボットとの対戦を match_server に任せ、battle_with_saved_robots と同じ形で結果を返す"""
+    client = MatchClient(MATCH_SERVER_URL)
+    job = client.submit_gauntlet(file_content, **game_options)
+    progress = st.progress(0.0, text="対戦中...")
+    while True:
+        status = client.status(job["id"])
+        progress.progress(status["completed"] / status["total"], text=f"対戦中... ({status['completed']}/{status['total']})")
+        if status["status"] in ("done", "failed"):
+            break
+        time.sleep(0.2)
+    if status["status"] == "failed":
+        st.error(f"Match server error: {status['error']}")
+        return []
+
+    results = []
+    for match in client.results(job["id"]):
+        turn = "先攻" if match["seat"] == FIRST else "後攻"
+        result, color = ("勝利 🏆", "green") if match["winner"] == match["seat"] else ("敗北 ❌", "red")
+        game_state_json = json.dumps(client.replay(match["replay"]), indent=4)
+        b64 = base64.b64encode(game_state_json.encode()).decode()
+        file_name = f"{match['opponent']}_log_{'first' if match['seat'] == FIRST else 'second'}.json"
+        download_link = f'<a href="data:application/json;base64,{b64}" download="{file_name}">Download</a>'
+        results.append((f"{match['opponent']} (プレイヤー:{turn})", f'<span style="color:{color}; font-weight:bold;">{result}</span>', download_link))
+    return results
+
+
+@st.cache_resource
+def load_rated_pool(x_max, y_max, max_turn, initial_positions):
+    """保存されているロボットの総当たりでレーティングを作る（盤面設定ごとにキャッシュ）"""
+    pool = load_robot_pool()
+    service = rate_pool(
+        pool, x_max=x_max, y_max=y_max, max_turn=max_turn, initial_positions=initial_positions)
+    return pool, service.to_dict()
+
+
+def rank_with_adaptive_matchmaking(player_robot_logic, **game_options):
+    """情報量の多い相手から順に対戦し、少ない試合数でプレイヤーの順位を推定する"""
+    pool, ratings = load_rated_pool(**game_options)
+    service = RatingService.from_dict(ratings)
+    ranker = AdaptiveRanker(service, "player", player_robot_logic, pool, game_options=game_options)
+    placement = ranker.run()
+
+    results = []
+    for opponent, seat, score in placement.matches:
+        turn = "先攻" if seat == FIRST else "後攻"
+        result, color = ("勝利 🏆", "green") if score == WIN else ("敗北 ❌", "red")
+        results.append((f"{opponent} (プレイヤー:{turn})", f'<span style="color:{color}; font-weight:bold;">{result}</span>', ""))
+    return placement, results
+
+
+def display_placement(placement, pool_size):
+    """推定順位を表示する"""
+    st.subheader("📈 推定順位")
+    st.markdown(f"""
+        <div style="text-align:center;">
+            <h2 style="margin:0;">{placement.rank} 位 / {pool_size + 1} 体中</h2>
+            <p style="font-size:14px; color:gray;">(信頼区間: {placement.best_rank}〜{placement.worst_rank} 位, 試合数: {len(placement.matches)} 戦)</p>
+        </div>
+    """, unsafe_allow_html=True)
+
+
 def determine_result(winner, player_robot_name="Robot A", enemy_robot_name="Robot B"):
     """勝敗結果を判定する"""
     if winner.name == player_robot_name:
@@ -120,6 +196,22 @@ def display_results(results):
         st.info("対戦相手が見つかりませんでした。")
 
 
+def select_game_options():
+    """盤面サイズなどの対戦設定を選択する"""
+    with st.expander("盤面設定", expanded=False):
+        cols = st.columns(4)
+        x_max = cols[0].number_input("x_max", min_value=3, max_value=1000, value=9)
+        y_max = cols[1].number_input("y_max", min_value=1, max_value=1000, value=7)
+        max_turn = cols[2].number_input("max_turn", min_value=1, max_value=100000, value=100)
+        initial_positions = cols[3].selectbox("初期位置", ["mirrored", "corners", "random"])
+    return {
+        "x_max": int(x_max),
+        "y_max": int(y_max),
+        "max_turn": int(max_turn),
+        "initial_positions": initial_positions,
+    }
+
+
 def main():
     st.title("Robot Battle Page")
 
@@ -140,13 +232,23 @@ def main():
 
     st.write("---")
 
+    game_options = select_game_options()
+    adaptive = st.checkbox("適応的マッチング（順位が定まるまで、情報量の多い相手とだけ対戦する）", value=False)
+
     st.subheader("ロジックファイルのアップロード")
     file_content = upload_and_display_file()
 
     if file_content and validate_code(file_content):
         player_robot_logic = load_robot_logic(file_content)
-        if player_robot_logic:
-            results = battle_with_saved_robots(player_robot_logic)
+        if player_robot_logic and adaptive:
+            placement, results = rank_with_adaptive_matchmaking(player_robot_logic, **game_options)
+            display_placement(placement, len(get_robot_files()))
+            display_results(results)
+        elif player_robot_logic and MATCH_SERVER_URL:
+            results = battle_on_match_server(file_content, **game_options)
+            display_results(results)
+        elif player_robot_logic:
+            results = battle_with_saved_robots(player_robot_logic, **game_options)
             display_results(results)
         else:
             st.error("No function named `robot_logic` found in the uploaded file.")
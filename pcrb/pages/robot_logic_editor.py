@@ -6,6 +6,30 @@ import traceback
 from controller import GameController
 from robot import Robot
 from draw import draw_board_v2 as draw_board
+from timeline import MatchTimeline
+
+
+def load_logic(code, label):
+    """コードを exec して robot_logic を取り出す（失敗したらエラーを表示して止める）"""
+    try:
+        exec_globals = {}
+        exec(code, exec_globals)
+    except Exception:
+        st.error(f"Error in {label} code:\n{traceback.format_exc()}")
+        st.stop()
+    robot_logic_fn = exec_globals.get("robot_logic")
+    if not robot_logic_fn:
+        st.error(f"{label} code に robot_logic() が見つかりません。")
+        st.stop()
+    return robot_logic_fn
+
+
+def last_action_of(game_state, robot_name):
+    """game_state の中で robot_name が最後に行った行動"""
+    for state in reversed(game_state[1:]):
+        if state["action"]["robot_name"] == robot_name:
+            return state["action"]["action"]
+    return None
 
 def main():
 
@@ -46,7 +70,6 @@ def main():
     # ------------------------------------------------------------------------
     session_defaults = {
         "robot_code":           default_code,
-        "last_opponent_action": None,
         "show_initial_state":   True,
     }
 
@@ -56,36 +79,41 @@ def main():
     # ------------------------------------------------------------------------
     # GameController とロボットをセッションに保持
     # ------------------------------------------------------------------------
-    if "controller" not in st.session_state:
-        controller = GameController()
-        player     = Robot("Robot A",   1, 3, None, controller)
-        enemy      = Robot("Robot B", 7, 3, None, controller)
+    with st.sidebar:
+        st.subheader("Board Settings")
+        board_x_max = int(st.number_input("x_max", min_value=3, max_value=1000, value=9))
+        board_y_max = int(st.number_input("y_max", min_value=1, max_value=1000, value=7))
+        board_settings = (board_x_max, board_y_max)
+
+    if "controller" not in st.session_state or st.session_state.get("board_settings") != board_settings:
+        controller = GameController(x_max=board_x_max, y_max=board_y_max)
+        position1  = controller.robot1_initial_position
+        position2  = controller.robot2_initial_position
+        player     = Robot("Robot A", position1['x'], position1['y'], None, controller)
+        enemy      = Robot("Robot B", position2['x'], position2['y'], None, controller)
         controller.set_robots(player, enemy)
 
+        st.session_state["board_settings"] = board_settings
+        st.session_state["show_initial_state"] = True
+
         st.session_state["controller"]     = controller
         st.session_state["player_robot"]   = player
         st.session_state["opponent_robot"] = enemy
+        st.session_state["timeline"]       = MatchTimeline(controller)  # 手番ごとのチェックポイント
     else:
         controller   = st.session_state["controller"]
         player       = st.session_state["player_robot"]
         enemy        = st.session_state["opponent_robot"]
+    timeline = st.session_state["timeline"]
+    turn_steps = len(controller.robots)  # この画面の 1 ターン = 全員が 1 回ずつ行動
 
     # ------------------------------------------------------------------------
     # 画面レイアウト
     # ------------------------------------------------------------------------
     st.title("Robot Logic Editor")
 
-    # 現在のゲームの状況を描画
-    if controller.game_state:
-        settings = controller.game_state[0]['settings']
-        x_max = settings['x_max']
-        y_max = settings['y_max']
-
-        current_turn_data = controller.game_state[-1]
-        if "robots" in current_turn_data:
-            fig_placeholder = st.empty()  # プレースホルダーを作成
-            fig = draw_board(current_turn_data, x_max, y_max, title="Current Game State", is_show=False)
-            fig_placeholder.pyplot(fig, use_container_width=True)
+    # 現在のゲームの状況は、ボタンの処理を終えてから最後に描画する
+    fig_placeholder = st.empty()
 
     left_col, right_col = st.columns(2)
 
@@ -124,15 +152,20 @@ def main():
     with right_col:
 
         # ----------------- ボタン群 -----------------
-        cols_btn = st.columns(2)
-        run_turn_clicked  = cols_btn[0].button("Run Turn")
-        reset_clicked     = cols_btn[1].button("Reset Game")
+        cols_btn = st.columns(4)
+        run_turn_clicked   = cols_btn[0].button("Run Turn")
+        run_to_end_clicked = cols_btn[1].button("Run to End")
+        step_back_clicked  = cols_btn[2].button("Step Back")
+        reset_clicked      = cols_btn[3].button("Reset Game")
+        cols_run = st.columns(2)
+        turns_to_run = int(cols_run[0].number_input("Turns to run", min_value=1, max_value=controller.max_turn, value=10))
+        run_n_clicked = cols_run[1].button(f"Run {turns_to_run} Turns")
 
         # ----------------- リセット -----------------
         if reset_clicked:
             controller.reset()
+            st.session_state["timeline"] = MatchTimeline(controller)
             st.session_state["show_initial_state"]     = True
-            st.session_state["last_opponent_action"]   = None
             st.success("Game reset. Press Run Turn to begin.")
             st.stop()                              # 以降の描画を止めてページ再描画
 
@@ -143,81 +176,66 @@ def main():
             st.write(controller.game_state[-1])
 
         # ----------------- ゲーム終了判定 -----------------
-        if player.hp <= 0 or enemy.hp <= 0:
-            loser = "Player Robot" if player.hp <= 0 else "Opponent Robot"
-            st.warning(f"Game Over! **{loser}** has 0 HP.")
-            if run_turn_clicked:           # 終了後に Run Turn を押されたら無視
-                st.info("Press **Reset Game** to start a new match.")
-            # Run Turn 以降の処理を行わない
-            run_turn_clicked = False
-
-        # ----------------- Run Turn 本体 -----------------
-        if run_turn_clicked:
+        run_clicked = run_turn_clicked or run_n_clicked or run_to_end_clicked
+        if controller.is_game_over():
+            loser = "Opponent Robot" if controller.winner() is player else "Player Robot"
+            st.warning(f"Game Over! **{loser}** lost.")
+            if run_clicked:                # 終了後に Run を押されたら無視
+                st.info("Press **Step Back** or **Reset Game** to continue.")
+            # Run 以降の処理を行わない
+            run_clicked = False
+
+        # ----------------- 進める -----------------
+        if run_clicked:
             st.session_state["show_initial_state"] = False   # 初期表示を今後は出さない
 
-            # 1) ユーザ側ロジックを exec
-            try:
-                exec_globals = {}
-                exec(st.session_state["robot_code"], exec_globals)
-                robot_logic_fn = exec_globals.get("robot_logic")
-                if not robot_logic_fn:
-                    st.error("Left pane code に robot_logic() が見つかりません。")
-                    st.stop()
-                player.robot_logic = robot_logic_fn
-            except Exception:
-                st.error(f"Error in player code:\n{traceback.format_exc()}")
-                st.stop()
+            # コードが前回と同じなら、戻った後に先のチェックポイントを使い回す
+            player_logic = load_logic(st.session_state["robot_code"], "player")
+            opponent_logic = load_logic(robot_code_text, "opponent")
+            timeline.set_logics([player_logic, opponent_logic], key=(st.session_state["robot_code"], robot_code_text))
 
-            # 2) 敵ロボロジックを exec
+            start = len(controller.game_state)
             try:
-                opp_globals = {}
-                exec(robot_code_text, opp_globals)
-                opponent_logic_fn = opp_globals.get("robot_logic")
-                if not opponent_logic_fn:
-                    st.error("Opponent robot code に robot_logic() が見つかりません。")
-                    st.stop()
-                enemy.robot_logic = opponent_logic_fn
+                if run_to_end_clicked:
+                    advanced = timeline.run_to_end()
+                else:
+                    advanced = timeline.step(turn_steps * (1 if run_turn_clicked else turns_to_run))
             except Exception:
-                st.error(f"Error in opponent code:\n{traceback.format_exc()}")
+                st.error(f"Error while running the match:\n{traceback.format_exc()}")
                 st.stop()
 
-            # 3) プレイヤーターン
-            game_info = controller.build_game_info(player)
-            if game_info is not None:
-                player_action, player_memo = controller.run_logic(player)
-                controller.save_game_state(player.name, player_action)
-                controller.turn += 1
-                st.success("Player turn executed!")
-                st.write("Player Action:", player_action)
-                st.write("Player Memo:", player_memo)
-                st.write("Game State after Player:", controller.game_state[-1])
-            else:
-                st.warning("No valid game_info for Player ‒ turn skipped.")
-
-            # 4) 敵ターン
-            game_info = controller.build_game_info(enemy)
-            if game_info is not None:
-                opponent_action, opponent_memo = controller.run_logic(enemy)
-                controller.save_game_state(enemy.name, opponent_action)
-                controller.turn += 1
-                st.session_state["last_opponent_action"] = opponent_action
-                st.write("Opponent Action:", opponent_action)
-                st.write("Opponent Memo:", opponent_memo)
-                st.write("Game State after Opponent:", controller.game_state[-1])
+            if run_turn_clicked:
+                for state in controller.game_state[start:]:
+                    label = "Player" if state["action"]["robot_name"] == player.name else "Opponent"
+                    st.write(f"{label} Action:", state["action"]["action"])
+                    st.write(f"{label} Memo changes:", state.get("memos", {}).get(state["action"]["robot_name"], {}))
+                    st.write(f"Game State after {label}:", state)
             else:
-                st.warning("No valid game_info for Opponent ‒ turn skipped.")
+                st.success(f"Advanced {advanced} robot turns.")
+
+        # ----------------- 戻る -----------------
+        if step_back_clicked:
+            timeline.back(turn_steps)
 
-            # 再描画処理
-            if controller.game_state:
-                current_turn_data = controller.game_state[-1]
-                if "robots" in current_turn_data:
-                    fig = draw_board(current_turn_data, x_max, y_max, title="Current Game State", is_show=False)
-                    fig_placeholder.pyplot(fig, use_container_width=True)  # 上部の画像を更新
+        # ----------------- チェックポイントの移動 -----------------
+        if timeline.length:
+            position = st.slider("Checkpoint (robot turns played)", 0, timeline.length, timeline.position)
+            if position != timeline.position:
+                timeline.seek(position)
 
         # ----------------- 直前の敵アクション -----------------
-        if st.session_state["last_opponent_action"] is not None:
+        last_opponent_action = last_action_of(controller.game_state, enemy.name)
+        if last_opponent_action is not None:
             st.subheader("Last Opponent Action")
-            st.write(st.session_state["last_opponent_action"])
+            st.write(last_opponent_action)
+
+    # ----------------- 盤面の描画 -----------------
+    settings = controller.game_state[0]['settings']
+    current_turn_data = controller.game_state[-1]
+    if "robots" in current_turn_data:
+        fig = draw_board(current_turn_data, settings['x_max'], settings['y_max'],
+                         title=f"Current Game State (turn {controller.turn})", is_show=False)
+        fig_placeholder.pyplot(fig, use_container_width=True)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,365 @@
+"""決定的なロボットのロジックを、観測から行動を引く表に変換する
+
+robot_07_basic_bot のように、自分の位置・SP・敵の位置などの小さな観測だけで行動が決まるロジックは、
+取りうる観測を全て試して結果を密な配列に記録しておけば、試合中は表を引くだけで済む。
+
+    table = compile_policy(pool["robot_07_basic_bot"])
+    table(robot, game_info, memos)   # 元の robot_logic と同じ行動を返す
+
+ロジックが読んだ値だけを観測の成分（FEATURES）にする。読んだ値は記録用の robot / game_info で調べ、
+新しい成分を読んだら、その成分を加えて列挙をやり直す。
+次のロジックは変換できない（ValueError）。
+    ・memos を読み書きする、またはメモを返す
+    ・乱数を使う、グローバル変数や外側の変数に状態を持つ
+    ・FEATURES にない値（ロボット名、敵の SP、enemies など）を読む
+表の範囲外の観測（盤面の大きさが違うなど）では元のロジックを呼ぶ。
+"""
+import dis
+import inspect
+import itertools
+import random
+
+import numpy as np
+
+from robot import Robot
+from robot_state import CAMOUFLAGE_ACTIVE
+from robot_state import DEFEND_ACTIVE
+from robot_state import HP
+from robot_state import INITIAL_HP
+from robot_state import INITIAL_SP
+from robot_state import PARRY_ACTIVE
+from robot_state import SCAN_ACTIVE
+from robot_state import SP
+from robot_state import X
+from robot_state import Y
+
+# 観測の成分として扱うアクションのフラグ（robot.<名前>.is_active）。成分名はアクション名と同じ
+FLAG_ACTIONS = ("defend", "parry", "camouflage", "scan")
+# スキャン中だけ game_info に入るキー
+SCAN_KEYS = ("enemy_sp", "enemy_traps")
+# 表の大きさの上限（要素数）
+MAX_ENTRIES = 4_000_000
+
+_compiled = {}  # compile_pool の結果: (robot_logic, 設定) → PolicyTable（変換できなければ None）
+
+
+def _action_classes():
+    robot = Robot("", 0, 0, None, None)
+    return {
+        name: type(getattr(robot, name))
+        for name in Robot.__slots__ if not name.startswith("_") and name not in ("robot_logic", "controller")
+    }
+
+
+ACTION_CLASSES = _action_classes()
+
+
+# 値の読み先
+STATE = 0   # robot の状態配列 (robot_state)
+INFO = 1    # game_info のキー
+ENEMY = 2   # game_info["enemy_position"] の成分
+
+# 成分名 → (読み先, 添字またはキー, 範囲外の値を端に寄せるか, 取りうる値の数を設定から求める関数)
+# sp は上限がないので sp_limit で打ち切り、それより大きい値でも行動が変わらないことを確かめる
+FEATURES = {
+    "turn": (INFO, "turn", False, lambda options: options["max_turn"] + 1),
+    "x": (STATE, X, False, lambda options: options["x_max"]),
+    "y": (STATE, Y, False, lambda options: options["y_max"]),
+    "hp": (STATE, HP, True, lambda options: INITIAL_HP + 1),
+    "sp": (STATE, SP, True, lambda options: options["sp_limit"] + 1),
+    "enemy_x": (ENEMY, 0, False, lambda options: options["x_max"]),
+    "enemy_y": (ENEMY, 1, False, lambda options: options["y_max"]),
+    "enemy_hp": (INFO, "enemy_hp", True, lambda options: INITIAL_HP + 1),
+    "defend": (STATE, DEFEND_ACTIVE, False, lambda options: 2),
+    "parry": (STATE, PARRY_ACTIVE, False, lambda options: 2),
+    "camouflage": (STATE, CAMOUFLAGE_ACTIVE, False, lambda options: 2),
+    "scan": (STATE, SCAN_ACTIVE, False, lambda options: 2),
+}
+
+
+class _ObservedMemos:
+    """memos に触れたら変換をやめる"""
+    __slots__ = ()
+
+    def _reject(self, *args, **kwargs):
+        raise ValueError("robot_logic uses memos.")
+
+    __getitem__ = __setitem__ = __delitem__ = __contains__ = __iter__ = __len__ = __bool__ = _reject
+
+    def __getattr__(self, name):
+        self._reject()
+
+
+class _ObservedAction:
+    """robot.<アクション> の代わり。クラスの定数と is_active のフラグだけ読める"""
+    __slots__ = ("_observation", "_name")
+
+    def __init__(self, observation, name):
+        self._observation = observation
+        self._name = name
+
+    def __getattr__(self, attribute):
+        if attribute == "is_active" and self._name in FLAG_ACTIONS:
+            return bool(self._observation.read(self._name))
+        value = inspect.getattr_static(ACTION_CLASSES[self._name], attribute, None)
+        if isinstance(value, (bool, int, float, str, tuple)):
+            return value
+        raise ValueError(f"robot_logic reads robot.{self._name}.{attribute}, which is not part of the observation.")
+
+
+class _ObservedRobot:
+    """robot の代わり。読んだ成分を記録する"""
+    __slots__ = ("_observation",)
+
+    def __init__(self, observation):
+        self._observation = observation
+
+    @property
+    def x(self):
+        return self._observation.read("x")
+
+    @property
+    def y(self):
+        return self._observation.read("y")
+
+    @property
+    def position(self):
+        return self._observation.read("x"), self._observation.read("y")
+
+    @property
+    def hp(self):
+        return self._observation.read("hp")
+
+    @property
+    def sp(self):
+        return self._observation.read("sp")
+
+    def __getattr__(self, name):
+        if name in ACTION_CLASSES:
+            return _ObservedAction(self._observation, name)
+        raise ValueError(f"robot_logic reads robot.{name}, which is not part of the observation.")
+
+
+class _ObservedInfo:
+    """game_info の代わり。読んだ成分を記録する"""
+    __slots__ = ("_observation",)
+
+    def __init__(self, observation):
+        self._observation = observation
+
+    def __getitem__(self, key):
+        observation = self._observation
+        if key == "enemy_position":
+            return observation.read("enemy_x"), observation.read("enemy_y")
+        if key in ("turn", "enemy_hp"):
+            return observation.read(key)
+        if key in ("max_turn", "board_size"):
+            observation.constants.add(key)
+            return observation.constant(key)
+        if key in SCAN_KEYS and not observation.read("scan"):
+            raise KeyError(key)
+        raise ValueError(f"robot_logic reads game_info['{key}'], which is not part of the observation.")
+
+    def get(self, key, default=None):
+        if key in SCAN_KEYS and not self._observation.read("scan"):
+            return default
+        return self[key]
+
+    def __contains__(self, key):
+        if key in SCAN_KEYS:
+            return bool(self._observation.read("scan"))
+        return key in ("turn", "enemy_hp", "enemy_position", "max_turn", "board_size", "enemies")
+
+
+class _Observation:
+    """列挙中の観測。values にない成分を読んだら reads に残して既定値を返す"""
+
+    def __init__(self, options):
+        self.options = options
+        self.values = {}
+        self.reads = set()
+        self.constants = set()  # 読んだ設定値 (max_turn, board_size)
+        self.robot = _ObservedRobot(self)
+        self.info = _ObservedInfo(self)
+
+    def read(self, feature):
+        self.reads.add(feature)
+        return self.values.get(feature, 0)
+
+    def constant(self, key):
+        if key == "max_turn":
+            return self.options["max_turn"]
+        return {"x_max": self.options["x_max"], "y_max": self.options["y_max"]}
+
+
+def _check_static(robot_logic):
+    """コードを見て、乱数や状態を持つロジックを弾く"""
+    code = getattr(robot_logic, "__code__", None)
+    if code is None:
+        raise ValueError(f"{robot_logic!r} is not a Python function.")
+    codes = [code]
+    names = set()
+    for code in codes:
+        names.update(code.co_names)
+        codes.extend(const for const in code.co_consts if inspect.iscode(const))
+        for instruction in dis.get_instructions(code):
+            if instruction.opname in ("STORE_GLOBAL", "DELETE_GLOBAL", "STORE_DEREF", "DELETE_DEREF"):
+                if instruction.opname.endswith("DEREF") and instruction.argval in code.co_cellvars:
+                    continue  # 関数の中で閉じた変数は呼び出しごとに作り直される
+                raise ValueError(f"robot_logic keeps state in '{instruction.argval}'.")
+    if "random" in names or "secrets" in names:
+        raise ValueError("robot_logic uses random numbers.")
+    global_values = robot_logic.__globals__
+    for name in names:
+        value = global_values.get(name)
+        if isinstance(value, random.Random) or getattr(value, "__module__", None) in ("random", "secrets"):
+            raise ValueError(f"robot_logic uses random numbers through '{name}'.")
+
+
+def _evaluate(robot_logic, observation, values):
+    observation.values = values
+    try:
+        response = robot_logic(observation.robot, observation.info, _ObservedMemos())
+    except ValueError:
+        raise
+    except Exception as error:
+        raise ValueError(f"robot_logic failed on observation {values}: {error!r}") from error
+    if isinstance(response, (list, tuple)):
+        raise ValueError("robot_logic returns memos.")
+    return response
+
+
+def _enumerate(robot_logic, observation, features, domains):
+    """features の全ての値の組でロジックを呼び、行動のリストを返す（新しい成分を読んだら None）"""
+    responses = []
+    allowed = set(features)
+    for combination in itertools.product(*(range(size) for size in domains)):
+        responses.append(_evaluate(robot_logic, observation, dict(zip(features, combination))))
+        if not observation.reads <= allowed:
+            return None
+    return responses
+
+
+class PolicyTable:
+    """表を引いて行動を返す robot_logic"""
+
+    def __init__(self, robot_logic, features, domains, actions, codes, options, constants=()):
+        self.robot_logic = robot_logic
+        self.features = tuple(features)
+        self.actions = tuple(actions)
+        self.options = options
+        self.codes = codes  # 観測の番号 → actions の添字（bytes）
+        # ロジックが読んだ設定値。試合の設定が違えば表は使えない
+        self.constants = {key: _Observation(options).constant(key) for key in constants}
+        strides = np.cumprod((1,) + tuple(domains[:0:-1]))[::-1] if domains else ()
+        self._reads_enemy = any(FEATURES[feature][0] == ENEMY for feature in features)
+        self._readers = tuple(
+            (*FEATURES[feature][:3], int(stride), size) for feature, size, stride in zip(features, domains, strides))
+
+    @property
+    def size(self):
+        return len(self.codes)
+
+    def __call__(self, robot, game_info, memos):
+        if self.constants and any(game_info[key] != value for key, value in self.constants.items()):
+            return self.robot_logic(robot, game_info, memos)
+        state = robot._state
+        enemy_position = game_info["enemy_position"] if self._reads_enemy else None
+        index = 0
+        for source, key, clamp, stride, size in self._readers:
+            if source is STATE:
+                value = state[key]
+            elif source is ENEMY:
+                value = enemy_position[key]
+            else:
+                value = game_info[key]
+            if 0 <= value < size:
+                # 防御で半減したダメージなど、整数でない値は表にない
+                if type(value) is not int:
+                    if value != int(value):
+                        return self.robot_logic(robot, game_info, memos)
+                    value = int(value)
+                index += stride * value
+            elif clamp:
+                index += stride * (0 if value < 0 else size - 1)
+            else:
+                return self.robot_logic(robot, game_info, memos)
+        return self.actions[self.codes[index]]
+
+    def __getstate__(self):
+        return (self.robot_logic, self.features, self.actions, self.codes, self.options, tuple(self.constants))
+
+    def __setstate__(self, state):
+        robot_logic, features, actions, codes, options, constants = state
+        domains = [FEATURES[feature][3](options) for feature in features]
+        self.__init__(robot_logic, features, domains, actions, codes, options, constants)
+
+    def __repr__(self):
+        return f"PolicyTable(features={self.features}, actions={self.actions}, size={self.size})"
+
+
+def compile_policy(robot_logic, x_max=9, y_max=7, max_turn=100, sp_limit=INITIAL_SP, max_entries=MAX_ENTRIES):
+    """robot_logic を PolicyTable に変換する。変換できなければ ValueError
+
+    :param sp_limit: 表に記録する SP の上限。これより大きい SP では sp_limit のときと同じ行動を取る必要がある
+    """
+    _check_static(robot_logic)
+    options = {"x_max": x_max, "y_max": y_max, "max_turn": max_turn, "sp_limit": sp_limit}
+    observation = _Observation(options)
+    rng_states = (random.getstate(), np.random.get_state()[1].tobytes())
+
+    _evaluate(robot_logic, observation, {})
+    while True:
+        features = [feature for feature in FEATURES if feature in observation.reads]
+        domains = [FEATURES[feature][3](options) for feature in features]
+        entries = int(np.prod(domains, dtype=np.int64))
+        if entries > max_entries:
+            raise ValueError(f"Policy table for {features} needs {entries} entries (max {max_entries}).")
+        responses = _enumerate(robot_logic, observation, features, domains)
+        if responses is not None:
+            break
+
+    if "sp" in features:
+        # SP が表の上限を超えても行動が変わらないこと
+        others = [range(size) for feature, size in zip(features, domains) if feature != "sp"]
+        others_features = [feature for feature in features if feature != "sp"]
+        for combination in itertools.product(*others):
+            values = dict(zip(others_features, combination))
+            expected = _evaluate(robot_logic, observation, {**values, "sp": sp_limit})
+            for sp in (sp_limit + 1, 2 * sp_limit + 1, 10 * sp_limit + 1000):
+                if _evaluate(robot_logic, observation, {**values, "sp": sp}) != expected:
+                    raise ValueError(f"robot_logic depends on sp above sp_limit={sp_limit}.")
+
+    # 同じ観測に同じ行動を返すこと（一部を呼び直して確かめる）
+    for index in range(0, len(responses), max(len(responses) // 1000, 1)):
+        combination = np.unravel_index(index, domains) if domains else ()
+        values = {feature: int(value) for feature, value in zip(features, combination)}
+        if _evaluate(robot_logic, observation, values) != responses[index]:
+            raise ValueError("robot_logic is not deterministic.")
+    if (random.getstate(), np.random.get_state()[1].tobytes()) != rng_states:
+        raise ValueError("robot_logic uses random numbers.")
+    if not observation.reads <= set(features):
+        raise ValueError(f"robot_logic reads {sorted(observation.reads - set(features))} only for sp > sp_limit.")
+
+    actions = {}
+    codes = [actions.setdefault(response, len(actions)) for response in responses]
+    if len(actions) > 256:
+        raise ValueError("robot_logic returns more than 256 different actions.")
+    return PolicyTable(robot_logic, features, domains, list(actions), bytes(codes), options, observation.constants)
+
+
+def compile_pool(pool, **options):
+    """{名前: robot_logic} のうち変換できるものを PolicyTable に置き換えた辞書を返す
+
+    変換の結果（変換できなかったことも含む）はプロセス内で覚えておき、同じロジックと設定では使い回す。
+    """
+    compiled = {}
+    for name, robot_logic in pool.items():
+        key = (robot_logic, tuple(sorted(options.items())))
+        if key not in _compiled:
+            try:
+                _compiled[key] = compile_policy(robot_logic, **options)
+            except ValueError:
+                _compiled[key] = None
+        compiled[name] = robot_logic if _compiled[key] is None else _compiled[key]
+    return compiled
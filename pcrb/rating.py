@@ -0,0 +1,250 @@
+"""対戦結果のストリームからロボットのレーティングを逐次更新する
+
+1 件の結果ごとに当事者 2 体のレーティングだけを O(1) で更新するため、
+履歴を再計算せずにランキングを返せる。状態は JSON でチェックポイントできる。
+
+    service = RatingService(TrueSkillModel(), checkpoint_path="ratings.json")
+    service.consume(results)        # (robot_a, robot_b, score_a) の反復可能オブジェクト
+    service.leaderboard(top=10)
+"""
+import json
+import math
+import os
+from statistics import NormalDist
+
+_NORMAL = NormalDist()
+
+WIN = 1.0
+DRAW = 0.5
+LOSS = 0.0
+
+
+def result_from_winner(robot_a, robot_b, winner):
+    """勝者名から (robot_a, robot_b, score_a) の結果を作る（winner=None は引き分け）"""
+    if winner is None:
+        return robot_a, robot_b, DRAW
+    if winner == robot_a:
+        return robot_a, robot_b, WIN
+    if winner == robot_b:
+        return robot_a, robot_b, LOSS
+    raise ValueError(f"Winner '{winner}' is neither '{robot_a}' nor '{robot_b}'.")
+
+
+class Rating:
+    __slots__ = ("mu", "sigma", "games")
+
+    def __init__(self, mu, sigma=0.0, games=0):
+        self.mu = mu
+        self.sigma = sigma
+        self.games = games
+
+    def to_dict(self):
+        return {"mu": self.mu, "sigma": self.sigma, "games": self.games}
+
+    def __repr__(self):
+        return f"Rating(mu={self.mu:.2f}, sigma={self.sigma:.2f}, games={self.games})"
+
+
+class EloModel:
+    """Elo レーティング（sigma は使わない）"""
+    name = "elo"
+
+    def __init__(self, initial=1500.0, k=32.0, scale=400.0):
+        self.initial = initial
+        self.k = k
+        self.scale = scale
+
+    def create(self):
+        return Rating(self.initial)
+
+    def expected_score(self, rating_a, rating_b):
+        return 1.0 / (1.0 + 10 ** ((rating_b.mu - rating_a.mu) / self.scale))
+
+    def update(self, rating_a, rating_b, score_a):
+        delta = self.k * (score_a - self.expected_score(rating_a, rating_b))
+        rating_a.mu += delta
+        rating_b.mu -= delta
+
+    def conservative(self, rating):
+        return rating.mu
+
+    def params(self):
+        return {"initial": self.initial, "k": self.k, "scale": self.scale}
+
+
+class TrueSkillModel:
+    """1 対 1 の TrueSkill（平均 mu と不確かさ sigma を持つ）"""
+    name = "trueskill"
+
+    def __init__(self, mu=25.0, sigma=25.0 / 3, beta=25.0 / 6, tau=25.0 / 300, draw_probability=0.1):
+        self.mu = mu
+        self.sigma = sigma
+        self.beta = beta
+        self.tau = tau
+        self.draw_probability = draw_probability
+        self.draw_margin = _NORMAL.inv_cdf((draw_probability + 1) / 2) * math.sqrt(2) * beta
+
+    def create(self):
+        return Rating(self.mu, self.sigma)
+
+    def expected_score(self, rating_a, rating_b):
+        """rating_a が勝つ確率（引き分けは考慮しない）"""
+        c = math.sqrt(2 * self.beta ** 2 + rating_a.sigma ** 2 + rating_b.sigma ** 2)
+        return _NORMAL.cdf((rating_a.mu - rating_b.mu) / c)
+
+    def update(self, rating_a, rating_b, score_a):
+        if score_a == DRAW:
+            self._update(rating_a, rating_b, draw=True)
+        elif score_a > DRAW:
+            self._update(rating_a, rating_b, draw=False)
+        else:
+            self._update(rating_b, rating_a, draw=False)
+
+    def _update(self, winner, loser, draw):
+        winner_var = winner.sigma ** 2 + self.tau ** 2
+        loser_var = loser.sigma ** 2 + self.tau ** 2
+        c = math.sqrt(2 * self.beta ** 2 + winner_var + loser_var)
+        t = (winner.mu - loser.mu) / c
+        epsilon = self.draw_margin / c
+
+        if draw:
+            v, w = _v_w_draw(t, epsilon)
+        else:
+            v, w = _v_w_win(t, epsilon)
+
+        winner.mu += winner_var / c * v
+        loser.mu -= loser_var / c * v
+        winner.sigma = math.sqrt(winner_var * max(1 - winner_var / c ** 2 * w, 1e-12))
+        loser.sigma = math.sqrt(loser_var * max(1 - loser_var / c ** 2 * w, 1e-12))
+
+    def conservative(self, rating):
+        """ランキング用の控えめな評価値 (mu - 3 sigma)"""
+        return rating.mu - 3 * rating.sigma
+
+    def params(self):
+        return {
+            "mu": self.mu, "sigma": self.sigma, "beta": self.beta,
+            "tau": self.tau, "draw_probability": self.draw_probability,
+        }
+
+
+def _v_w_win(t, epsilon):
+    x = t - epsilon
+    denominator = _NORMAL.cdf(x)
+    if denominator < 1e-300:
+        # 大番狂わせでは v ≒ -x, w ≒ 1 に近づく
+        return -x, 1.0
+    v = _NORMAL.pdf(x) / denominator
+    return v, v * (v + x)
+
+
+def _v_w_draw(t, epsilon):
+    upper, lower = epsilon - t, -epsilon - t
+    denominator = _NORMAL.cdf(upper) - _NORMAL.cdf(lower)
+    if denominator < 1e-300:
+        return (-t - epsilon if t < 0 else -t + epsilon), 1.0
+    v = (_NORMAL.pdf(lower) - _NORMAL.pdf(upper)) / denominator
+    w = v ** 2 + (upper * _NORMAL.pdf(upper) - lower * _NORMAL.pdf(lower)) / denominator
+    return v, w
+
+
+MODELS = {
+    EloModel.name: EloModel,
+    TrueSkillModel.name: TrueSkillModel,
+}
+
+
+class RatingService:
+    def __init__(self, model=None, checkpoint_path=None, checkpoint_every=1000):
+        """
+        :param model: EloModel / TrueSkillModel（省略時は TrueSkillModel）
+        :param checkpoint_path: チェックポイントの保存先（None なら保存しない）
+        :param checkpoint_every: この件数の結果ごとに自動で保存する
+        """
+        self.model = TrueSkillModel() if model is None else model
+        self.checkpoint_path = checkpoint_path
+        self.checkpoint_every = checkpoint_every
+        self.ratings = {}
+        self.results_count = 0
+        self._leaderboard = None  # 並べ替え済みのランキング（更新で破棄）
+
+    def rating(self, name):
+        """name のレーティングを返す（未登録なら初期値で登録する）"""
+        rating = self.ratings.get(name)
+        if rating is None:
+            rating = self.ratings[name] = self.model.create()
+            self._leaderboard = None
+        return rating
+
+    def record(self, robot_a, robot_b, score_a):
+        """1 試合の結果を反映する (score_a: 1=robot_a の勝ち, 0.5=引き分け, 0=負け)"""
+        if robot_a == robot_b:
+            raise ValueError(f"A robot cannot play against itself: {robot_a}")
+        if score_a not in (WIN, DRAW, LOSS):
+            raise ValueError(f"Invalid score: {score_a}")
+
+        rating_a = self.rating(robot_a)
+        rating_b = self.rating(robot_b)
+        self.model.update(rating_a, rating_b, score_a)
+        rating_a.games += 1
+        rating_b.games += 1
+        self.results_count += 1
+        self._leaderboard = None
+
+        if self.checkpoint_path is not None and self.results_count % self.checkpoint_every == 0:
+            self.save_checkpoint()
+
+    def consume(self, results):
+        """(robot_a, robot_b, score_a) の並びを順に反映する"""
+        for robot_a, robot_b, score_a in results:
+            self.record(robot_a, robot_b, score_a)
+
+    def win_probability(self, robot_a, robot_b):
+        return self.model.expected_score(self.rating(robot_a), self.rating(robot_b))
+
+    def leaderboard(self, top=None):
+        """(順位, 名前, Rating) のリストを控えめな評価値の高い順に返す"""
+        if self._leaderboard is None:
+            ordered = sorted(self.ratings.items(), key=lambda item: (-self.model.conservative(item[1]), item[0]))
+            self._leaderboard = [(rank, name, rating) for rank, (name, rating) in enumerate(ordered, start=1)]
+        return self._leaderboard if top is None else self._leaderboard[:top]
+
+    def rank_of(self, name):
+        for rank, other, _ in self.leaderboard():
+            if other == name:
+                return rank
+        return None
+
+    # ----------------------------- チェックポイント -----------------------------
+
+    def to_dict(self):
+        return {
+            "model": self.model.name,
+            "params": self.model.params(),
+            "results_count": self.results_count,
+            "ratings": {name: rating.to_dict() for name, rating in self.ratings.items()},
+        }
+
+    def save_checkpoint(self, path=None):
+        """状態を JSON に保存する（一時ファイルに書いてから置き換える）"""
+        path = self.checkpoint_path if path is None else path
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def from_dict(cls, data, **kwargs):
+        model = MODELS[data["model"]](**data["params"])
+        service = cls(model, **kwargs)
+        service.results_count = data["results_count"]
+        for name, values in data["ratings"].items():
+            service.ratings[name] = Rating(values["mu"], values["sigma"], values["games"])
+        return service
+
+    @classmethod
+    def load_checkpoint(cls, path, **kwargs):
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        kwargs.setdefault("checkpoint_path", path)
+        return cls.from_dict(data, **kwargs)
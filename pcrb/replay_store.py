@@ -0,0 +1,170 @@
+"""リプレイの保存先と、リプレイを開かずに試合を探すための索引
+
+リプレイは root/replays/<試合 ID>.json に 1 試合 1 ファイルで保存し、
+試合ごとの要約（ロボット・勝者・手数・HP 差・行動の n-gram）を root/index.jsonl に 1 行ずつ追記する。
+開くときは index.jsonl だけを読んで、メモリ上に転置索引を組み立てる。
+
+    store = ReplayStore("replays")
+    store.add(game_state, bots=("robot_09_trapster", "robot_07_basic_bot"))
+    store.index.query(loser="robot_09_trapster", max_length=20)   # 試合 ID の集合
+    store.load(match_id)
+"""
+import json
+import os
+from bisect import bisect_left
+from bisect import bisect_right
+
+NGRAM_SIZES = (2, 3)
+
+
+def summarize(game_state, bots=None, ngram_sizes=NGRAM_SIZES):
+    """索引に載せる試合の要約を作る"""
+    states = [state for state in game_state if "robots" in state]
+    names = [robot["name"] for robot in states[0]["robots"]]
+    bots = list(names if bots is None else bots)
+    seat_of = {name: seat for seat, name in enumerate(names)}
+    actions = [[] for _ in names]
+    for state in states[1:]:
+        actions[seat_of[state["action"]["robot_name"]]].append(state["action"]["action"])
+    final_hp = [robot["hp"] for robot in states[-1]["robots"]]
+    # エンジンと同じく、HP が同じなら席が後のロボットの勝ち
+    winner = max(reversed(range(len(final_hp))), key=lambda seat: final_hp[seat])
+    runner_up = max((hp for seat, hp in enumerate(final_hp) if seat != winner), default=0)
+    ngrams = sorted({
+        (seat, tuple(sequence[start:start + size]))
+        for seat, sequence in enumerate(actions)
+        for size in ngram_sizes
+        for start in range(len(sequence) - size + 1)
+    })
+    return {
+        "bots": bots,
+        "winner": winner,
+        "length": len(states) - 1,
+        "margin": final_hp[winner] - runner_up,
+        "ngrams": [[seat, list(ngram)] for seat, ngram in ngrams],
+    }
+
+
+class RangeIndex:
+    """(値, 試合 ID) の列。問い合わせの前に値で並べ、範囲を二分探索で答える"""
+
+    def __init__(self):
+        self._entries = []
+        self._values = []
+        self._sorted = True
+
+    def add(self, value, match_id):
+        self._entries.append((value, match_id))
+        self._sorted = False
+
+    def between(self, low=None, high=None):
+        """low <= 値 <= high の試合 ID の集合"""
+        if not self._sorted:
+            self._entries.sort(key=lambda entry: entry[0])
+            self._values = [value for value, _ in self._entries]
+            self._sorted = True
+        start = 0 if low is None else bisect_left(self._values, low)
+        end = len(self._values) if high is None else bisect_right(self._values, high)
+        return {match_id for _, match_id in self._entries[start:end]}
+
+
+class ReplayIndex:
+    def __init__(self):
+        self.summaries = {}    # 試合 ID → 要約
+        self.by_bot = {}       # ロボット名 → 試合 ID の集合
+        self.by_winner = {}    # 勝ったロボット名 → 試合 ID の集合
+        self.by_loser = {}     # 負けたロボット名 → 試合 ID の集合
+        self.by_ngram = {}     # 行動の n-gram → 試合 ID の集合
+        self.by_bot_ngram = {}  # (ロボット名, 行動の n-gram) → 試合 ID の集合
+        self.length = RangeIndex()
+        self.margin = RangeIndex()
+
+    def __len__(self):
+        return len(self.summaries)
+
+    def add(self, match_id, summary):
+        self.summaries[match_id] = summary
+        bots = summary["bots"]
+        winner = bots[summary["winner"]]
+        for seat, bot in enumerate(bots):
+            self.by_bot.setdefault(bot, set()).add(match_id)
+            if seat != summary["winner"]:
+                self.by_loser.setdefault(bot, set()).add(match_id)
+        self.by_winner.setdefault(winner, set()).add(match_id)
+        for seat, ngram in summary["ngrams"]:
+            ngram = tuple(ngram)
+            self.by_ngram.setdefault(ngram, set()).add(match_id)
+            self.by_bot_ngram.setdefault((bots[seat], ngram), set()).add(match_id)
+        self.length.add(summary["length"], match_id)
+        self.margin.add(summary["margin"], match_id)
+
+    def query(self, bot=None, winner=None, loser=None, min_length=None, max_length=None,
+              min_margin=None, max_margin=None, ngram=None, ngram_bot=None):
+        """条件を全て満たす試合 ID の集合を返す
+
+        :param ngram: 行動名の並び（例: ("attack", "attack")）。ngram_bot を指定するとそのロボットの行動に限る
+        """
+        candidates = []
+        for index, key in ((self.by_bot, bot), (self.by_winner, winner), (self.by_loser, loser)):
+            if key is not None:
+                candidates.append(index.get(key, set()))
+        if ngram is not None:
+            ngram = tuple(ngram)
+            if ngram_bot is None:
+                candidates.append(self.by_ngram.get(ngram, set()))
+            else:
+                candidates.append(self.by_bot_ngram.get((ngram_bot, ngram), set()))
+        if min_length is not None or max_length is not None:
+            candidates.append(self.length.between(min_length, max_length))
+        if min_margin is not None or max_margin is not None:
+            candidates.append(self.margin.between(min_margin, max_margin))
+        if not candidates:
+            return set(self.summaries)
+        candidates.sort(key=len)
+        return set.intersection(*candidates) if len(candidates) > 1 else set(candidates[0])
+
+
+class ReplayStore:
+    def __init__(self, root, ngram_sizes=NGRAM_SIZES):
+        self.root = root
+        self.ngram_sizes = ngram_sizes
+        self.replay_dir = os.path.join(root, "replays")
+        self.index_path = os.path.join(root, "index.jsonl")
+        os.makedirs(self.replay_dir, exist_ok=True)
+        self.index = ReplayIndex()
+        if os.path.exists(self.index_path):
+            with open(self.index_path) as file:
+                for line in file:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self.index.add(entry.pop("id"), entry)
+
+    def _replay_path(self, match_id):
+        return os.path.join(self.replay_dir, f"{match_id}.json")
+
+    def add(self, game_state, bots=None, match_id=None):
+        """リプレイを保存して索引に加え、試合 ID を返す"""
+        if match_id is None:
+            match_id = f"{len(self.index):08d}"
+        if match_id in self.index.summaries:
+            raise ValueError(f"Replay '{match_id}' already exists.")
+        summary = summarize(game_state, bots, self.ngram_sizes)
+        with open(self._replay_path(match_id), "w") as file:
+            json.dump({"bots": summary["bots"], "game_state": game_state}, file)
+        # 索引への追記はリプレイを書き終えてから行う（途中で止まっても索引が存在しない試合を指さない）
+        with open(self.index_path, "a") as file:
+            file.write(json.dumps({"id": match_id, **summary}) + "\n")
+        self.index.add(match_id, summary)
+        return match_id
+
+    def load(self, match_id):
+        """保存した game_state を返す"""
+        with open(self._replay_path(match_id)) as file:
+            return json.load(file)["game_state"]
+
+    def query(self, **criteria):
+        """ReplayIndex.query と同じ条件で、試合 ID を昇順のリストで返す"""
+        return sorted(self.index.query(**criteria))
+
+    def __len__(self):
+        return len(self.index)
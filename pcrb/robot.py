@@ -9,16 +9,29 @@ from actions import Steal
 from actions import Teleport
 from actions import Camouflage
 from actions import Scan
+from robot_state import HP
+from robot_state import INITIAL_HP
+from robot_state import INITIAL_SP
+from robot_state import SP
+from robot_state import STUN
+from robot_state import X
+from robot_state import Y
+from robot_state import initial_state
 
 
 class Robot:
+    __slots__ = (
+        "_name", "_state", "_board_id",
+        "attack", "move", "defend", "ranged_attack", "parry", "rest",
+        "trap", "steal", "teleport", "camouflage", "scan",
+        "robot_logic", "controller",
+    )
+
     def __init__(self, name, x, y, robot_logic_function, controller):
         self._name = name
-        self._x = x
-        self._y = y
-        self._hp = 100
-        self._sp = 50
-        self._stun_counter = 0  # ロボットがスタンしている時間
+        # 位置・HP・SP・スタン・各アクションのフラグ／タイマーを 1 本の配列で保持
+        self._state = initial_state(x, y)
+        self._board_id = 0  # 盤面の占有グリッド上の ID（set_robots で割り当て）
 
         self.attack = Attack(self, controller)
         self.move = Move(self, controller)
@@ -41,31 +54,31 @@ class Robot:
 
     @property
     def hp(self):
-        return self._hp
+        return self._state[HP]
 
     @property
     def sp(self):
-        return self._sp
+        return self._state[SP]
 
     @property
     def position(self):
-        return self._x, self._y
+        return self._state[X], self._state[Y]
 
     @property
     def x(self):
-        return self._x
+        return self._state[X]
 
     @property
     def y(self):
-        return self._y
-
-    # @property
-    # def defense_mode(self):
-    #     return self._defense_mode
+        return self._state[Y]
 
     @property
     def stun_counter(self):
-        return self._stun_counter
+        return self._state[STUN]
+
+    @property
+    def _stun_counter(self):
+        return self._state[STUN]
 
     def receive_attack(self, damage):
         """攻撃を受ける
@@ -75,38 +88,41 @@ class Robot:
         #     damage *= self._defense_reduction
         if self.defend.is_active:
             damage *= self.defend.reduction
-        self._hp -= max(damage, 0)
-        if self._hp <= 0:
-            print(f"{self._name} has been destroyed!")
+        self._state[HP] -= max(damage, 0)
+        if self._state[HP] <= 0:
+            self.controller.debug("{} has been destroyed!", self._name)
         return damage
 
     def use_sp(self, amount):
         """SPを消費するメソッド。"""
-        if self._sp >= amount:
-            self._sp -= amount
+        if self._state[SP] >= amount:
+            self._state[SP] -= amount
         else:
             assert False
 
     def recovery_sp(self, amount):
         """SPを回復するメソッド。"""
-        self._sp += amount
+        self._state[SP] += amount
 
     def is_parrying(self):
         return self.parry.is_active
 
     def set_position(self, new_x, new_y):
-        self._x, self._y = new_x, new_y
+        if self._board_id:
+            self.controller.board.move_robot(self._board_id, self._state[X], self._state[Y], new_x, new_y)
+        self._state[X] = new_x
+        self._state[Y] = new_y
 
     def start_turn(self):
         """ターン開始時にロボットの状態を更新"""
         self.stun_update()
 
         if self.defend.is_active:
-            print(f"{self._name} ends defense mode.")
+            self.controller.debug("{} ends defense mode.", self._name)
             self.defend.update()
 
         if self.parry.is_active:
-            print(f"{self._name} ends parry mode.")
+            self.controller.debug("{} ends parry mode.", self._name)
             self.parry.update(is_active=True)
 
         if self.parry.cooldown_counter > 0:
@@ -122,56 +138,35 @@ class Robot:
         """ロボットをスタン状態にする
         :param duration: スタンの持続時間
         """
-        self._stun_counter = duration
-        print(f"{self._name} was stunned.")
+        self._state[STUN] = duration
+        self.controller.debug("{} was stunned.", self._name)
     
     def stun_update(self):
         """スタン状態の更新"""
-        if self._stun_counter > 0:
-            self._stun_counter -= 1
-            print(f"{self._name} is stunned. (duration={self._stun_counter})")
-            if self._stun_counter == 0:
-                print(f"{self._name} is no longer stunned.")
+        if self._state[STUN] > 0:
+            self._state[STUN] -= 1
+            self.controller.debug("{} is stunned. (duration={})", self._name, self._state[STUN])
+            if self._state[STUN] == 0:
+                self.controller.debug("{} is no longer stunned.", self._name)
         else:
-            print(f"{self._name} is not stunned.")
+            self.controller.debug("{} is not stunned.", self._name)
 
     def is_alive(self):
-        return self._hp > 0
+        return self._state[HP] > 0
 
     def status(self):
-        print(f"{self._name}: HP={self._hp}, SP={self._sp}, Position=({self._x}, {self._y})")
+        print(f"{self._name}: HP={self.hp}, SP={self.sp}, Position=({self.x}, {self.y})")
 
     def reset(self, x: int, y: int):
         """
         * 位置を (x, y) に戻す  
         * HP / SP / スタンなどの数値を初期値へ  
-        * 各アクションオブジェクトのフラグやクールダウンを初期化
+        * 各アクションのフラグやクールダウンを初期化（状態配列を丸ごと差し替える）
         """
-        # 位置
-        self._x, self._y = x, y
-
-        # 基本ステータス
-        self._hp = 100
-        self._sp = 50
-        self._stun_counter = 0
-
-        # アクション系フラグをリセット
-        self.defend.is_active      = False
-        self.parry.is_active       = False
-        self.parry.cooldown_counter = 0
-        self.camouflage.is_active  = False
-        self.scan.is_active        = False
+        self.set_position(x, y)
+        self._state[:] = initial_state(x, y)
 
         # 罠を全消去
-        self.trap.traps.clear()
-
-        # 各アクションに reset() があれば呼ぶ（クールダウンなどを内包）
-        for ability in [
-            self.attack, self.move, self.defend, self.ranged_attack,
-            self.parry, self.rest, self.trap, self.steal, self.teleport,
-            self.camouflage, self.scan,
-        ]:
-            if hasattr(ability, "reset") and callable(ability.reset):
-                ability.reset()
-
-        print(f"[RESET] {self._name} is back to ({x}, {y})  HP=100  SP=50")
\ No newline at end of file
+        self.trap.clear()
+
+        self.controller.debug("[RESET] {} is back to ({}, {})  HP={}  SP={}", self._name, x, y, INITIAL_HP, INITIAL_SP)
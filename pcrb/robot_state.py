@@ -0,0 +1,29 @@
+"""ロボット 1 体分の動的状態を 1 本の配列で保持するためのインデックス定義。
+
+位置・HP・SP に加え、各アクションのフラグやタイマーもこの配列に格納する。
+Robot / Action はインスタンス辞書を持たず、この配列を読み書きする。
+"""
+
+X = 0
+Y = 1
+HP = 2
+SP = 3
+STUN = 4                      # スタンの残りターン数
+DEFEND_ACTIVE = 5             # 防御中かどうか
+PARRY_ACTIVE = 6              # パリィ中かどうか
+PARRY_COOLDOWN = 7            # パリィのクールタイム
+CAMOUFLAGE_ACTIVE = 8         # カモフラージュ中かどうか
+CAMOUFLAGE_REMAINING = 9      # カモフラージュの残りターン数
+CAMOUFLAGE_LAST_POSITION = 10  # カモフラージュ開始時の位置
+SCAN_ACTIVE = 11              # スキャン中かどうか
+SCAN_REMAINING = 12           # スキャンの残りターン数
+
+STATE_SIZE = 13
+
+INITIAL_HP = 100
+INITIAL_SP = 50
+
+
+def initial_state(x, y):
+    """初期状態の配列を返す"""
+    return [x, y, INITIAL_HP, INITIAL_SP, 0, False, False, 0, False, 0, None, False, 0]
@@ -1,25 +1,47 @@
-def robot_logic(robot, game_info, memos):
-    """
-    対抗ロジック:
-    - 敵が隣接している場合、スタミナが十分なら攻撃、そうでなければ回避。
-    - 敵が遠距離攻撃を試みる距離にいる場合、スタミナを温存しつつ回避。
-    - 敵に近づきすぎないように距離を保ちながら戦う。
-    - スタミナが少ない場合は休む。
-    """
-    enemy_position = game_info['enemy_position']
-    enemy_hp = game_info['enemy_hp']
-    distance = abs(robot.position[0] - enemy_position[0]) + abs(robot.position[1] - enemy_position[1])
-
-    # スタミナが少ない場合は休む
-    if robot.sp < 20:
-        return "rest"
+# 調整できるパラメータ: 名前 → (下限, 上限)。既定値は make_robot_logic の引数
+PARAM_SPACE = {
+    "rest_sp": (0, 60),
+    "attack_sp": (10, 80),
+    "evade_distance": (1, 4),
+}
+
+
+def make_robot_logic(rest_sp=20, attack_sp=30, evade_distance=2):
+    """しきい値を指定して robot_logic を作る"""
+    def robot_logic(robot, game_info, memos):
+        """
+        対抗ロジック:
+        - 敵が隣接している場合、スタミナが十分なら攻撃、そうでなければ回避。
+        - 敵が遠距離攻撃を試みる距離にいる場合、スタミナを温存しつつ回避。
+        - 敵に近づきすぎないように距離を保ちながら戦う。
+        - スタミナが少ない場合は休む。
+        """
+        enemy_position = game_info['enemy_position']
+        enemy_hp = game_info['enemy_hp']
+        distance = abs(robot.position[0] - enemy_position[0]) + abs(robot.position[1] - enemy_position[1])
+
+        # スタミナが少ない場合は休む
+        if robot.sp < rest_sp:
+            return "rest"
+
+        # 敵が隣接している場合
+        if distance == 1:
+            if robot.sp >= attack_sp:
+                return "attack"  # スタミナが十分なら攻撃
+            else:
+                # スタミナが少ない場合は回避
+                if robot.position[0] < enemy_position[0]:
+                    return "left"
+                elif robot.position[0] > enemy_position[0]:
+                    return "right"
+                elif robot.position[1] < enemy_position[1]:
+                    return "up"
+                else:
+                    return "down"
 
-    # 敵が隣接している場合
-    if distance == 1:
-        if robot.sp >= 30:
-            return "attack"  # スタミナが十分なら攻撃
-        else:
-            # スタミナが少ない場合は回避
+        # 敵が遠距離攻撃を試みる距離にいる場合
+        if distance == evade_distance:
+            # 敵の遠距離攻撃を回避するために移動
             if robot.position[0] < enemy_position[0]:
                 return "left"
             elif robot.position[0] > enemy_position[0]:
@@ -29,28 +51,21 @@ def robot_logic(robot, game_info, memos):
             else:
                 return "down"
 
-    # 敵が遠距離攻撃を試みる距離にいる場合
-    if distance == 2:
-        # 敵の遠距離攻撃を回避するために移動
-        if robot.position[0] < enemy_position[0]:
-            return "left"
-        elif robot.position[0] > enemy_position[0]:
-            return "right"
-        elif robot.position[1] < enemy_position[1]:
-            return "up"
-        else:
-            return "down"
-
-    # 敵に近づきすぎないように距離を保つ
-    if distance > 2:
-        if robot.position[0] < enemy_position[0]:
-            return "right"
-        elif robot.position[0] > enemy_position[0]:
-            return "left"
-        elif robot.position[1] < enemy_position[1]:
-            return "down"
-        else:
-            return "up"
-
-    # デフォルトの動作
-    return "rest"
\ No newline at end of file
+        # 敵に近づきすぎないように距離を保つ
+        if distance > evade_distance:
+            if robot.position[0] < enemy_position[0]:
+                return "right"
+            elif robot.position[0] > enemy_position[0]:
+                return "left"
+            elif robot.position[1] < enemy_position[1]:
+                return "down"
+            else:
+                return "up"
+
+        # デフォルトの動作
+        return "rest"
+
+    return robot_logic
+
+
+robot_logic = make_robot_logic()
@@ -1,49 +1,63 @@
-def robot_logic(robot, game_info, memos):
-    """
-    強いロボットのロジック:
-    - スキャンを使用して敵の情報を取得
-    - 敵のスタミナが少ない場合は攻撃
-    - 敵のトラップを避けながら移動
-    """
-    enemy_position = game_info.get('enemy_position')
-    enemy_sp = game_info.get('enemy_sp')
-    enemy_traps = game_info.get('enemy_traps', [])
-    memo = {}
-
-    # スタミナが少ない場合は休む
-    if robot.sp < 20:
-        return "rest", memo
+# 調整できるパラメータ: 名前 → (下限, 上限)。既定値は make_robot_logic の引数
+PARAM_SPACE = {
+    "rest_sp": (0, 60),
+    "chase_enemy_sp": (0, 60),
+}
+
+
+def make_robot_logic(rest_sp=20, chase_enemy_sp=20):
+    """しきい値を指定して robot_logic を作る"""
+    def robot_logic(robot, game_info, memos):
+        """
+        強いロボットのロジック:
+        - スキャンを使用して敵の情報を取得
+        - 敵のスタミナが少ない場合は攻撃
+        - 敵のトラップを避けながら移動
+        """
+        enemy_position = game_info.get('enemy_position')
+        enemy_sp = game_info.get('enemy_sp')
+        enemy_traps = game_info.get('enemy_traps', [])
+        memo = {}
+
+        # スタミナが少ない場合は休む
+        if robot.sp < rest_sp:
+            return "rest", memo
+
+        # 敵の情報が見えない場合はスキャンを使用
+        if not robot.scan.is_active and enemy_position is None:
+            return "scan", memo
 
-    # 敵の情報が見えない場合はスキャンを使用
-    if not robot.scan.is_active and enemy_position is None:
-        return "scan", memo
+        # 敵が隣接している場合は攻撃
+        if enemy_position and abs(robot.x - enemy_position[0]) + abs(robot.y - enemy_position[1]) == 1:
+            return "attack", memo
 
-    # 敵が隣接している場合は攻撃
-    if enemy_position and abs(robot.x - enemy_position[0]) + abs(robot.y - enemy_position[1]) == 1:
-        return "attack", memo
+        # 敵のスタミナが少ない場合は積極的に攻撃
+        if enemy_sp is not None and enemy_sp < chase_enemy_sp:
+            if enemy_position:
+                if robot.x < enemy_position[0]:
+                    return "right", memo
+                elif robot.x > enemy_position[0]:
+                    return "left", memo
+                elif robot.y < enemy_position[1]:
+                    return "down", memo
+                else:
+                    return "up", memo
 
-    # 敵のスタミナが少ない場合は積極的に攻撃
-    if enemy_sp is not None and enemy_sp < 20:
+        # トラップを避けながら敵に近づく
         if enemy_position:
-            if robot.x < enemy_position[0]:
+            if (robot.x + 1, robot.y) not in enemy_traps and robot.x < enemy_position[0]:
                 return "right", memo
-            elif robot.x > enemy_position[0]:
+            elif (robot.x - 1, robot.y) not in enemy_traps and robot.x > enemy_position[0]:
                 return "left", memo
-            elif robot.y < enemy_position[1]:
+            elif (robot.x, robot.y + 1) not in enemy_traps and robot.y < enemy_position[1]:
                 return "down", memo
-            else:
+            elif (robot.x, robot.y - 1) not in enemy_traps and robot.y > enemy_position[1]:
                 return "up", memo
 
-    # トラップを避けながら敵に近づく
-    if enemy_position:
-        if (robot.x + 1, robot.y) not in enemy_traps and robot.x < enemy_position[0]:
-            return "right", memo
-        elif (robot.x - 1, robot.y) not in enemy_traps and robot.x > enemy_position[0]:
-            return "left", memo
-        elif (robot.x, robot.y + 1) not in enemy_traps and robot.y < enemy_position[1]:
-            return "down", memo
-        elif (robot.x, robot.y - 1) not in enemy_traps and robot.y > enemy_position[1]:
-            return "up", memo
-
-    # それ以外の場合は休む
-    return "rest", memo
\ No newline at end of file
+        # それ以外の場合は休む
+        return "rest", memo
+
+    return robot_logic
+
+
+robot_logic = make_robot_logic()
@@ -0,0 +1,19 @@
+"""試合の途中状態を表す不変のスナップショット
+
+GameController.snapshot() で作り、GameController.restore() で書き戻す。
+中身はタプルと不変値だけなので、そのまま共有・保存・比較できる。
+"""
+from typing import NamedTuple
+
+
+class GameSnapshot(NamedTuple):
+    turn: int
+    order_cursor: int
+    turn_order: tuple
+    robots: tuple      # ロボットごとの状態配列 (robot_state の並び) のタプル
+    on_board: tuple    # ロボットごとに盤面に置かれているか
+    traps: tuple       # ロボットごとの罠の座標（設置順）
+    memos: tuple       # ロボットごとのメモ (memo_store.MemoSnapshot)
+    rng_state: object  # random.getstate() の値（None なら乱数は復元しない）
+    game_state_length: int
+    event_count: object = None  # 記録済みの出来事の数（記録していなければ None）
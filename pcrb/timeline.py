@@ -0,0 +1,85 @@
+"""試合を 1 手ずつ進めたり戻したりするためのチェックポイント
+
+手番ごとに GameController.snapshot() を残し、戻るときは最初からやり直さずにそこから restore() する。
+戻った後に同じロジックのまま進めるときは、残しておいたチェックポイントと記録を使い回す。
+
+    timeline = MatchTimeline(controller)
+    timeline.step(10)      # 10 手進める
+    timeline.back(3)       # 3 手戻る
+    timeline.seek(5)       # 5 手目の直後へ
+    timeline.run_to_end()
+"""
+
+
+class MatchTimeline:
+    def __init__(self, controller):
+        """controller は set_robots() を済ませたもの（その時点が 0 手目になる）"""
+        self.controller = controller
+        self.logic_key = None
+        self.position = 0  # 今いるチェックポイント（進めた手数）
+        self._checkpoints = [controller.snapshot()]
+        # 先のチェックポイントへ戻るとき用に、restore() で切り詰められる記録を持っておく
+        self._game_state = list(controller.game_state)
+        self._events = None if controller.events is None else list(controller.events)
+
+    @property
+    def length(self):
+        """チェックポイントを残してある手数"""
+        return len(self._checkpoints) - 1
+
+    def set_logics(self, logics, key=None):
+        """ロボットのロジックを差し替える
+
+        :param key: ロジックの中身を表す値（コードの文字列など）。前と違うか None なら、今より先のチェックポイントを捨てる
+        """
+        for robot, logic in zip(self.controller.robots, logics):
+            robot.robot_logic = logic
+        if key is None or key != self.logic_key:
+            self._truncate()
+        self.logic_key = key
+
+    def _truncate(self):
+        del self._checkpoints[self.position + 1:]
+        current = self._checkpoints[-1]
+        del self._game_state[current.game_state_length:]
+        if self._events is not None and current.event_count is not None:
+            del self._events[current.event_count:]
+
+    def _record(self):
+        controller = self.controller
+        self._checkpoints.append(controller.snapshot())
+        self._game_state.extend(controller.game_state[len(self._game_state):])
+        if self._events is not None and controller.events is not None:
+            self._events.extend(controller.events[len(self._events):])
+        self.position += 1
+
+    def step(self, count=1):
+        """count 手進め、実際に進めた手数を返す（試合が終わればそこで止まる）"""
+        advanced = 0
+        while advanced < count and not self.controller.is_game_over():
+            if self.position < self.length:
+                self.seek(self.position + 1)
+            else:
+                self.controller.play_turn()
+                self._record()
+            advanced += 1
+        return advanced
+
+    def back(self, count=1):
+        """count 手戻る"""
+        self.seek(self.position - count)
+
+    def run_to_end(self):
+        """試合の終わりまで進め、進めた手数を返す"""
+        return self.step(self.controller.max_turn)
+
+    def seek(self, position):
+        """チェックポイント position（0 〜 length）の状態に戻す"""
+        position = min(max(position, 0), self.length)
+        checkpoint = self._checkpoints[position]
+        controller = self.controller
+        controller.restore(checkpoint)
+        controller.game_state.extend(self._game_state[len(controller.game_state):checkpoint.game_state_length])
+        if self._events is not None and checkpoint.event_count is not None:
+            controller.events.extend(self._events[len(controller.events):checkpoint.event_count])
+        self.position = position
@@ -0,0 +1,240 @@
+"""robot_logic のパラメータを進化計算で調整する
+
+調整したいロボットのモジュールに次の 2 つを用意する。
+
+    PARAM_SPACE = {"rest_sp": (0, 60), ...}   # 名前 → (下限, 上限)
+    def make_robot_logic(rest_sp=20, ...): ...  # パラメータから robot_logic を作る
+
+候補は pcrb/robots/ のロボットたちと先攻・後攻を入れ替えて戦わせ、平均スコア (0〜1) で評価する。
+どの候補も同じシードの組で戦うので（共通乱数法）、候補どうしの差が乱数に埋もれにくい。
+探索は分離型の CMA 風の進化戦略で、上位の候補から平均と刻み幅を更新する。
+
+    result = tune("robot_06_tactician", workers=4)
+    result.best_params, result.best_score, result.history
+"""
+import importlib
+import inspect
+import math
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from arena import load_robot_pool
+from arena import play_match
+from head_to_head import play_pair
+
+
+class TuningResult:
+    __slots__ = ("best_params", "best_score", "history", "evaluations", "cache_hits", "stop_reason")
+
+    def __init__(self, best_params, best_score, history, evaluations, cache_hits, stop_reason):
+        self.best_params = best_params
+        self.best_score = best_score
+        self.history = history          # 世代ごとの記録のリスト
+        self.evaluations = evaluations  # 実際に対戦して評価した候補の数
+        self.cache_hits = cache_hits
+        self.stop_reason = stop_reason
+
+    def __repr__(self):
+        return (f"TuningResult(best_params={self.best_params}, best_score={self.best_score:.3f}, "
+                f"generations={len(self.history)}, evaluations={self.evaluations}, stop_reason={self.stop_reason})")
+
+
+def load_tunable(module_name):
+    """robots.<module_name> から (PARAM_SPACE, make_robot_logic, 既定のパラメータ) を取り出す"""
+    module = importlib.import_module(f"robots.{module_name}")
+    space = getattr(module, "PARAM_SPACE", None)
+    factory = getattr(module, "make_robot_logic", None)
+    if space is None or factory is None:
+        raise ValueError(f"{module_name} does not define PARAM_SPACE and make_robot_logic.")
+    parameters = inspect.signature(factory).parameters
+    return space, factory, {name: parameters[name].default for name in space}
+
+
+def evaluate_params(module_name, params, opponent_names, seeds, game_options):
+    """params で作ったロジックの、相手とシードの全組み合わせでの平均スコアを返す
+
+    別プロセスでも呼べるように、ロジックではなくモジュール名とパラメータを受け取る。
+    """
+    _, factory, _ = load_tunable(module_name)
+    candidate = factory(**params)
+    pool = load_robot_pool()
+    random_state = random.getstate()
+    try:
+        scores = [
+            play_pair(candidate, pool[name], seed, play_match, **game_options)
+            for name in opponent_names for seed in seeds
+        ]
+    finally:
+        random.setstate(random_state)
+    return sum(scores) / len(scores)
+
+
+class EvolutionStrategy:
+    """各パラメータを [0, 1] に正規化して探す、分離型の (mu, lambda) 進化戦略
+
+    上位 mu 個の重み付き平均に平均を動かし、上位の散らばりに合わせて次元ごとの刻み幅を縮める。
+    """
+
+    def __init__(self, space, initial, population=12, sigma=0.3, min_sigma=0.02, rng=None):
+        """
+        :param space: {名前: (下限, 上限)}
+        :param initial: 探索を始める点 {名前: 値}
+        :param population: 1 世代の候補数 (lambda)
+        :param sigma: 正規化した空間での最初の刻み幅
+        """
+        self.names = list(space)
+        self.bounds = [space[name] for name in self.names]
+        self.integer = [isinstance(low, int) and isinstance(high, int) for low, high in self.bounds]
+        self.population = population
+        self.parents = max(population // 2, 1)
+        weights = [math.log(self.parents + 0.5) - math.log(rank + 1) for rank in range(self.parents)]
+        total = sum(weights)
+        self.weights = [weight / total for weight in weights]
+        self.min_sigma = min_sigma
+        self.rng = random.Random() if rng is None else rng
+        self.mean = [self._normalize(index, initial[name]) for index, name in enumerate(self.names)]
+        self.sigma = [sigma] * len(self.names)
+
+    def _normalize(self, index, value):
+        low, high = self.bounds[index]
+        return (value - low) / (high - low) if high > low else 0.0
+
+    def decode(self, point):
+        """正規化した点をパラメータの辞書にする（整数のパラメータは丸める）"""
+        params = {}
+        for index, name in enumerate(self.names):
+            low, high = self.bounds[index]
+            value = low + min(max(point[index], 0.0), 1.0) * (high - low)
+            params[name] = int(round(value)) if self.integer[index] else value
+        return params
+
+    def ask(self):
+        """次の世代の候補（正規化した点）のリスト"""
+        return [
+            [min(max(self.rng.gauss(mean, sigma), 0.0), 1.0) for mean, sigma in zip(self.mean, self.sigma)]
+            for _ in range(self.population)
+        ]
+
+    def tell(self, points, scores):
+        """評価値（大きいほど良い）を受け取って平均と刻み幅を更新する"""
+        ranked = sorted(zip(scores, points), key=lambda item: item[0], reverse=True)[:self.parents]
+        old_mean = self.mean
+        self.mean = [
+            sum(weight * point[index] for weight, (_, point) in zip(self.weights, ranked))
+            for index in range(len(self.names))
+        ]
+        for index in range(len(self.names)):
+            spread = math.sqrt(sum(
+                weight * (point[index] - old_mean[index]) ** 2 for weight, (_, point) in zip(self.weights, ranked)))
+            # 急に縮みすぎないよう前の刻み幅と混ぜる
+            self.sigma[index] = max(0.5 * self.sigma[index] + 0.5 * spread, self.min_sigma)
+
+    def converged(self):
+        return all(sigma <= self.min_sigma for sigma in self.sigma)
+
+
+class Tuner:
+    def __init__(self, module_name, opponents=None, seeds=range(4), workers=0, population=12, sigma=0.3,
+                 max_generations=20, patience=4, min_improvement=0.005, time_budget=None, seed=0, game_options=None):
+        """
+        :param module_name: 調整するロボットのモジュール名（PARAM_SPACE と make_robot_logic を持つもの）
+        :param opponents: 評価に使う相手のモジュール名のリスト（省略時は自分以外の全員）
+        :param seeds: 相手ごとに戦う組のシード（1 組 = 先攻・後攻の 2 試合）
+        :param workers: 評価を並列に行うプロセス数（0 なら同じプロセスで行う）
+        :param patience: 最良の評価値が min_improvement 以上良くならない世代がこれだけ続いたら止める
+        :param time_budget: 探索全体の時間の上限（秒）
+        """
+        self.module_name = module_name
+        self.space, _, self.default_params = load_tunable(module_name)
+        if opponents is None:
+            opponents = [name for name in load_robot_pool() if name != module_name]
+        self.opponents = list(opponents)
+        self.seeds = list(seeds)
+        self.workers = workers
+        self.max_generations = max_generations
+        self.patience = patience
+        self.min_improvement = min_improvement
+        self.time_budget = time_budget
+        self.game_options = {} if game_options is None else game_options
+        self.strategy = EvolutionStrategy(
+            self.space, self.default_params, population=population, sigma=sigma, rng=random.Random(seed))
+        self.cache = {}  # パラメータ → 評価値
+        self.cache_hits = 0
+
+    @staticmethod
+    def _key(params):
+        return tuple(sorted(params.items()))
+
+    def evaluate(self, candidates, executor=None):
+        """パラメータの辞書のリストを評価する（評価済みのものはキャッシュを使う）"""
+        pending = []
+        for params in candidates:
+            key = self._key(params)
+            if key in self.cache or key in pending:
+                self.cache_hits += 1
+            else:
+                pending.append(key)
+        args = (self.opponents, self.seeds, self.game_options)
+        if executor is None:
+            scores = [evaluate_params(self.module_name, dict(key), *args) for key in pending]
+        else:
+            futures = [executor.submit(evaluate_params, self.module_name, dict(key), *args) for key in pending]
+            scores = [future.result() for future in futures]
+        self.cache.update(zip(pending, scores))
+        return [self.cache[self._key(params)] for params in candidates]
+
+    def run(self):
+        executor = ProcessPoolExecutor(max_workers=self.workers) if self.workers else None
+        try:
+            return self._run(executor)
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+    def _run(self, executor):
+        deadline = None if self.time_budget is None else time.perf_counter() + self.time_budget
+        strategy = self.strategy
+        best_params = dict(self.default_params)
+        best_score = self.evaluate([best_params], executor)[0]
+        history = []
+        stale = 0
+        stop_reason = "max_generations"
+        for generation in range(self.max_generations):
+            points = strategy.ask()
+            candidates = [strategy.decode(point) for point in points]
+            scores = self.evaluate(candidates, executor)
+            strategy.tell(points, scores)
+
+            top_score, top_params = max(zip(scores, candidates), key=lambda item: item[0])
+            if top_score >= best_score + self.min_improvement:
+                stale = 0
+            else:
+                stale += 1
+            if top_score > best_score:
+                best_score, best_params = top_score, top_params
+            history.append({
+                "generation": generation,
+                "best_score": best_score,
+                "generation_best_score": top_score,
+                "generation_best_params": top_params,
+                "mean_score": sum(scores) / len(scores),
+                "mean_params": strategy.decode(strategy.mean),
+                "sigma": list(strategy.sigma),
+            })
+
+            if stale >= self.patience:
+                stop_reason = "no_improvement"
+                break
+            if strategy.converged():
+                stop_reason = "converged"
+                break
+            if deadline is not None and time.perf_counter() >= deadline:
+                stop_reason = "time_budget"
+                break
+        return TuningResult(best_params, best_score, history, len(self.cache), self.cache_hits, stop_reason)
+
+
+def tune(module_name, **options):
+    """module_name のパラメータを調整して TuningResult を返す（引数は Tuner と同じ）"""
+    return Tuner(module_name, **options).run()
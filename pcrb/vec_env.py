@@ -0,0 +1,277 @@
+"""学習用のベクトル化環境（Gym 風の API）
+
+B 個の試合を並べて ``reset(seeds)`` / ``step(actions)`` で同時に進める。
+学習するエージェントは各試合の 1 体（既定で先攻）を操作し、相手は pcrb/robots/ のロボットが務める。
+観測は build_game_info から作った固定長の float32 配列で、(B, OBSERVATION_SIZE) にまとめて返す。
+workers を指定すると、試合を複数のプロセスに分けて進める。
+
+    env = VecEnv(64, opponents=["robot_07_basic_bot"], workers=4)
+    observations = env.reset(seeds=range(64))
+    observations, rewards, dones, infos = env.step(actions)
+"""
+import multiprocessing
+import random
+
+import numpy as np
+
+from action_registry import ACTION_REGISTRY
+from arena import load_robot_pool
+from controller import GameController
+from policy_table import compile_pool
+from robot import Robot
+from robot_state import INITIAL_HP
+
+# エージェントの行動番号 → 行動名
+ACTIONS = tuple(ACTION_REGISTRY.names())
+ACTION_INDEX = {name: index for index, name in enumerate(ACTIONS)}
+
+# 観測ベクトルの並び
+OBSERVATION_FIELDS = (
+    "turn", "x", "y", "hp", "sp", "stun",
+    "defending", "parrying", "parry_cooldown", "camouflaged", "scanning", "own_traps",
+    "enemy_x", "enemy_y", "enemy_hp", "enemy_sp", "enemy_traps", "enemies",
+)
+OBSERVATION_SIZE = len(OBSERVATION_FIELDS)
+
+SP_SCALE = 100.0
+UNKNOWN = -1.0  # スキャンしていないので分からない値
+
+
+class RobotBattleEnv:
+    """1 試合分の環境（エージェント 1 体と相手ロボット 1 体）"""
+
+    def __init__(self, opponents, agent_seat=0, max_turn=100, x_max=9, y_max=7, initial_positions="mirrored"):
+        """
+        :param opponents: {名前: robot_logic}。reset のたびにこの中から相手を選ぶ
+        :param agent_seat: エージェントの席 (0 = 先攻, 1 = 後攻)
+        """
+        self.opponents = opponents
+        self.opponent_names = sorted(opponents)
+        self.agent_seat = agent_seat
+        self.game_options = {
+            "max_turn": max_turn, "x_max": x_max, "y_max": y_max, "initial_positions": initial_positions}
+        self.rng = random.Random()
+        self.controller = None
+        self.agent = None
+        self.opponent_name = None
+        self._last_hp_diff = 0
+
+    def reset(self, seed=None, out=None):
+        """新しい試合を始めて最初の観測を返す"""
+        if seed is not None:
+            self.rng.seed(seed)
+        controller = GameController(
+            **self.game_options, verbose=False, log_path=None, game_state_path=None)
+        self.opponent_name = self.rng.choice(self.opponent_names)
+        positions = (controller.robot1_initial_position, controller.robot2_initial_position)
+        logics = [None, None]
+        logics[1 - self.agent_seat] = self.opponents[self.opponent_name]
+        robots = [
+            Robot(name, position['x'], position['y'], logic, controller)
+            for name, position, logic in zip(("Robot A", "Robot B"), positions, logics)
+        ]
+        controller.set_robots(*robots)
+        self.controller = controller
+        self.agent = robots[self.agent_seat]
+        self._last_hp_diff = 0
+        self._advance_opponent()
+        return self.observe(out)
+
+    def _advance_opponent(self):
+        """エージェントの手番になるまで相手を動かす"""
+        controller = self.controller
+        while not controller.is_game_over():
+            robot = controller.next_robot()
+            if robot is self.agent:
+                controller.check_traps(robot)
+                return
+            controller.run_logic(robot)
+            controller.turn += 1
+
+    def step(self, action, out=None):
+        """エージェントに行動番号 action を実行させ、(観測, 報酬, 終了, 情報) を返す"""
+        controller = self.controller
+        agent = self.agent
+        controller.apply_action(agent, controller.adjust_action(agent, ACTIONS[action]))
+        controller.turn += 1
+        self._advance_opponent()
+
+        enemy = controller.nearest_enemy(agent) or controller.robots[1 - self.agent_seat]
+        hp_diff = (agent.hp - enemy.hp) / INITIAL_HP
+        reward = hp_diff - self._last_hp_diff
+        self._last_hp_diff = hp_diff
+        done = controller.is_game_over()
+        info = {"opponent": self.opponent_name}
+        if done:
+            won = controller.winner() is agent
+            reward += 1.0 if won else -1.0
+            info["won"] = won
+        return self.observe(out), reward, done, info
+
+    def observe(self, out=None):
+        """エージェントから見た build_game_info を観測ベクトルにする"""
+        controller = self.controller
+        agent = self.agent
+        if out is None:
+            out = np.empty(OBSERVATION_SIZE, dtype=np.float32)
+        x_scale = max(controller.x_max - 1, 1)
+        y_scale = max(controller.y_max - 1, 1)
+        info = controller.build_game_info(agent)
+        enemy_x, enemy_y = info["enemy_position"]
+        enemy_traps = info.get("enemy_traps")
+        out[:] = (
+            info["turn"] / info["max_turn"],
+            agent.x / x_scale,
+            agent.y / y_scale,
+            agent.hp / INITIAL_HP,
+            agent.sp / SP_SCALE,
+            agent.stun_counter,
+            agent.defend.is_active,
+            agent.parry.is_active,
+            agent.parry.cooldown_counter,
+            agent.camouflage.is_active,
+            agent.scan.is_active,
+            len(agent.trap.traps),
+            enemy_x / x_scale,
+            enemy_y / y_scale,
+            info["enemy_hp"] / INITIAL_HP,
+            info["enemy_sp"] / SP_SCALE if "enemy_sp" in info else UNKNOWN,
+            len(enemy_traps) if enemy_traps is not None else UNKNOWN,
+            len(info["enemies"]),
+        )
+        return out
+
+
+class _LocalVecEnv:
+    """同じプロセス内で B 個の環境を順に進める"""
+
+    def __init__(self, num_envs, opponent_names, env_options, compiled=False):
+        pool = load_robot_pool()
+        names = pool if opponent_names is None else opponent_names
+        opponents = {name: pool[name] for name in names}
+        if compiled:
+            opponents = compile_pool(opponents, **{key: env_options[key] for key in ("max_turn", "x_max", "y_max")
+                                                   if key in env_options})
+        self.envs = [RobotBattleEnv(opponents, **env_options) for _ in range(num_envs)]
+        self.observations = np.zeros((num_envs, OBSERVATION_SIZE), dtype=np.float32)
+        self.rewards = np.zeros(num_envs, dtype=np.float32)
+        self.dones = np.zeros(num_envs, dtype=bool)
+        # テレポートなどはモジュール共通の random を使うので、環境の分の状態を別に持ち、呼び出し側の状態と入れ替えて使う
+        self._random_state = random.getstate()
+
+    def reset(self, seeds):
+        caller_state = random.getstate()
+        try:
+            random.seed(seeds[0])
+            for index, (env, seed) in enumerate(zip(self.envs, seeds)):
+                env.reset(seed, out=self.observations[index])
+        finally:
+            self._random_state = random.getstate()
+            random.setstate(caller_state)
+        return self.observations.copy()
+
+    def step(self, actions):
+        infos = []
+        caller_state = random.getstate()
+        random.setstate(self._random_state)
+        try:
+            for index, (env, action) in enumerate(zip(self.envs, actions)):
+                row = self.observations[index]
+                _, reward, done, info = env.step(int(action), out=row)
+                if done:
+                    # Gym のベクトル環境と同じく、終わった試合はすぐに次の試合を始める
+                    info["final_observation"] = row.copy()
+                    env.reset(out=row)
+                self.rewards[index] = reward
+                self.dones[index] = done
+                infos.append(info)
+        finally:
+            self._random_state = random.getstate()
+            random.setstate(caller_state)
+        return self.observations.copy(), self.rewards.copy(), self.dones.copy(), infos
+
+
+def _worker(connection, num_envs, opponent_names, env_options, compiled):
+    env = _LocalVecEnv(num_envs, opponent_names, env_options, compiled)
+    while True:
+        command, data = connection.recv()
+        if command == "step":
+            connection.send(env.step(data))
+        elif command == "reset":
+            connection.send(env.reset(data))
+        elif command == "close":
+            connection.close()
+            return
+
+
+class VecEnv:
+    def __init__(self, num_envs, opponents=None, workers=0, compiled=False, **env_options):
+        """
+        :param opponents: 相手にするロボットのモジュール名のリスト（省略時は pcrb/robots/ の全員）
+        :param workers: 試合を分けるプロセス数（0 なら同じプロセスで進める）
+        :param compiled: 決定的な相手を表引き (policy_table.PolicyTable) に置き換える
+        :param env_options: RobotBattleEnv に渡す設定 (agent_seat, max_turn, x_max, y_max, initial_positions)
+        """
+        self.num_envs = num_envs
+        self.workers = workers
+        self.observation_shape = (num_envs, OBSERVATION_SIZE)
+        self.action_count = len(ACTIONS)
+        opponent_names = None if opponents is None else list(opponents)
+        if workers:
+            sizes = [len(chunk) for chunk in np.array_split(np.arange(num_envs), workers) if len(chunk)]
+            self._bounds = np.cumsum([0] + sizes)
+            self._connections = []
+            self._processes = []
+            for size in sizes:
+                parent, child = multiprocessing.Pipe()
+                process = multiprocessing.Process(
+                    target=_worker, args=(child, size, opponent_names, env_options, compiled), daemon=True)
+                process.start()
+                child.close()
+                self._connections.append(parent)
+                self._processes.append(process)
+        else:
+            self._local = _LocalVecEnv(num_envs, opponent_names, env_options, compiled)
+
+    def _chunks(self, values):
+        return [values[start:end] for start, end in zip(self._bounds[:-1], self._bounds[1:])]
+
+    def reset(self, seeds=None):
+        """全ての試合を始め直し、観測 (B, OBSERVATION_SIZE) を返す
+
+        テレポートなどが使う乱数は seeds[0] で初期化するが、呼び出し側の random モジュールの状態は変えない。
+        """
+        seeds = list(range(self.num_envs)) if seeds is None else list(seeds)
+        if len(seeds) != self.num_envs:
+            raise ValueError(f"Expected {self.num_envs} seeds, got {len(seeds)}.")
+        if not self.workers:
+            return self._local.reset(seeds)
+        for connection, chunk in zip(self._connections, self._chunks(seeds)):
+            connection.send(("reset", chunk))
+        return np.concatenate([connection.recv() for connection in self._connections])
+
+    def step(self, actions):
+        """行動番号の配列 (B,) で 1 手進め、(観測, 報酬, 終了, 情報のリスト) を返す"""
+        actions = np.asarray(actions)
+        if not self.workers:
+            return self._local.step(actions)
+        for connection, chunk in zip(self._connections, self._chunks(actions)):
+            connection.send(("step", chunk))
+        results = [connection.recv() for connection in self._connections]
+        observations, rewards, dones, infos = zip(*results)
+        return (np.concatenate(observations), np.concatenate(rewards), np.concatenate(dones),
+                [info for chunk in infos for info in chunk])
+
+    def close(self):
+        if self.workers:
+            for connection in self._connections:
+                connection.send(("close", None))
+            for process in self._processes:
+                process.join()
+            self.workers = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
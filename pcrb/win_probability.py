@@ -0,0 +1,191 @@
+"""試合の途中の局面から、どちらが勝ちそうかをモンテカルロ法で見積もる
+
+局面から試合の終わりまでを、シードを変えて何度も画面なしで打ち切り（ロールアウト）、
+先攻 (Robot A) の勝ち・引き分け・負けの割合と、その信頼区間を返す。
+ロボットは robots/ のモジュール名かソースコードで渡すので、ロールアウトを別プロセスに分けられる。
+
+    controller = controller_from_replay(game_state, turn=30)
+    result = estimate_win_probability(controller, ("robot_09_trapster", source_code), rollouts=2000, workers=4)
+    result.win, result.intervals["win"]
+
+試合の終わりの HP が同じなら引き分けとする（エンジンは後攻の勝ちとして扱う）。
+ロールアウトで乱数を 1 度も使わなければ結果は決まっているので、1 回だけで打ち切る。
+"""
+import math
+import random
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+
+from arena import load_logic
+from controller import GameController
+from robot import Robot
+from robot_state import HP
+from robot_state import SP
+from robot_state import X
+from robot_state import Y
+
+OUTCOMES = ("win", "draw", "loss")
+
+
+class WinProbability:
+    __slots__ = ("win", "draw", "loss", "intervals", "rollouts", "deterministic")
+
+    def __init__(self, counts, z=1.96, deterministic=False):
+        """:param counts: {"win": 回数, "draw": 回数, "loss": 回数}"""
+        rollouts = sum(counts.values())
+        self.win = counts["win"] / rollouts
+        self.draw = counts["draw"] / rollouts
+        self.loss = counts["loss"] / rollouts
+        if deterministic:
+            self.intervals = {outcome: (getattr(self, outcome),) * 2 for outcome in OUTCOMES}
+        else:
+            self.intervals = {outcome: wilson_interval(counts[outcome], rollouts, z) for outcome in OUTCOMES}
+        self.rollouts = rollouts
+        self.deterministic = deterministic  # 乱数を使わず、結果が 1 通りに決まっている
+
+    def __repr__(self):
+        return (f"WinProbability(win={self.win:.3f}, draw={self.draw:.3f}, loss={self.loss:.3f}, "
+                f"rollouts={self.rollouts}, deterministic={self.deterministic})")
+
+
+def wilson_interval(successes, trials, z=1.96):
+    """二項分布の割合の Wilson スコア信頼区間"""
+    if trials == 0:
+        return 0.0, 1.0
+    p = successes / trials
+    denominator = 1 + z * z / trials
+    center = (p + z * z / (2 * trials)) / denominator
+    margin = z * math.sqrt(p * (1 - p) / trials + z * z / (4 * trials * trials)) / denominator
+    return max(center - margin, 0.0), min(center + margin, 1.0)
+
+
+def _headless_controller(settings):
+    controller = GameController(**settings, verbose=False, log_path=None, game_state_path=None)
+    controller.events = None
+    return controller
+
+
+def _replay_turn(controller, state):
+    """記録された 1 手を、ロジックを呼ばずにそのまま適用する"""
+    name = state["action"]["robot_name"]
+    robot = controller.next_robot()
+    if robot is None or robot.name != name:
+        raise ValueError(f"Turn {state['turn']}: expected {name} to move, but the engine chose {robot and robot.name}.")
+    controller.check_traps(robot)
+    by_name = {other.name: other for other in controller.robots}
+    for other_name, changed in state.get("memos", {}).items():
+        controller.memos[controller.seat_of(by_name[other_name])].update(changed)
+    for other_name, deleted in state.get("memos_deleted", {}).items():
+        memos = controller.memos[controller.seat_of(by_name[other_name])]
+        for key in deleted:
+            memos.pop(key, None)
+    action = state["action"]["action"]
+    controller.apply_action(robot, action)
+    # テレポートなどの乱数の結果は記録に合わせる
+    for other, recorded in zip(controller.robots, state["robots"]):
+        position = tuple(recorded["position"])
+        if other.position != position:
+            other.set_position(*position)
+        other._state[HP] = recorded["hp"]
+        other._state[SP] = recorded["sp"]
+    controller.save_game_state(name, action)
+    controller.turn += 1
+
+
+def replay_positions(game_state, turns=None):
+    """記録をたどりながら、各ターンの直後の局面を (ターン, コントローラ) で順に返す
+
+    罠・スタン・クールタイムなど記録にない状態は、記録された行動をエンジンで適用して復元する。
+    メモは game_state に残した変更から復元する。同じコントローラを進めながら返すので、必要なら snapshot() を取る。
+
+    :param turns: 返すターンの集合（None なら全て。0 は最初の局面）
+    """
+    settings = game_state[0]["settings"]
+    states = [state for state in game_state if "robots" in state]
+    controller = _headless_controller(settings)
+    controller.set_robots(*(
+        Robot(robot["name"], *robot["position"], None, controller) for robot in states[0]["robots"]))
+    if turns is None or 0 in turns:
+        yield 0, controller
+    for state in states[1:]:
+        _replay_turn(controller, state)
+        if turns is None or state["turn"] in turns:
+            yield state["turn"], controller
+
+
+def controller_from_replay(game_state, turn):
+    """記録の turn の直後の局面まで進めたコントローラ（ロジックは未設定）"""
+    for _, controller in replay_positions(game_state, {turn}):
+        return controller
+    raise ValueError(f"Turn {turn} is not in the replay.")
+
+
+def _rollouts(settings, names, snapshot, sources, seeds):
+    """snapshot から seeds の数だけ試合を終わりまで進め、(結果の回数, 乱数を使ったか) を返す"""
+    controller = _headless_controller(settings)
+    logics = [load_logic(source) for source in sources]
+    controller.set_robots(*(Robot(name, state[X], state[Y], logic, controller)
+                            for name, logic, state in zip(names, logics, snapshot.robots)))
+    counts = dict.fromkeys(OUTCOMES, 0)
+    used_random = False
+    random_state = random.getstate()
+    try:
+        for seed in seeds:
+            controller.restore(snapshot)
+            random.seed(seed)
+            seeded = random.getstate()
+            controller.game_loop()
+            used_random = used_random or random.getstate() != seeded
+            first, second = controller.robots[0].hp, max(robot.hp for robot in controller.robots[1:])
+            counts["win" if first > second else "loss" if first < second else "draw"] += 1
+    finally:
+        random.setstate(random_state)
+    return counts, used_random
+
+
+def estimate_win_probability(controller, sources, rollouts=1000, seed=0, workers=0, batch_size=100, z=1.96,
+                             executor=None):
+    """controller の今の局面から先攻が勝つ確率を見積もる
+
+    :param sources: ロボットごとの robots/ のモジュール名またはソースコード（登録順）
+    :param workers: ロールアウトを分けるプロセス数（0 なら同じプロセスで行う）
+    :param executor: ロールアウトを任せる Executor（渡せば workers は使わず、閉じるのは呼び出し側）
+    :param z: 信頼区間の幅（1.96 で 95%）
+    """
+    settings = {"max_turn": controller.max_turn, "x_max": controller.x_max, "y_max": controller.y_max}
+    names = [robot.name for robot in controller.robots]
+    snapshot = controller.snapshot(include_rng=False)
+    args = (settings, names, snapshot, tuple(sources))
+
+    # 1 回目で乱数を使わなければ、どのシードでも同じ結果になる
+    counts, used_random = _rollouts(*args, [seed])
+    if not used_random:
+        return WinProbability(counts, z, deterministic=True)
+
+    batches = [range(start, min(start + batch_size, seed + rollouts))
+               for start in range(seed + 1, seed + rollouts, batch_size)]
+    if executor is not None:
+        results = list(executor.map(_rollouts, *zip(*[(*args, batch) for batch in batches])))
+    elif workers:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(_rollouts, *zip(*[(*args, batch) for batch in batches])))
+    else:
+        results = [_rollouts(*args, batch) for batch in batches]
+    for batch_counts, _ in results:
+        for outcome in OUTCOMES:
+            counts[outcome] += batch_counts[outcome]
+    return WinProbability(counts, z)
+
+
+def win_probability_curve(game_state, sources, rollouts=200, every=1, workers=0, **options):
+    """記録の every ターンごとに見積もった、[(ターン, WinProbability)] のリスト
+
+    workers を指定したときは、プロセスプールを 1 つだけ作って全てのターンで使い回す。
+    """
+    last_turn = game_state[-1]["turn"]
+    turns = set(range(0, last_turn + 1, every)) | {last_turn}
+    with ProcessPoolExecutor(max_workers=workers) if workers else nullcontext() as executor:
+        return [
+            (turn, estimate_win_probability(controller, sources, rollouts=rollouts, executor=executor, **options))
+            for turn, controller in replay_positions(game_state, turns)
+        ]
@@ -0,0 +1,117 @@
+"""試合状態の Zobrist ハッシュと置換表
+
+GameController.enable_hashing() を呼ぶと、ロボットの状態配列と罠が変わるたびに
+ハッシュ値を差分で更新する。値は state_hash() で読む（ターンの偶奇は読み出し時に混ぜる）。
+
+状態の値は HP や SP のように上限がないので、乱数キーは (種類, 席, 項目, 値) ごとに
+初めて使うときに決定的に作る。同じ状態は別のプロセスでも同じハッシュ値になる。
+"""
+from collections import OrderedDict
+
+MASK64 = (1 << 64) - 1
+
+ROBOT_FIELD = 0
+TRAP = 1
+TURN_PARITY = 2
+
+
+def _splitmix64(value):
+    value = (value + 0x9E3779B97F4A7C15) & MASK64
+    value = ((value ^ (value >> 30)) * 0xBF58476D1CE4E5B9) & MASK64
+    value = ((value ^ (value >> 27)) * 0x94D049BB133111EB) & MASK64
+    return value ^ (value >> 31)
+
+
+def _encode(value):
+    """None は実行ごとにハッシュ値が変わりうるので数値のタプルに置き換える"""
+    if value is None:
+        return (-1,)
+    if isinstance(value, tuple):
+        return (1,) + value
+    return (0, value)
+
+
+class ZobristHasher:
+    def __init__(self):
+        self.value = 0
+        self._keys = {}
+
+    def key(self, kind, seat, index, value):
+        parts = (kind, seat, index, _encode(value))
+        key = self._keys.get(parts)
+        if key is None:
+            key = self._keys[parts] = _splitmix64(hash(parts) & MASK64)
+        return key
+
+    def toggle_field(self, seat, index, value):
+        self.value ^= self.key(ROBOT_FIELD, seat, index, value)
+
+    def toggle_trap(self, seat, position):
+        self.value ^= self.key(TRAP, seat, 0, position)
+
+    def toggle_state(self, seat, state):
+        for index, value in enumerate(state):
+            self.value ^= self.key(ROBOT_FIELD, seat, index, value)
+
+    def hash(self, turn):
+        if turn % 2:
+            return self.value ^ self.key(TURN_PARITY, 0, 0, 1)
+        return self.value
+
+
+class HashedState(list):
+    """書き込みのたびに ZobristHasher を差分更新する状態配列"""
+    __slots__ = ("_hasher", "_seat")
+
+    def __init__(self, values, hasher, seat):
+        super().__init__(values)
+        self._hasher = hasher
+        self._seat = seat
+        hasher.toggle_state(seat, self)
+
+    def __setitem__(self, index, value):
+        if isinstance(index, slice):
+            self._hasher.toggle_state(self._seat, self)
+            super().__setitem__(index, value)
+            self._hasher.toggle_state(self._seat, self)
+            return
+        old = self[index]
+        super().__setitem__(index, value)
+        if old != value:
+            self._hasher.value ^= (self._hasher.key(ROBOT_FIELD, self._seat, index, old)
+                                   ^ self._hasher.key(ROBOT_FIELD, self._seat, index, value))
+
+
+class TranspositionTable:
+    """状態ハッシュ → 評価値 の上限付き表（古いものから捨てる）"""
+
+    def __init__(self, capacity=1 << 16):
+        self.capacity = capacity
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return default
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def put(self, key, entry):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.capacity:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+        self.hits = self.misses = 0
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def __len__(self):
+        return len(self._entries)
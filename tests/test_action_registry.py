@@ -0,0 +1,78 @@
+import sys
+
+sys.path.append('./pcrb')
+
+import pytest
+
+from robot import Robot
+from controller import GameController
+from action_registry import ActionCode
+from action_registry import build_default_registry
+
+
+def robot_logic_unknown(robot, game_info, memos=None):
+    return "dance"
+
+
+def robot_logic_heal(robot, game_info, memos=None):
+    return "heal"
+
+
+def test_default_registry_codes():
+    registry = build_default_registry()
+
+    assert registry.get("rest").code == ActionCode.REST
+    assert registry.get("trap_left").code == ActionCode.TRAP_LEFT
+    assert registry.by_code(ActionCode.SCAN).name == "scan"
+    assert "dance" not in registry
+    assert registry.get("dance") is None
+
+
+def test_unknown_action_is_rejected():
+    controller = GameController(max_turn=100, x_max=9, y_max=7)
+    robot1 = Robot("robot1", 0, 0, robot_logic_unknown, controller)
+    robot2 = Robot("robot2", 3, 3, robot_logic_unknown, controller)
+    controller.set_robots(robot1, robot2)
+
+    with pytest.raises(ValueError):
+        controller.run_logic(robot1)
+
+
+def test_plugin_action():
+    def heal(robot, enemy, action, turn):
+        robot.recovery_sp(1)
+
+    registry = build_default_registry()
+    spec = registry.register("heal", heal)
+    assert spec.code == max(ActionCode) + 1
+
+    with pytest.raises(ValueError):
+        registry.register("heal", heal)
+
+    controller = GameController(max_turn=100, x_max=9, y_max=7, action_registry=registry)
+    robot1 = Robot("robot1", 0, 0, robot_logic_heal, controller)
+    robot2 = Robot("robot2", 3, 3, robot_logic_heal, controller)
+    controller.set_robots(robot1, robot2)
+
+    action, _ = controller.run_logic(robot1)
+    assert action == "heal"
+    assert robot1.sp == 51
+
+
+def test_move_and_trap_use_board_offsets():
+    controller = GameController(max_turn=100, x_max=9, y_max=7)
+    robot1 = Robot("robot1", 0, 0, None, controller)
+    robot2 = Robot("robot2", 3, 3, None, controller)
+    controller.set_robots(robot1, robot2)
+
+    robot1.move("up", 1)  # 盤外へは出ない
+    assert robot1.position == (0, 0)
+    robot1.move("right", 1)
+    assert robot1.position == (1, 0)
+    robot1.move("trap_right", 1)  # 罠の方向では移動しない
+    assert robot1.position == (1, 0)
+
+    robot1.trap("trap_down", 1)
+    assert robot1.trap.traps == [(1, 1)]
+    robot1.trap("down", 1)  # 移動方向では罠を置かない
+    assert robot1.trap.traps == [(1, 1)]
@@ -0,0 +1,94 @@
+import sys
+
+sys.path.append('./pcrb')
+
+from analytics import ReplayAnalytics
+from arena import load_robot_pool
+from controller import GameController
+from robot import Robot
+
+
+def state(turn, robot_name, action, a, b):
+    """a, b は (x, y, hp, sp)"""
+    return {
+        "turn": turn,
+        "robots": [
+            {"name": name, "position": (x, y), "hp": hp, "sp": sp, "defense_mode": False}
+            for name, (x, y, hp, sp) in (("Robot A", a), ("Robot B", b))
+        ],
+        "action": {"robot_name": robot_name, "action": action},
+    }
+
+
+REPLAY = [
+    {"settings": {"max_turn": 100, "x_max": 9, "y_max": 7}},
+    state(0, None, None, (3, 3, 100, 50), (4, 3, 100, 50)),
+    state(1, "Robot A", "attack", (3, 3, 100, 40), (4, 3, 80, 50)),
+    state(2, "Robot B", "parry", (3, 3, 100, 40), (4, 3, 80, 35)),
+    state(3, "Robot A", "attack", (3, 3, 100, 40), (4, 3, 80, 35)),  # パリィされて SP が減らない
+    state(4, "Robot B", "trap_left", (3, 3, 100, 40), (4, 3, 80, 20)),
+    state(5, "Robot A", "stun", (3, 3, 100, 40), (4, 3, 80, 20)),
+    state(6, "Robot B", "rest", (3, 3, 75, 40), (4, 3, 80, 35)),  # B の手番の初めに A が罠を踏んだ
+]
+
+
+def test_summaries_from_hand_built_replay():
+    analytics = ReplayAnalytics()
+    analytics.add(REPLAY, bots=("striker", "parrier"))
+
+    actions = analytics.action_summary()
+    assert actions.loc[("striker", "attack"), "count"] == 2
+    assert actions.loc[("striker", "attack"), "damage_per_sp"] == 2.0
+    assert actions.loc[("striker", "attack"), "win_rate"] == 0.0
+
+    traps = analytics.trap_summary()
+    assert traps.loc["parrier", "placed"] == 1
+    assert traps.loc["parrier", "hits"] == 1
+    assert traps.loc["parrier", "hit_rate"] == 1.0
+
+    parries = analytics.parry_summary()
+    assert parries.loc["parrier", "parries"] == 1
+    assert parries.loc["parrier", "success_rate"] == 1.0
+
+    assert analytics.matches.loc[0, "winner"] == 1
+    assert analytics.position_summary("striker").loc[3, 3] == 3
+
+
+def test_adding_replays_refreshes_cached_summaries(tmp_path):
+    pool = load_robot_pool()
+    analytics = ReplayAnalytics()
+    analytics.add(REPLAY)
+    first = analytics.action_summary(by=("action",))
+    assert analytics.action_summary(by=("action",)) is first
+
+    controller = GameController(verbose=False, log_path=None, game_state_path=None)
+    controller.set_robots(Robot("Robot A", 1, 3, pool["robot_07_basic_bot"], controller),
+                          Robot("Robot B", 7, 3, pool["robot_05_adaptive_strategist"], controller))
+    _, game_state = controller.game_loop()
+    analytics.add(game_state, bots=("robot_07_basic_bot", "robot_05_adaptive_strategist"))
+    second = analytics.action_summary(by=("action",))
+    assert second is not first
+    assert second["count"].sum() == len(REPLAY) - 2 + len(game_state) - 2
+
+    path = tmp_path / "analytics.pkl"
+    analytics.save(path)
+    loaded = ReplayAnalytics.load(path)
+    assert loaded.action_summary(by=("action",)).equals(second)
+
+
+def test_defended_damage_keeps_fractions():
+    replay = [
+        {"settings": {"max_turn": 100, "x_max": 9, "y_max": 7}},
+        state(0, None, None, (1, 3, 100, 50), (4, 3, 100, 50)),
+        state(1, "Robot A", "rest", (1, 3, 100, 50), (4, 3, 100, 50)),
+        state(2, "Robot B", "defend", (1, 3, 100, 50), (4, 3, 100, 40)),
+        state(3, "Robot A", "ranged_attack", (1, 3, 100, 35), (4, 3, 92.5, 40)),  # 防御で 15 が 7.5 に半減
+        state(4, "Robot B", "rest", (1, 3, 100, 35), (4, 3, 92.5, 50)),
+    ]
+    analytics = ReplayAnalytics()
+    analytics.add(replay, bots=("shooter", "guard"))
+    actions = analytics.action_summary()
+    assert actions.loc[("shooter", "ranged_attack"), "damage"] == 7.5
+    assert actions.loc[("shooter", "ranged_attack"), "damage_per_sp"] == 0.5
+    assert analytics.turn_summary().loc[("guard", 4), "hp"] == 92.5
+    assert analytics.turns["damage_dealt"].tolist() == [0, 0, 7.5, 0]
@@ -0,0 +1,88 @@
+import sys
+
+sys.path.append('./pcrb')
+
+from robot import Robot
+from controller import GameController
+from board import Board
+
+
+def test_board_grids():
+    board = Board(9, 7)
+
+    board.place_robot(1, 2, 3)
+    assert board.robot_at(2, 3) == 1
+    board.move_robot(1, 2, 3, 3, 3)
+    assert board.robot_at(2, 3) == 0
+    assert board.robot_at(3, 3) == 1
+
+    board.set_trap(2, 8, 6)
+    assert board.trap_owner_at(8, 6) == 2
+    board.remove_trap(8, 6)
+    assert board.trap_owner_at(8, 6) == 0
+
+
+def test_controller_tracks_robots_and_traps():
+    controller = GameController(max_turn=100, x_max=9, y_max=7)
+    robot1 = Robot("Robot A", 1, 3, None, controller)
+    robot2 = Robot("Robot B", 4, 3, None, controller)
+    controller.set_robots(robot1, robot2)
+
+    assert controller.is_position_occupied(1, 3)
+    robot1.move("right", 1)
+    assert not controller.is_position_occupied(1, 3)
+    assert controller.is_position_occupied(2, 3)
+
+    robot1.trap("trap_right", 1)
+    assert controller.is_trap_at_position(3, 3)
+    assert controller.board.trap_owner_at(3, 3) == 1
+
+    # 既に罠があるマスには置けない
+    robot2.trap("trap_left", 1)
+    assert robot2.trap.traps == []
+
+    # 罠を踏むと罠は消える
+    robot2.move("left", 2)
+    robot1.trap.check_trap(robot2)
+    assert robot2.hp == 75
+    assert not controller.is_trap_at_position(3, 3)
+    assert (3, 3) not in robot1.trap.traps
+
+
+def test_trap_snapshot_is_list_like_and_immutable():
+    controller = GameController(max_turn=100, x_max=9, y_max=7)
+    robot1 = Robot("Robot A", 1, 3, None, controller)
+    robot2 = Robot("Robot B", 7, 3, None, controller)
+    controller.set_robots(robot1, robot2)
+
+    robot2.trap("trap_up", 1)
+    robot1.scan(1)
+    enemy_traps = controller.build_game_info(robot1)["enemy_traps"]
+
+    assert enemy_traps == [(7, 2)]
+    assert (7, 2) in enemy_traps
+    assert [7, 2] not in enemy_traps
+    assert list(enemy_traps) == [(7, 2)]
+    assert enemy_traps[0] == (7, 2)
+    assert enemy_traps.copy() == [(7, 2)]
+
+    # 罠が増えても取得済みのスナップショットは変わらない
+    robot2.trap("trap_down", 2)
+    assert len(enemy_traps) == 1
+    assert len(robot2.trap.traps) == 2
+
+
+def test_reset_clears_grids():
+    controller = GameController(max_turn=100, x_max=9, y_max=7)
+    robot1 = Robot("Robot A", 1, 3, None, controller)
+    robot2 = Robot("Robot B", 7, 3, None, controller)
+    controller.set_robots(robot1, robot2)
+
+    robot1.move("down", 1)
+    robot1.trap("trap_down", 1)
+    controller.reset()
+
+    assert controller.is_position_occupied(1, 3)
+    assert not controller.is_position_occupied(1, 4)
+    assert not controller.is_trap_at_position(1, 5)
+    assert robot1.trap.traps == []
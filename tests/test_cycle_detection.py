@@ -0,0 +1,57 @@
+import sys
+
+sys.path.append('./pcrb')
+
+from controller import GameController
+from cycle_detection import CycleDetector
+from robot import Robot
+
+
+def always(action):
+    def robot_logic(robot, game_info, memos):
+        return action
+    return robot_logic
+
+
+def turn_reader(robot, game_info, memos):
+    return "left" if game_info["turn"] < 0 else "right"
+
+
+def play(logic_a, logic_b, detect_cycles):
+    controller = GameController(
+        max_turn=1000, verbose=False, log_path=None, game_state_path=None, detect_cycles=detect_cycles)
+    robot1 = Robot("Robot A", 1, 3, logic_a, controller)
+    robot2 = Robot("Robot B", 7, 3, logic_b, controller)
+    controller.set_robots(robot1, robot2)
+    winner, _ = controller.game_loop()
+    return winner.name, controller
+
+
+def test_brent_detects_cycle_with_tail():
+    detector = CycleDetector()
+    sequence = [0, 1, 2, 3, 4, 5, 6, 4, 5, 6, 4, 5, 6, 4, 5, 6, 4, 5, 6]
+    detected = [index for index, key in enumerate(sequence) if detector.step(key)]
+    assert detected and detected[0] < len(sequence)
+
+
+def test_blocked_robots_end_early_with_same_winner():
+    # 互いに向かって進み、ぶつかった後は移動できずに同じ局面が続く
+    expected, controller = play(always("right"), always("left"), detect_cycles=False)
+    assert controller.turn == 1000
+
+    winner, controller = play(always("right"), always("left"), detect_cycles=True)
+    assert winner == expected
+    assert controller.cycle_detected_at is not None
+    assert controller.turn < 50
+
+
+def test_turn_dependent_logic_disables_detection():
+    _, controller = play(turn_reader, always("left"), detect_cycles=True)
+    assert controller.cycle_detected_at is None
+    assert controller.turn == 1000
+
+
+def test_growing_sp_is_not_a_cycle():
+    # 休むたびに SP が増えるので同じ局面には戻らない
+    _, controller = play(always("rest"), always("defend"), detect_cycles=True)
+    assert controller.cycle_detected_at is None
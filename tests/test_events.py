@@ -0,0 +1,63 @@
+import sys
+
+sys.path.append('./pcrb')
+
+from controller import GameController
+from events import Event
+from events import EventCode
+from events import event_to_dict
+from events import filter_events
+from events import render_event
+from robot import Robot
+
+
+def constant(action):
+    return lambda robot, game_info, memos: action
+
+
+def create_controller(logic_a, logic_b, **options):
+    options = {"max_turn": 10, "verbose": False, "log_path": None, "game_state_path": None, **options}
+    controller = GameController(**options)
+    robot1 = Robot("Robot A", 3, 3, logic_a, controller)
+    robot2 = Robot("Robot B", 4, 3, logic_b, controller)
+    controller.set_robots(robot1, robot2)
+    return controller
+
+
+def test_actions_record_structured_events():
+    controller = create_controller(constant("attack"), constant("rest"))
+    controller.game_loop()
+    attacks = list(filter_events(controller.events, codes={EventCode.ATTACK}, actor="Robot A"))
+    assert attacks
+    assert attacks[0] == Event(1, EventCode.ATTACK, "Robot A", ("Robot B", 4, 3, 20))
+    assert render_event(attacks[0]) == "Robot A attacks Robot B at (4, 3) for 20 damage."
+    assert controller.events[-1].code == EventCode.WIN
+    assert event_to_dict(attacks[0])["code"] == "ATTACK"
+
+
+def test_log_file_is_rendered_from_events(tmp_path):
+    log_path = tmp_path / "game_log.txt"
+    controller = create_controller(constant("right"), constant("rest"), log_path=str(log_path))
+    controller.log_action(1, "free text")
+    controller.game_loop()
+    lines = log_path.read_text().splitlines()
+    assert lines[0] == "Turn 1: free text"
+    assert "Turn 1: Robot A tried to move to (4, 3), but the path is blocked." in lines
+    assert lines[-1] == f"{controller.robot2.name} wins!"
+
+
+def test_restore_truncates_events():
+    controller = create_controller(constant("rest"), constant("rest"))
+    snapshot = controller.snapshot()
+    count = len(controller.events)
+    controller.run_logic(controller.next_robot())
+    assert len(controller.events) > count
+    controller.restore(snapshot)
+    assert len(controller.events) == count
+
+
+def test_events_can_be_disabled():
+    controller = create_controller(constant("attack"), constant("rest"))
+    controller.events = None
+    controller.game_loop()
+    assert controller.events is None
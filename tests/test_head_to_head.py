@@ -0,0 +1,58 @@
+import sys
+
+sys.path.append('./pcrb')
+
+import random
+
+from arena import FIRST
+from arena import SECOND
+from arena import load_robot_pool
+from head_to_head import A_BETTER
+from head_to_head import B_BETTER
+from head_to_head import EQUAL
+from head_to_head import SequentialTest
+from head_to_head import compare
+from head_to_head import play_pair
+
+
+def biased_play(logic_first, logic_second):
+    """強さ (勝率) の数値をロジックの代わりに使う対戦"""
+    p_first = logic_first / (logic_first + logic_second)
+    return FIRST if random.random() < p_first else SECOND
+
+
+def test_sprt_stops_early_on_clear_difference():
+    result = compare(0.8, 0.2, play=biased_play)
+    assert result.decision == A_BETTER
+    assert result.matches < 100
+    assert result.interval[0] <= result.score <= result.interval[1]
+    assert result.confidence > 0.95
+
+    result = compare(0.2, 0.8, play=biased_play)
+    assert result.decision == B_BETTER
+
+
+def test_sprt_accepts_equal_strength():
+    result = compare(0.5, 0.5, play=biased_play, max_pairs=2000)
+    assert result.decision == EQUAL
+
+
+def test_common_random_numbers_and_state_restore():
+    pool = load_robot_pool()
+    walker = pool["robot_03_random_walker"]
+
+    # 同じシードの組は同じ結果になる
+    assert play_pair(walker, walker, seed=7) == play_pair(walker, walker, seed=7) == 0.5
+
+    random.seed(123)
+    expected = random.random()
+    random.seed(123)
+    compare(pool["robot_07_basic_bot"], pool["robot_01_rest_only"])
+    assert random.random() == expected
+
+
+def test_bundled_robots_are_compared_with_few_matches():
+    pool = load_robot_pool()
+    result = compare(pool["robot_07_basic_bot"], pool["robot_01_rest_only"])
+    assert result.decision == A_BETTER
+    assert result.matches <= 2 * SequentialTest().min_pairs
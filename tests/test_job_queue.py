@@ -0,0 +1,127 @@
+import random
+import sys
+
+sys.path.append('./pcrb')
+
+from arena import FIRST
+from arena import load_robot_pool
+from arena import play_match
+from job_queue import DONE
+from job_queue import FAILED
+from job_queue import RUNNING
+from job_queue import JobQueue
+from job_queue import run_worker
+from job_queue import run_workers
+
+ROBOTS = ["robot_01_rest_only", "robot_03_random_walker", "robot_07_basic_bot", "robot_09_trapster"]
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_leases_expire_and_stale_results_are_rejected(tmp_path):
+    clock = Clock()
+    queue = JobQueue(str(tmp_path / "queue.db"), lease_seconds=10, max_attempts=2, clock=clock)
+    assert queue.add_round_robin("league", ROBOTS, seeds=range(2), max_turn=30) == 24
+    # 同じ登録を繰り返しても増えない
+    assert queue.add_round_robin("league", ROBOTS, seeds=range(2), max_turn=30) == 0
+
+    first = queue.claim("worker-1", batch_size=20)
+    second = queue.claim("worker-2", batch_size=20)
+    assert len(first) == 20 and len(second) == 4
+    assert not {job.id for job in first} & {job.id for job in second}
+    assert queue.claim("worker-3") == []
+
+    # worker-1 が止まったまま期限が切れると、別のワーカーが借り直す
+    assert queue.complete("worker-2", [(job.id, job.robot_a) for job in second]) == 4
+    clock.now += 11
+    retried = queue.claim("worker-3", batch_size=100)
+    assert [job.id for job in retried] == [job.id for job in first]
+    assert queue.complete("worker-1", [(first[0].id, first[0].robot_a)]) == 0
+    assert queue.complete("worker-3", [(job.id, job.robot_b) for job in retried[1:]]) == 19
+
+    # 2 回貸しても返ってこなかったジョブは諦める
+    clock.now += 11
+    assert queue.claim("worker-4") == []
+    assert queue.progress("league") == {"pending": 0, "running": 0, "done": 23, "failed": 1}
+
+
+def test_renew_extends_only_own_leases(tmp_path):
+    clock = Clock()
+    queue = JobQueue(str(tmp_path / "queue.db"), lease_seconds=10, clock=clock)
+    queue.add_round_robin("league", ROBOTS, max_turn=30)
+    jobs = queue.claim("worker-1", batch_size=6)
+    ids = [job.id for job in jobs]
+    clock.now += 8
+    assert queue.renew("worker-1", ids) == 6
+    assert queue.renew("worker-2", ids) == 0
+    # 最初の期限 (1010) を過ぎても、延ばした分 (1018) までは他のワーカーに貸さない
+    clock.now += 8
+    assert {job.id for job in queue.claim("worker-2")}.isdisjoint(ids)
+    assert queue.complete("worker-1", [(job.id, job.robot_a) for job in jobs]) == 6
+
+
+def test_worker_renews_its_lease_during_a_long_batch(tmp_path):
+    path = str(tmp_path / "queue.db")
+    queue = JobQueue(path)
+    queue.add_round_robin("league", ROBOTS, max_turn=30)
+    clock = Clock()
+    thief = JobQueue(path, lease_seconds=10, clock=lambda: clock.now)
+    stolen = []
+
+    def tick():
+        # 時計を読むたびに 2 秒進み、12 試合のバッチの途中で最初のリース (10 秒) を越える
+        clock.now += 2
+        if thief.progress()[RUNNING]:
+            stolen.extend(thief.claim("thief"))
+        return clock.now
+
+    assert run_worker(path, "worker", batch_size=100, lease_seconds=10, clock=tick) == 12
+    assert clock.now > 1000 + 10 * 2
+    assert stolen == []
+    assert queue.progress("league")[DONE] == 12
+
+
+def test_resumed_tournament_matches_direct_play(tmp_path):
+    path = str(tmp_path / "queue.db")
+    queue = JobQueue(path)
+    source = "def robot_logic(robot, game_info, memos):\n    return 'rest'\n"
+    queue.add_round_robin("league", ROBOTS + ["player"], seeds=range(2), sources={"player": source}, max_turn=40)
+
+    # 途中まで進めて止まったワーカーの分は、リースが切れた後に次のワーカーが続きから行う
+    crashed = JobQueue(path, lease_seconds=-1)
+    jobs = crashed.claim("crashed", batch_size=5)
+    crashed.complete("crashed", [(job.id, job.robot_a) for job in jobs[:2]])
+    assert run_worker(path, "worker", batch_size=7) == 38
+    assert queue.progress("league")[DONE] == 40
+
+    pool = load_robot_pool()
+    pool["player"] = pool["robot_01_rest_only"]
+    done = {job.id for job in jobs[:2]}
+    rows = queue.connection.execute("SELECT id, robot_a, robot_b, seat, seed, winner FROM jobs").fetchall()
+    for job_id, robot_a, robot_b, seat, seed, winner in rows:
+        if job_id in done:
+            continue
+        random.seed(seed)
+        first, second = (robot_a, robot_b) if seat == FIRST else (robot_b, robot_a)
+        expected = first if play_match(pool[first], pool[second], max_turn=40) == FIRST else second
+        assert winner == expected
+
+    wins, matches = queue.standings("league")["robot_07_basic_bot"]
+    assert matches == 16 and wins > 0
+
+
+def test_failing_robot_is_retried_then_failed(tmp_path):
+    path = str(tmp_path / "queue.db")
+    queue = JobQueue(path, max_attempts=2)
+    broken = "def robot_logic(robot, game_info, memos):\n    return 1 / 0\n"
+    queue.add_jobs("league", [("broken", "robot_01_rest_only", FIRST, 0)], sources={"broken": broken})
+    assert run_workers(path, workers=1, max_attempts=2) == 0
+    row = queue.connection.execute("SELECT state, attempts, error FROM jobs").fetchone()
+    assert row[:2] == (FAILED, 2)
+    assert "ZeroDivisionError" in row[2]
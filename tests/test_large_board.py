@@ -0,0 +1,79 @@
+import sys
+
+sys.path.append('./pcrb')
+
+import random
+
+import matplotlib.pyplot as plt
+import pytest
+
+from robot import Robot
+from controller import GameController
+from draw import draw_board_v2
+from initial_positions import corner_positions
+from initial_positions import mirrored_positions
+from initial_positions import random_positions
+
+
+def robot_logic(robot, game_info, memos=None):
+    enemy_x, enemy_y = game_info['enemy_position']
+    if robot.sp < 20:
+        return "rest"
+    if abs(robot.x - enemy_x) + abs(robot.y - enemy_y) == 1:
+        return "attack"
+    if robot.x != enemy_x:
+        return "right" if robot.x < enemy_x else "left"
+    return "down" if robot.y < enemy_y else "up"
+
+
+def test_initial_position_strategies():
+    assert mirrored_positions(9, 7) == ({'x': 1, 'y': 3}, {'x': 7, 'y': 3})
+    assert mirrored_positions(100, 100) == ({'x': 1, 'y': 50}, {'x': 98, 'y': 50})
+    assert corner_positions(100, 50) == ({'x': 0, 'y': 0}, {'x': 99, 'y': 49})
+
+    position1, position2 = random_positions(100, 100, random.Random(0))
+    assert position1 != position2
+    assert 0 <= position1['x'] < 100 and 0 <= position1['y'] < 100
+
+    with pytest.raises(ValueError):
+        mirrored_positions(1, 1)
+
+    controller = GameController(x_max=9, y_max=7, verbose=False, log_path=None, game_state_path=None)
+    assert controller.robot1_initial_position == {'x': 1, 'y': 3}
+    assert controller.robot2_initial_position == {'x': 7, 'y': 3}
+
+
+def test_large_board_match(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+    controller = GameController(
+        max_turn=1000, x_max=100, y_max=100, initial_positions="corners",
+        verbose=False, log_path=None, game_state_path=None)
+    position1 = controller.robot1_initial_position
+    position2 = controller.robot2_initial_position
+    robot1 = Robot("Robot A", position1['x'], position1['y'], robot_logic, controller)
+    robot2 = Robot("Robot B", position2['x'], position2['y'], robot_logic, controller)
+    controller.set_robots(robot1, robot2)
+
+    winner, game_state = controller.game_loop()
+
+    assert winner.name in ["Robot A", "Robot B"]
+    assert game_state[0]['settings'] == {'max_turn': 1000, 'x_max': 100, 'y_max': 100}
+    # ファイル出力を無効にした場合はファイルを作らない
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_draw_large_board():
+    turn_data = {
+        "action": {"robot_name": "Robot A", "action": "ranged_attack"},
+        "robots": [
+            {"name": "Robot A", "position": [10, 20]},
+            {"name": "Robot B", "position": [150, 120]},
+        ],
+    }
+    fig = draw_board_v2(turn_data, 200, 150, is_show=False)
+
+    ax = fig.axes[0]
+    assert len(ax.images) == 1  # 背景は 1 枚の画像
+    assert len(ax.get_xticks()) <= 11
+    plt.close(fig)
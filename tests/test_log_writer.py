@@ -0,0 +1,73 @@
+import sys
+
+sys.path.append('./pcrb')
+
+import io
+import json
+import threading
+
+import pytest
+
+from controller import GameController
+from log_writer import BackgroundWriter
+from robot import Robot
+
+
+def constant(action):
+    return lambda robot, game_info, memos: action
+
+
+def play(tmp_path, name, writer=None):
+    log_path = tmp_path / f"{name}.txt"
+    state_path = tmp_path / f"{name}.json"
+    controller = GameController(max_turn=30, verbose=False, log_path=str(log_path),
+                                game_state_path=str(state_path), writer=writer)
+    robot1 = Robot("Robot A", 1, 3, constant("right"), controller)
+    robot2 = Robot("Robot B", 7, 3, constant("attack"), controller)
+    controller.set_robots(robot1, robot2)
+    controller.game_loop()
+    return controller, log_path, state_path
+
+
+def test_background_output_matches_synchronous_output(tmp_path):
+    _, sync_log, sync_state = play(tmp_path, "sync")
+    with BackgroundWriter() as writer:
+        _, async_log, async_state = play(tmp_path, "async", writer)
+        writer.flush()
+        assert async_log.read_text() == sync_log.read_text()
+        assert json.loads(async_state.read_text()) == json.loads(sync_state.read_text())
+
+
+def test_bounded_queue_applies_backpressure_and_keeps_order():
+    release = threading.Event()
+    written = []
+
+    def slow_write(file, value):
+        release.wait()
+        written.append(value)
+
+    file = io.StringIO()
+    writer = BackgroundWriter(max_pending=1, batch_size=1)
+    writer.submit(file, slow_write, 0)  # スレッドが受け取って待つ
+    writer.submit(file, slow_write, 1)  # キューを埋める
+    blocked = threading.Thread(target=writer.submit, args=(file, slow_write, 2))
+    blocked.start()
+    blocked.join(0.1)
+    assert blocked.is_alive()  # キューが一杯なので積む側が待つ
+    release.set()
+    blocked.join()
+    writer.close()
+    assert written == [0, 1, 2]
+
+
+def test_write_errors_surface_on_flush():
+    def failing_write(file, value):
+        raise OSError("disk full")
+
+    writer = BackgroundWriter()
+    writer.submit(io.StringIO(), failing_write, None)
+    with pytest.raises(OSError):
+        writer.flush()
+    writer.close()
+    with pytest.raises(RuntimeError):
+        writer.write(io.StringIO(), "text")
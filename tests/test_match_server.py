@@ -0,0 +1,150 @@
+import asyncio
+import http.client
+import json
+import sys
+import threading
+
+import pytest
+
+sys.path.append('./pcrb')
+
+from arena import FIRST
+from arena import load_robot_pool
+from arena import play_match
+from code_check import is_safe_code
+from match_client import MatchClient
+from match_server import MatchServer
+from match_server import play
+
+
+def serve(tmp_path, **options):
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    server = MatchServer(tmp_path, port=0, workers=1, **options)
+    asyncio.run_coroutine_threadsafe(server.start(), loop).result()
+    yield MatchClient(f"http://127.0.0.1:{server.port}")
+    asyncio.run_coroutine_threadsafe(server.close(), loop).result()
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join()
+
+
+@pytest.fixture
+def client(tmp_path):
+    yield from serve(tmp_path)
+
+
+@pytest.fixture
+def source_client(tmp_path):
+    yield from serve(tmp_path, allow_source=True)
+
+
+def test_match_job_returns_result_and_replay(client):
+    job = client.submit_match("robot_07_basic_bot", "robot_09_trapster", max_turn=50)
+    assert job["total"] == 1
+    [result] = client.wait(job["id"], timeout=30)
+
+    pool = load_robot_pool()
+    assert result["winner"] == play_match(pool["robot_07_basic_bot"], pool["robot_09_trapster"], max_turn=50)
+    replay = client.replay(result["replay"])
+    _, game_state = play(("robot_07_basic_bot", "robot_09_trapster"), {"max_turn": 50}, 0)
+    assert replay == json.loads(json.dumps(game_state))
+    assert client.query_replays(bot="robot_09_trapster") == [result["replay"]]
+
+
+def test_gauntlet_plays_both_seats(source_client):
+    client = source_client
+    source = "def robot_logic(robot, game_info, memos):\n    return 'rest'\n"
+    job = client.submit_gauntlet(source, opponents=["robot_07_basic_bot", "robot_01_rest_only"], max_turn=20)
+    results = client.wait(job["id"], timeout=30)
+    assert [(result["opponent"], result["seat"]) for result in results] == [
+        ("robot_07_basic_bot", 0), ("robot_07_basic_bot", 1),
+        ("robot_01_rest_only", 0), ("robot_01_rest_only", 1),
+    ]
+    assert results[0]["bots"] == ["player", "robot_07_basic_bot"]
+    # 攻撃してくる相手にはどちらの席でも負ける
+    assert results[0]["winner"] != FIRST and results[1]["winner"] == FIRST
+    assert client.status(job["id"])["completed"] == 4
+    assert len(client.query_replays(bot="player")) == 4
+
+
+def test_rejects_bad_requests(source_client):
+    client = source_client
+    with pytest.raises(ValueError, match="Unsafe code"):
+        client.submit_match("import os\ndef robot_logic(robot, game_info, memos):\n    return 'rest'\n", "robot_01_rest_only")
+    with pytest.raises(ValueError, match="Unknown robot"):
+        client.submit_match("os", "robot_01_rest_only")
+    with pytest.raises(ValueError, match="Unknown option"):
+        client.submit_gauntlet("robot_01_rest_only", board="large")
+    with pytest.raises(ValueError, match="x_max must be between 3 and 1000"):
+        client.submit_gauntlet("robot_01_rest_only", x_max=2)
+    with pytest.raises(ValueError, match="max_turn must be between 1 and 100000"):
+        client.submit_gauntlet("robot_01_rest_only", max_turn=10 ** 9)
+    with pytest.raises(ValueError, match="Unknown initial positions"):
+        client.submit_gauntlet("robot_01_rest_only", initial_positions="nowhere")
+    with pytest.raises(LookupError):
+        client.status("999999")
+    with pytest.raises(LookupError):
+        client.replay("../index")
+    assert "robot_07_basic_bot" in client.robots()
+
+
+def test_failed_match_settles_the_whole_job(source_client):
+    client = source_client
+    source = (
+        "def robot_logic(robot, game_info, memos):\n"
+        "    if robot.name == 'Robot B':\n"
+        "        raise RuntimeError('second seat')\n"
+        "    return 'rest'\n")
+    job = client.submit_gauntlet(source, opponents=["robot_01_rest_only", "robot_07_basic_bot"], max_turn=10)
+    with pytest.raises(RuntimeError, match="second seat"):
+        client.wait(job["id"], timeout=30)
+    # 失敗と分かった時点で、先攻の試合も全て終わっている
+    status = client.status(job["id"])
+    assert (status["status"], status["completed"], status["total"]) == ("failed", 2, 4)
+
+
+def test_replay_query_and_names_validation(client):
+    job = client.submit_match("robot_04_defensive", "robot_05_adaptive_strategist", names=["guard", "strategist"])
+    [result] = client.wait(job["id"], timeout=30)
+    # 防御でダメージが半減するので、HP 差は小数にもなる
+    margin = abs(result["hp"][0] - result["hp"][1])
+    assert client.query_replays(min_margin=margin - 0.5, bot="guard") == [result["replay"]]
+    assert client.query_replays(min_margin=margin + 0.5) == []
+    with pytest.raises(ValueError, match="names"):
+        client.submit_match("robot_01_rest_only", "robot_01_rest_only", names="ab")
+
+
+def test_source_is_refused_by_default(client):
+    source = "def robot_logic(robot, game_info, memos):\n    return 'rest'\n"
+    with pytest.raises(ValueError, match="--allow-source"):
+        client.submit_gauntlet(source, opponents=["robot_01_rest_only"])
+
+
+def test_cross_origin_post_is_refused(client):
+    # 別のサイトのページからの <form> / fetch(no-cors) と同じ形のリクエスト
+    host, port = client.url.rsplit("/", 1)[1].split(":")
+    body = json.dumps({"type": "match", "robots": ["robot_01_rest_only", "robot_01_rest_only"]})
+    for headers in ({"Content-Type": "text/plain", "Origin": "http://evil.example"},
+                    {"Content-Type": "text/plain"},
+                    {"Content-Type": "application/json", "Origin": "http://evil.example"},
+                    {"Content-Type": "application/json", "Host": f"evil.example:{port}"}):
+        connection = http.client.HTTPConnection(host, int(port), timeout=10)
+        connection.request("POST", "/jobs", body, headers)
+        response = connection.getresponse()
+        assert response.status == 403, headers
+        response.read()
+        connection.close()
+    # どのリクエストでもジョブは作られていない
+    with pytest.raises(LookupError):
+        client.status("000000")
+    job = client.submit_match("robot_01_rest_only", "robot_01_rest_only", max_turn=5)
+    assert job["id"] == "000000"
+    assert client.wait(job["id"], timeout=30)[0]["bots"] == ["robot_01_rest_only", "robot_01_rest_only"]
+
+
+def test_is_safe_code_rejects_escape_hatches():
+    for source in ("__import__('os')", "open('x')", "f = getattr", "setattr(x, 'a', 1)",
+                   "().__class__.__bases__", "eval('1')"):
+        assert not is_safe_code(source)[0], source
+    assert is_safe_code("def robot_logic(robot, game_info, memos):\n    return 'rest'\n")[0]
@@ -0,0 +1,59 @@
+import sys
+
+sys.path.append('./pcrb')
+
+import math
+import random
+
+from arena import FIRST
+from arena import SECOND
+from arena import load_robot_pool
+from arena import play_match
+from matchmaking import AdaptiveRanker
+from matchmaking import rate_pool
+
+
+def strength_play(logic_first, logic_second):
+    """強さの数値をロジックの代わりに使う対戦（差が小さいほど番狂わせが起きやすい）"""
+    upset = random.random() < 0.5 * math.exp(-abs(logic_first - logic_second) / 4)
+    return FIRST if (logic_first > logic_second) != upset else SECOND
+
+
+def test_adaptive_ranker_places_new_bot_with_few_matches():
+    random.seed(0)
+    pool = {f"bot_{strength:03d}": strength for strength in range(0, 200, 2)}
+    service = rate_pool(pool, play=strength_play)
+
+    placement = AdaptiveRanker(service, "newcomer", 101, pool, play=strength_play).run()
+
+    true_rank = 1 + sum(1 for strength in pool.values() if strength > 101)
+    assert len(placement.matches) < len(pool) // 2
+    assert abs(placement.rank - true_rank) <= 5
+    assert placement.best_rank <= true_rank <= placement.worst_rank
+    # 先攻・後攻の偏りを抑え、同じ相手とは席を変えて戦う
+    seats = [seat for _, seat, _ in placement.matches]
+    assert abs(seats.count(FIRST) - seats.count(SECOND)) <= 1
+    assert len(set((opponent, seat) for opponent, seat, _ in placement.matches)) == len(placement.matches)
+
+
+def test_adaptive_ranker_settles_in_separated_pool():
+    random.seed(0)
+    pool = {f"bot_{strength:03d}": strength for strength in range(0, 400, 40)}
+    service = rate_pool(pool, rounds=5, play=strength_play)
+
+    placement = AdaptiveRanker(service, "newcomer", 220, pool, play=strength_play, rank_tolerance=3).run()
+    assert placement.settled
+    assert placement.rank == 5
+    assert len(placement.matches) < 2 * len(pool)
+
+
+def test_adaptive_ranker_with_bundled_robots():
+    random.seed(1)
+    pool = load_robot_pool()
+    newcomer = pool.pop("robot_07_basic_bot")
+    service = rate_pool(pool)
+
+    placement = AdaptiveRanker(service, "newcomer", newcomer, pool, rank_tolerance=4).run()
+    assert 1 <= placement.best_rank <= placement.rank <= placement.worst_rank <= len(pool) + 1
+    assert 0 < len(placement.matches) <= 2 * len(pool)
+    assert play_match(newcomer, newcomer) in (FIRST, SECOND)
@@ -0,0 +1,87 @@
+import sys
+
+sys.path.append('./pcrb')
+
+import random
+
+from arena import FIRST
+from arena import SECOND
+from arena import load_robot_pool
+from arena import play_match
+from controller import GameController
+from forward_model import ForwardModel
+from mcts import MCTSBot
+from robot import Robot
+
+
+def create_controller(logic_a, logic_b):
+    controller = GameController(max_turn=100, verbose=False, log_path=None, game_state_path=None)
+    position1 = controller.robot1_initial_position
+    position2 = controller.robot2_initial_position
+    robot1 = Robot("Robot A", position1['x'], position1['y'], logic_a, controller)
+    robot2 = Robot("Robot B", position2['x'], position2['y'], logic_b, controller)
+    controller.set_robots(robot1, robot2)
+    return controller
+
+
+def test_forward_model_does_not_touch_live_game(capsys):
+    controller = create_controller(None, None)
+    controller.verbose = True
+    before = controller.snapshot()
+    random.seed(3)
+    rng_state = random.getstate()
+
+    model = ForwardModel.from_controller(controller)
+    model.load(controller.snapshot(include_rng=False), 0)
+    assert "attack" not in model.legal_actions()
+    assert "up" in model.legal_actions()
+    for _ in range(30):
+        if model.is_terminal():
+            break
+        model.step("teleport" if "teleport" in model.legal_actions() else "rest")
+
+    assert controller.snapshot(include_rng=False) == before._replace(rng_state=None)
+    assert capsys.readouterr().out == ""
+    assert model.controller.turn > controller.turn
+    random.setstate(rng_state)
+
+
+def test_forward_model_merges_robot2_adjusted_moves():
+    controller = create_controller(None, None)
+    model = ForwardModel.from_controller(controller)
+    model.load(controller.snapshot(include_rng=False), 1)
+    legal = model.legal_actions()
+    # 後攻の up / right は down / left に読み替えられるので候補に出さない
+    assert "up" not in legal and "right" not in legal
+    assert "down" in legal and "left" in legal
+
+
+def test_mcts_bot_beats_simple_bots():
+    pool = load_robot_pool()
+    bot = MCTSBot(time_budget=None, iterations=100, seed=0)
+    random.seed(0)
+    assert play_match(bot, pool["robot_02_constant_right"]) == FIRST
+    assert play_match(pool["robot_04_defensive"], bot) == SECOND
+
+
+def test_mcts_bot_reuses_subtree():
+    bot = MCTSBot(time_budget=None, iterations=300, seed=0)
+    controller = create_controller(bot, lambda robot, game_info, memos: "rest")
+    for robot in (controller.next_robot(), controller.next_robot()):
+        action, _ = controller.run_logic(robot)
+        controller.save_game_state(robot.name, action)
+        controller.turn += 1
+
+    root = bot._reused_root(controller, 0)
+    assert root.visits > 0
+    assert root.mover is None
+
+
+def test_mcts_bot_with_worker_processes():
+    bot = MCTSBot(time_budget=None, iterations=30, workers=2, seed=0)
+    try:
+        controller = create_controller(bot, None)
+        action = bot.choose_action(controller.robot1)
+    finally:
+        bot.close()
+    assert action in controller.action_registry
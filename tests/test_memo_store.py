@@ -0,0 +1,64 @@
+import sys
+
+sys.path.append('./pcrb')
+
+import pytest
+
+from controller import GameController
+from memo_store import MemoStore
+from memo_store import memo_history
+from robot import Robot
+
+
+def test_quotas_and_validation_of_changed_keys():
+    memos = MemoStore(max_keys=2, max_bytes=20)
+    memos.update({"a": 1, "b": "xy"})
+    with pytest.raises(ValueError):
+        memos.update({"c": 0})  # キーが多すぎる
+    with pytest.raises(ValueError):
+        memos["b"] = "x" * 30   # バイト数が多すぎる
+    with pytest.raises(ValueError):
+        memos["a"] = [1]        # 値の型が不正
+    assert dict(memos) == {"a": 1, "b": "xy"}
+    del memos["a"]
+    memos["c"] = None
+    assert memos.take_changes() == ({"b": "xy", "c": None}, ["a"])
+    memos.update({"b": "xy"})  # 変わっていないキーは記録しない
+    assert memos.take_changes() is None
+
+
+def test_snapshots_are_shared_until_the_next_write():
+    memos = MemoStore({"plan": "attack"})
+    saved = memos.snapshot()
+    assert memos.snapshot() == saved
+    memos["plan"] = "rest"
+    assert saved == {"plan": "attack"}
+    memos.restore(saved)
+    assert memos == {"plan": "attack"}
+    memos["count"] = 1
+    assert saved == {"plan": "attack"}
+
+
+def counting_logic(robot, game_info, memos):
+    count = memos.get("count", 0) + 1
+    if count == 3:
+        del memos["phase"]
+        return "rest", {"count": count}
+    return "rest", {"count": count, "phase": "opening"}
+
+
+def test_memo_changes_are_saved_in_game_state():
+    controller = GameController(max_turn=8, verbose=False, log_path=None, game_state_path=None)
+    controller.set_robots(Robot("Robot A", 1, 3, counting_logic, controller),
+                          Robot("Robot B", 7, 3, lambda robot, game_info, memos: "rest", controller))
+    _, game_state = controller.game_loop()
+
+    states = {state["turn"]: state for state in game_state[1:]}
+    assert states[1]["memos"] == {"Robot A": {"count": 1, "phase": "opening"}}
+    assert "memos" not in states[2]
+    assert states[3]["memos"] == {"Robot A": {"count": 2}}
+    assert states[5]["memos_deleted"] == {"Robot A": ["phase"]}
+    history = list(memo_history(game_state))
+    assert [turn for turn, _, _ in history] == [1, 3, 5, 7]
+    assert history[2] == (5, "Robot A", {"count": 3})
+    assert history[-1][2] == dict(controller.memos1)
@@ -0,0 +1,62 @@
+import sys
+
+sys.path.append('./pcrb')
+
+import json
+
+from arena import play_match
+from controller import GameController
+from metrics import EngineMetrics
+from metrics import PHASES
+from robot import Robot
+
+
+def constant(action):
+    return lambda robot, game_info, memos: action
+
+
+def create_controller(logic_a, logic_b, metrics=None):
+    controller = GameController(max_turn=20, verbose=False, log_path=None, game_state_path=None, metrics=metrics)
+    robot1 = Robot("Robot A", 3, 3, logic_a, controller)
+    robot2 = Robot("Robot B", 4, 3, logic_b, controller)
+    controller.set_robots(robot1, robot2)
+    return controller
+
+
+def test_disabled_metrics_leave_methods_untouched():
+    controller = create_controller(constant("rest"), constant("rest"))
+    assert controller.metrics is None
+    for name in ("run_logic", "apply_action", "emit", "save_game_state", "game_loop"):
+        assert name not in vars(controller)
+
+
+def test_counts_actions_failures_and_turns():
+    metrics = EngineMetrics()
+    # A は B に塞がれて右に進めず、B は隣の A に遠距離攻撃を試みる
+    controller = create_controller(constant("right"), constant("ranged_attack"), metrics)
+    controller.game_loop()
+    assert metrics.matches == 1
+    assert metrics.actions["right"] > 0
+    assert metrics.failures["right", "blocked"] == metrics.actions["right"]
+    assert metrics.failures["ranged_attack", "out_of_range"] == metrics.actions["ranged_attack"]
+    assert metrics.turns == controller.turn - 1
+    for phase in PHASES:
+        assert metrics.phases[phase].count == metrics.turns
+
+
+def test_shared_metrics_and_exports():
+    metrics = EngineMetrics()
+    for _ in range(3):
+        play_match(constant("attack"), constant("defend"), max_turn=10, metrics=metrics)
+    assert metrics.matches == 3
+    assert metrics.matches_per_second > 0
+
+    data = json.loads(metrics.to_json())
+    assert data["matches"] == 3
+    assert data["actions"]["attack"] == metrics.actions["attack"]
+
+    text = metrics.to_prometheus()
+    assert "# TYPE pcrb_turn_phase_seconds histogram" in text
+    assert 'pcrb_turn_phase_seconds_bucket{phase="logic",le="+Inf"} %d' % metrics.turns in text
+    assert f'pcrb_actions_total{{action="defend"}} {metrics.actions["defend"]}' in text
+    assert "pcrb_matches_total 3" in text
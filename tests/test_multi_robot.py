@@ -0,0 +1,108 @@
+import sys
+
+sys.path.append('./pcrb')
+
+import pytest
+
+from robot import Robot
+from controller import GameController
+from initial_positions import spread_positions
+
+
+def chaser_logic(robot, game_info, memos=None):
+    enemy_x, enemy_y = game_info['enemy_position']
+    if robot.sp < 20:
+        return "rest"
+    if abs(robot.x - enemy_x) + abs(robot.y - enemy_y) == 1:
+        return "attack"
+    if robot.x != enemy_x:
+        return "right" if robot.x < enemy_x else "left"
+    return "down" if robot.y < enemy_y else "up"
+
+
+def rest_logic(robot, game_info, memos=None):
+    return "rest"
+
+
+def create_controller(count, logic=chaser_logic, x_max=9, y_max=7):
+    controller = GameController(
+        max_turn=500, x_max=x_max, y_max=y_max, verbose=False, log_path=None, game_state_path=None)
+    robots = [
+        Robot(f"Robot {index}", position['x'], position['y'], logic, controller)
+        for index, position in enumerate(spread_positions(x_max, y_max, count))
+    ]
+    controller.set_robots(*robots)
+    return controller, robots
+
+
+def test_spread_positions_are_distinct():
+    positions = spread_positions(100, 100, 48)
+    assert len({(p['x'], p['y']) for p in positions}) == 48
+    assert all(0 <= p['x'] < 100 and 0 <= p['y'] < 100 for p in positions)
+
+    with pytest.raises(ValueError):
+        spread_positions(2, 2, 5)
+
+
+def test_free_for_all_match():
+    controller, robots = create_controller(6, x_max=20, y_max=20)
+    winner, game_state = controller.game_loop()
+
+    assert winner in robots
+    assert len(game_state[-1]['robots']) == 6
+    assert len(controller.alive_robots()) <= 1 or controller.turn == controller.max_turn
+    # 倒されたロボットは盤面から消える
+    for robot in robots:
+        if not robot.is_alive():
+            assert controller.board.robot_at(robot.x, robot.y) != robot._board_id
+
+
+def test_turn_order_skips_defeated_robots():
+    controller, robots = create_controller(3, logic=rest_logic)
+    controller.set_turn_order([robots[2], robots[0], robots[1]])
+
+    assert controller.next_robot() is robots[2]
+    assert controller.next_robot() is robots[0]
+    robots[1].receive_attack(1000)
+    assert controller.next_robot() is robots[2]
+
+    with pytest.raises(ValueError):
+        controller.set_turn_order([0, 0, 1])
+
+
+def test_target_selection_uses_adjacency_and_range():
+    controller = GameController(max_turn=100, x_max=9, y_max=7, verbose=False, log_path=None, game_state_path=None)
+    robot = Robot("Center", 4, 3, None, controller)
+    near_strong = Robot("Near strong", 5, 3, None, controller)
+    near_weak = Robot("Near weak", 4, 4, None, controller)
+    ranged = Robot("Ranged", 2, 3, None, controller)
+    far = Robot("Far", 0, 0, None, controller)
+    controller.set_robots(robot, near_strong, near_weak, ranged, far)
+
+    near_weak.receive_attack(30)
+
+    assert controller.select_target(robot, "adjacent") is near_weak
+    assert controller.select_target(robot, "ranged") is ranged
+    assert controller.nearest_enemy(far) is ranged
+
+    robot.attack(controller.select_target(robot, "adjacent"), 1)
+    assert near_weak.hp == 50
+    assert near_strong.hp == 100
+
+
+def test_game_info_lists_visible_enemies():
+    controller, robots = create_controller(4, logic=rest_logic)
+    robots[1].camouflage(1)
+    last_known = robots[1].position
+    robots[1].move("down", 1)
+
+    info = controller.build_game_info(robots[0])
+    names = [enemy['name'] for enemy in info['enemies']]
+    assert names == ["Robot 1", "Robot 2", "Robot 3"]
+    assert info['enemies'][0]['position'] == last_known
+    assert 'sp' not in info['enemies'][0]
+
+    robots[0].scan(1)
+    info = controller.build_game_info(robots[0])
+    assert info['enemies'][0]['position'] == robots[1].position
+    assert info['enemies'][0]['sp'] == robots[1].sp
@@ -0,0 +1,100 @@
+import sys
+
+sys.path.append('./pcrb')
+
+import pickle
+import random
+
+import pytest
+
+from arena import load_robot_pool
+from controller import GameController
+from policy_table import PolicyTable
+from policy_table import compile_policy
+from robot import Robot
+from robot_state import HP
+
+
+def play(logic_a, logic_b, seed, **options):
+    random.seed(seed)
+    controller = GameController(verbose=False, log_path=None, game_state_path=None, **options)
+    controller.set_robots(Robot("Robot A", 1, 3, logic_a, controller), Robot("Robot B", 7, 3, logic_b, controller))
+    return controller.game_loop()[1]
+
+
+@pytest.mark.parametrize("name", ["robot_07_basic_bot", "robot_08_defender_bot"])
+def test_compiled_bot_plays_the_same_matches(name):
+    pool = load_robot_pool()
+    table = compile_policy(pool[name])
+    assert table.features == ("x", "y", "sp", "enemy_x", "enemy_y")
+    for opponent in ("robot_07_basic_bot", "robot_09_trapster", "robot_03_random_walker"):
+        assert play(table, pool[opponent], 0) == play(pool[name], pool[opponent], 0)
+        assert play(pool[opponent], table, 1) == play(pool[opponent], pool[name], 1)
+    # 表にない盤面では元のロジックに任せる
+    assert play(table, pool["robot_01_rest_only"], 0, x_max=12) == play(pool[name], pool["robot_01_rest_only"], 0, x_max=12)
+    assert pickle.loads(pickle.dumps(table)).codes == table.codes
+
+
+def test_rejects_memos_randomness_and_unknown_inputs():
+    pool = load_robot_pool()
+    for name in ("robot_03_random_walker", "robot_10_energy_thief"):
+        with pytest.raises(ValueError):
+            compile_policy(pool[name])
+
+    def reads_memos(robot, game_info, memos):
+        return "attack" if memos.get("seen") else "rest"
+
+    def reads_name(robot, game_info, memos):
+        return "attack" if robot.name == "Robot A" else "rest"
+
+    def grows_with_sp(robot, game_info, memos):
+        return "attack" if robot.sp > 80 else "rest"
+
+    for logic in (reads_memos, reads_name, grows_with_sp):
+        with pytest.raises(ValueError):
+            compile_policy(logic)
+
+
+def test_features_read_only_on_some_branches_are_found():
+    def logic(robot, game_info, memos):
+        if robot.sp < 10:
+            return "rest"
+        if robot.defend.is_active and game_info["turn"] % 2:
+            return "parry"
+        return "defend" if robot.sp >= robot.defend.cost else "rest"
+
+    table = compile_policy(logic, max_turn=9, sp_limit=20)
+    assert isinstance(table, PolicyTable)
+    assert table.features == ("turn", "sp", "defend")
+    assert table.size == 10 * 21 * 2
+
+
+def hp_aware_logic(robot, game_info, memos):
+    x, y = robot.position
+    enemy_x, enemy_y = game_info["enemy_position"]
+    if abs(enemy_x - x) + abs(enemy_y - y) == 1:
+        return "attack" if game_info["enemy_hp"] > 20 else "defend"
+    if x != enemy_x:
+        return "right" if x < enemy_x else "left"
+    return "down" if y < enemy_y else "up"
+
+
+def test_fractional_hp_after_defended_hit():
+    pool = load_robot_pool()
+    table = compile_policy(hp_aware_logic, max_turn=30)
+    assert "enemy_hp" in table.features
+    for opponent in ("robot_04_defensive", "robot_08_defender_bot"):
+        game_state = play(table, pool[opponent], 0, max_turn=30)
+        assert game_state == play(hp_aware_logic, pool[opponent], 0, max_turn=30)
+    # 防御中に攻撃を受けると HP が float になる
+    hps = [robot["hp"] for state in game_state[1:] for robot in state["robots"]]
+    assert any(isinstance(hp, float) for hp in hps)
+
+    # 表にない半端な HP では元のロジックに任せる
+    controller = GameController(max_turn=30, verbose=False, log_path=None, game_state_path=None)
+    robot, enemy = Robot("Robot A", 1, 3, table, controller), Robot("Robot B", 2, 3, hp_aware_logic, controller)
+    controller.set_robots(robot, enemy)
+    for hp in (90.0, 20.0, 20.5, 19.5):
+        enemy._state[HP] = hp
+        game_info = controller.build_game_info(robot)
+        assert table(robot, game_info, {}) == hp_aware_logic(robot, game_info, {})
@@ -0,0 +1,81 @@
+import sys
+
+sys.path.append('./pcrb')
+
+import pytest
+
+from rating import DRAW
+from rating import LOSS
+from rating import WIN
+from rating import EloModel
+from rating import RatingService
+from rating import TrueSkillModel
+from rating import result_from_winner
+
+
+def test_elo_update_is_zero_sum():
+    service = RatingService(EloModel())
+    service.record("alpha", "beta", WIN)
+
+    assert service.rating("alpha").mu == pytest.approx(1516)
+    assert service.rating("beta").mu == pytest.approx(1484)
+    assert service.rating("alpha").games == 1
+
+
+def test_trueskill_update():
+    service = RatingService(TrueSkillModel())
+    service.record("alpha", "beta", WIN)
+
+    alpha, beta = service.rating("alpha"), service.rating("beta")
+    assert alpha.mu > 25 > beta.mu
+    assert alpha.sigma < 25 / 3
+    assert beta.sigma < 25 / 3
+
+    # 強い側との引き分けは弱い側の mu を引き上げる
+    before_alpha, before_beta = alpha.mu, beta.mu
+    service.record("alpha", "beta", DRAW)
+    assert alpha.mu < before_alpha
+    assert beta.mu > before_beta
+    assert service.results_count == 2
+
+    with pytest.raises(ValueError):
+        service.record("alpha", "alpha", WIN)
+    with pytest.raises(ValueError):
+        service.record("alpha", "beta", 2)
+
+
+def test_leaderboard_from_stream():
+    results = []
+    for _ in range(20):
+        results.append(result_from_winner("strong", "medium", "strong"))
+        results.append(result_from_winner("medium", "weak", "medium"))
+        results.append(result_from_winner("weak", "strong", "strong"))
+
+    service = RatingService(TrueSkillModel())
+    service.consume(results)
+
+    assert [name for _, name, _ in service.leaderboard()] == ["strong", "medium", "weak"]
+    assert service.rank_of("weak") == 3
+    assert service.leaderboard(top=1)[0][1] == "strong"
+    assert service.win_probability("strong", "weak") > 0.9
+
+    assert result_from_winner("a", "b", None) == ("a", "b", DRAW)
+    assert result_from_winner("a", "b", "b") == ("a", "b", LOSS)
+
+
+def test_checkpoint_roundtrip(tmp_path):
+    path = tmp_path / "ratings.json"
+    service = RatingService(TrueSkillModel(), checkpoint_path=str(path), checkpoint_every=2)
+    service.record("alpha", "beta", WIN)
+    assert not path.exists()
+    service.record("beta", "gamma", WIN)
+    assert path.exists()
+
+    restored = RatingService.load_checkpoint(str(path))
+    assert restored.results_count == 2
+    assert restored.rating("alpha").mu == pytest.approx(service.rating("alpha").mu)
+    assert [name for _, name, _ in restored.leaderboard()] == [name for _, name, _ in service.leaderboard()]
+
+    # 復元後も続きから更新できる
+    restored.record("gamma", "alpha", WIN)
+    assert restored.results_count == 3
@@ -0,0 +1,54 @@
+import sys
+
+sys.path.append('./pcrb')
+
+from arena import load_robot_pool
+from controller import GameController
+from replay_store import ReplayStore
+from replay_store import summarize
+from robot import Robot
+
+
+def play(logic_a, logic_b, max_turn=100):
+    controller = GameController(max_turn=max_turn, verbose=False, log_path=None, game_state_path=None)
+    controller.set_robots(Robot("Robot A", 1, 3, logic_a, controller), Robot("Robot B", 7, 3, logic_b, controller))
+    _, game_state = controller.game_loop()
+    return game_state
+
+
+def test_summary_matches_engine_result():
+    pool = load_robot_pool()
+    game_state = play(pool["robot_07_basic_bot"], pool["robot_01_rest_only"])
+    summary = summarize(game_state, bots=("basic", "rest"))
+    final = game_state[-1]["robots"]
+    assert summary["bots"][summary["winner"]] == "basic"
+    assert summary["margin"] == final[0]["hp"] - final[1]["hp"]
+    assert summary["length"] == len(game_state) - 2
+    assert [0, ["rest", "rest"]] not in summary["ngrams"]
+    assert [1, ["rest", "rest"]] in summary["ngrams"]
+
+
+def test_queries_use_index_and_survive_reopen(tmp_path):
+    pool = load_robot_pool()
+    store = ReplayStore(tmp_path)
+    trapster = store.add(play(pool["robot_09_trapster"], pool["robot_07_basic_bot"]),
+                         bots=("robot_09_trapster", "robot_07_basic_bot"))
+    short = store.add(play(pool["robot_07_basic_bot"], pool["robot_01_rest_only"], max_turn=15),
+                      bots=("robot_07_basic_bot", "robot_01_rest_only"))
+
+    assert store.query(bot="robot_07_basic_bot") == [trapster, short]
+    assert store.query(max_length=15) == [short]
+    assert store.query(loser="robot_01_rest_only", max_length=15) == [short]
+    assert store.query(ngram=("rest", "rest"), ngram_bot="robot_01_rest_only") == [short]
+    assert store.query(ngram=("rest", "rest"), ngram_bot="robot_07_basic_bot") == []
+
+    reopened = ReplayStore(tmp_path)
+    assert len(reopened) == 2
+    assert reopened.query(max_length=15) == [short]
+    assert reopened.load(short) == store.load(short)
+    # 追加は開き直した後も索引に反映される
+    third = reopened.add(play(pool["robot_01_rest_only"], pool["robot_01_rest_only"], max_turn=10))
+    assert reopened.query(max_length=15) == [short, third]
+    assert reopened.query(bot="Robot A") == [third]
+    assert reopened.query(max_margin=0) == [third]
+    assert reopened.query(winner="robot_09_trapster", min_margin=45) == [trapster]
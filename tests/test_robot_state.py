@@ -0,0 +1,70 @@
+import sys
+
+sys.path.append('./pcrb')
+
+import pytest
+
+from robot import Robot
+from controller import GameController
+
+
+def test_robot_has_no_instance_dict():
+    controller = GameController(max_turn=100, x_max=9, y_max=7)
+    robot = Robot("Robot A", 1, 3, None, controller)
+
+    assert not hasattr(robot, "__dict__")
+    for action in [robot.attack, robot.move, robot.defend, robot.parry, robot.trap, robot.camouflage, robot.scan]:
+        assert not hasattr(action, "__dict__")
+
+    with pytest.raises(AttributeError):
+        robot.unknown_attribute = 1
+
+
+def test_public_attributes_are_backed_by_state():
+    controller = GameController(max_turn=100, x_max=9, y_max=7)
+    robot = Robot("Robot A", 1, 3, None, controller)
+    target = Robot("Robot B", 2, 3, None, controller)
+    controller.set_robots(robot, target)
+
+    assert robot.position == (1, 3)
+    assert robot.hp == 100
+    assert robot.sp == 50
+
+    robot.camouflage(1)
+    assert robot.camouflage.is_active
+    assert robot.camouflage.remaining_turns == 3
+    assert robot.camouflage.last_known_position == (1, 3)
+
+    robot.scan(1)
+    assert robot.scan.is_active
+    assert robot.sp == 20
+
+    target.parry(1)
+    robot.attack(target, 1)
+    assert robot.stun_counter == 1
+    assert target.parry.cooldown_counter == 2
+
+
+def test_reset_restores_initial_state():
+    controller = GameController(max_turn=100, x_max=9, y_max=7)
+    robot = Robot("Robot A", 1, 3, None, controller)
+    target = Robot("Robot B", 2, 3, None, controller)
+    controller.set_robots(robot, target)
+
+    robot.defend(1)
+    robot.parry(1)
+    robot.move("down", 1)
+    target.attack(robot, 1)
+
+    robot.reset(1, 3)
+
+    assert robot.position == (1, 3)
+    assert robot.hp == 100
+    assert robot.sp == 50
+    assert robot.stun_counter == 0
+    assert not robot.defend.is_active
+    assert not robot.parry.is_active
+    assert robot.parry.cooldown_counter == 0
+    assert not robot.camouflage.is_active
+    assert not robot.scan.is_active
+    assert robot.trap.traps == []
@@ -0,0 +1,85 @@
+import sys
+
+sys.path.append('./pcrb')
+
+import random
+
+import pytest
+
+from arena import load_robot_pool
+from controller import GameController
+from robot import Robot
+
+
+def create_controller(logic_a, logic_b, max_turn=100):
+    controller = GameController(max_turn=max_turn, verbose=False, log_path=None, game_state_path=None)
+    position1 = controller.robot1_initial_position
+    position2 = controller.robot2_initial_position
+    robot1 = Robot("Robot A", position1['x'], position1['y'], logic_a, controller)
+    robot2 = Robot("Robot B", position2['x'], position2['y'], logic_b, controller)
+    controller.set_robots(robot1, robot2)
+    return controller
+
+
+def play_turns(controller, turns):
+    for _ in range(turns):
+        if controller.is_game_over():
+            break
+        robot = controller.next_robot()
+        action, _ = controller.run_logic(robot)
+        controller.save_game_state(robot.name, action)
+        controller.turn += 1
+
+
+@pytest.mark.parametrize("name_a,name_b", [
+    ("robot_03_random_walker", "robot_11_phantom_Jumper"),
+    ("robot_09_trapster", "robot_12_shadow_strategist"),
+    ("robot_13_strategic_scanner", "robot_06_tactician"),
+])
+def test_restore_replays_identically(name_a, name_b):
+    pool = load_robot_pool()
+    random.seed(5)
+    controller = create_controller(pool[name_a], pool[name_b])
+    play_turns(controller, 20)
+
+    snapshot = controller.snapshot()
+    hash(snapshot)  # 不変値なのでハッシュできる
+    board_before = bytes(controller.board.robot_grid), bytes(controller.board.trap_grid)
+
+    winner, game_state = controller.game_loop()
+    first_run = (winner.name, list(game_state))
+
+    controller.restore(snapshot)
+    assert controller.snapshot() == snapshot
+    assert (bytes(controller.board.robot_grid), bytes(controller.board.trap_grid)) == board_before
+
+    winner, game_state = controller.game_loop()
+    assert (winner.name, game_state) == first_run
+
+
+def test_restore_covers_action_state_and_memos():
+    controller = create_controller(None, None)
+    robot1, robot2 = controller.robots
+    snapshot = controller.snapshot()
+
+    robot1.trap("trap_right", 1)
+    robot1.camouflage(1)
+    robot1.parry(1)
+    robot2.scan(1)
+    robot2.move("up", 1)
+    robot2.stun(2)
+    controller.memos1["plan"] = "attack"
+    controller.turn = 10
+
+    controller.restore(snapshot)
+    assert robot1.trap.traps == []
+    assert not robot1.camouflage.is_active
+    assert not robot1.parry.is_active and robot1.parry.cooldown_counter == 0
+    assert not robot2.scan.is_active
+    assert robot2.stun_counter == 0
+    assert robot2.position == (7, 3)
+    assert controller.memos1 == {}
+    assert controller.turn == snapshot.turn
+    assert controller.is_position_occupied(7, 3)
+    assert not controller.is_position_occupied(7, 2)
+    assert not controller.is_trap_at_position(2, 3)
@@ -0,0 +1,62 @@
+import sys
+
+sys.path.append('./pcrb')
+
+import random
+
+from arena import load_robot_pool
+from controller import GameController
+from robot import Robot
+from timeline import MatchTimeline
+
+
+def create_controller(logic_a, logic_b):
+    random.seed(0)
+    controller = GameController(verbose=False, log_path=None, game_state_path=None)
+    controller.set_robots(Robot("Robot A", 1, 3, logic_a, controller), Robot("Robot B", 7, 3, logic_b, controller))
+    return controller
+
+
+def test_stepping_back_and_forth_matches_a_straight_run():
+    pool = load_robot_pool()
+    logics = pool["robot_11_phantom_Jumper"], pool["robot_09_trapster"]
+    _, expected = create_controller(*logics).game_loop()
+
+    controller = create_controller(*logics)
+    timeline = MatchTimeline(controller)
+    assert timeline.step(10) == 10
+    after_ten = list(controller.game_state)
+    timeline.back(4)
+    assert controller.turn == 7
+    assert controller.game_state == after_ten[:-4]
+
+    calls = []
+    counted = [lambda *args, logic=logic: calls.append(1) or logic(*args) for logic in logics]
+    timeline.set_logics(counted, key="same code")
+    timeline.set_logics(counted, key="same code")
+    timeline.step(4)
+    assert controller.game_state == after_ten
+    timeline.run_to_end()
+    assert controller.game_state == expected
+    assert controller.is_game_over()
+    assert timeline.step() == 0
+
+    # 同じロジックで戻って進み直すときはチェックポイントを使い回す
+    calls.clear()
+    timeline.seek(3)
+    timeline.step(5)
+    assert calls == []
+    assert controller.game_state == expected[:len(controller.game_state)]
+
+
+def test_changing_logic_discards_later_checkpoints():
+    rest = lambda robot, game_info, memos: "rest"  # noqa: E731
+    controller = create_controller(rest, rest)
+    timeline = MatchTimeline(controller)
+    timeline.step(6)
+    timeline.seek(2)
+    timeline.set_logics([lambda robot, game_info, memos: "right", rest], key="edited")
+    assert timeline.length == 2
+    timeline.step()
+    assert controller.game_state[-1]["action"] == {"robot_name": "Robot A", "action": "right"}
+    assert controller.robot1.position == (2, 3)
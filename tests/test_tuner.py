@@ -0,0 +1,52 @@
+import sys
+
+sys.path.append('./pcrb')
+
+import random
+
+from tuner import EvolutionStrategy
+from tuner import Tuner
+from tuner import load_tunable
+
+OPPONENTS = ["robot_02_constant_right", "robot_04_defensive", "robot_07_basic_bot"]
+
+
+def test_load_tunable_reads_defaults_from_factory():
+    space, factory, defaults = load_tunable("robot_06_tactician")
+    assert set(space) == set(defaults)
+    assert defaults["rest_sp"] == 20
+    assert callable(factory(**defaults))
+
+
+def test_evolution_strategy_moves_toward_optimum():
+    space = {"a": (0.0, 10.0), "b": (0, 100)}
+    strategy = EvolutionStrategy(space, {"a": 1.0, "b": 90}, population=10, rng=random.Random(0))
+    for _ in range(30):
+        points = strategy.ask()
+        scores = [-(params["a"] - 7) ** 2 - ((params["b"] - 30) / 10) ** 2
+                  for params in map(strategy.decode, points)]
+        strategy.tell(points, scores)
+    best = strategy.decode(strategy.mean)
+    assert abs(best["a"] - 7) < 1.0
+    assert abs(best["b"] - 30) < 10
+    assert isinstance(best["b"], int)
+
+
+def test_tuner_improves_on_defaults_and_records_history():
+    tuner = Tuner("robot_06_tactician", opponents=OPPONENTS, seeds=range(2), population=6, max_generations=4)
+    default_score = tuner.evaluate([tuner.default_params])[0]
+    result = tuner.run()
+    assert result.best_score >= default_score
+    assert 1 <= len(result.history) <= 4
+    assert result.history[-1]["best_score"] == result.best_score
+    assert set(result.best_params) == set(tuner.space)
+    # 既定値の評価は 2 回目なのでキャッシュから返る
+    assert result.cache_hits >= 1
+
+
+def test_workers_give_same_result():
+    options = {"opponents": OPPONENTS, "seeds": range(2), "population": 4, "max_generations": 2}
+    local = Tuner("robot_13_strategic_scanner", **options).run()
+    parallel = Tuner("robot_13_strategic_scanner", workers=2, **options).run()
+    assert parallel.best_params == local.best_params
+    assert parallel.best_score == local.best_score
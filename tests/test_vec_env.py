@@ -0,0 +1,83 @@
+import random
+import sys
+
+sys.path.append('./pcrb')
+
+import numpy as np
+
+from vec_env import ACTION_INDEX
+from vec_env import OBSERVATION_SIZE
+from vec_env import VecEnv
+
+OPPONENTS = ["robot_07_basic_bot", "robot_02_constant_right"]
+
+
+def run(env, steps, action="attack"):
+    actions = np.full(env.num_envs, ACTION_INDEX[action])
+    history = []
+    for _ in range(steps):
+        observations, rewards, dones, infos = env.step(actions)
+        history.append((observations, rewards, dones, infos))
+    return history
+
+
+def test_reset_returns_batched_float_observations():
+    env = VecEnv(8, opponents=OPPONENTS)
+    observations = env.reset(seeds=range(8))
+    assert observations.shape == (8, OBSERVATION_SIZE)
+    assert observations.dtype == np.float32
+    # 最初の手番なので HP は満タン
+    assert np.all(observations[:, 3] == 1.0)
+
+
+def test_same_seeds_give_same_trajectory():
+    results = []
+    for _ in range(2):
+        env = VecEnv(4, opponents=OPPONENTS)
+        env.reset(seeds=[1, 2, 3, 4])
+        results.append(run(env, 30, "right"))
+    for (obs_a, rewards_a, dones_a, _), (obs_b, rewards_b, dones_b, _) in zip(*results):
+        assert np.array_equal(obs_a, obs_b)
+        assert np.array_equal(rewards_a, rewards_b)
+        assert np.array_equal(dones_a, dones_b)
+
+
+def test_finished_matches_reset_automatically():
+    env = VecEnv(2, opponents=OPPONENTS, max_turn=10)
+    env.reset(seeds=[0, 1])
+    finished = [(dones, infos) for _, _, dones, infos in run(env, 10) if dones.any()]
+    assert finished
+    dones, infos = finished[0]
+    for done, info in zip(dones, infos):
+        if done:
+            assert info["final_observation"].shape == (OBSERVATION_SIZE,)
+            assert "won" in info
+
+
+def test_workers_match_in_process_results():
+    local = VecEnv(4, opponents=OPPONENTS)
+    local.reset(seeds=[5, 6, 7, 8])
+    with VecEnv(4, opponents=OPPONENTS, workers=2) as remote:
+        observations = remote.reset(seeds=[5, 6, 7, 8])
+        assert observations.shape == (4, OBSERVATION_SIZE)
+        # 同じ乱数を使わない行動なら、プロセスを分けても結果は同じ
+        for (obs_a, rewards_a, _, _), (obs_b, rewards_b, _, _) in zip(run(local, 5, "right"), run(remote, 5, "right")):
+            assert np.array_equal(obs_a[:2], obs_b[:2])
+            assert np.array_equal(rewards_a[:2], rewards_b[:2])
+
+
+def test_reset_and_step_leave_caller_random_state_alone():
+    results = []
+    for interleave in (False, True):
+        env = VecEnv(4, opponents=["robot_11_phantom_Jumper", "robot_03_random_walker"])
+        random.seed(123)
+        env.reset(seeds=[1, 2, 3, 4])
+        assert random.random() == random.Random(123).random()
+        history = []
+        for _ in range(30):
+            if interleave:
+                random.random()  # 呼び出し側が乱数を使っても試合は変わらない
+            history.append(env.step(np.full(4, ACTION_INDEX["right"]))[0])
+        results.append(history)
+    for obs_a, obs_b in zip(*results):
+        assert np.array_equal(obs_a, obs_b)
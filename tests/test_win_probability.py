@@ -0,0 +1,85 @@
+import random
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append('./pcrb')
+
+from arena import load_robot_pool
+from controller import GameController
+from robot import Robot
+from win_probability import controller_from_replay
+from win_probability import estimate_win_probability
+from win_probability import replay_positions
+from win_probability import wilson_interval
+from win_probability import win_probability_curve
+
+
+def play(logic_a, logic_b, seed=0):
+    random.seed(seed)
+    controller = GameController(verbose=False, log_path=None, game_state_path=None)
+    controller.set_robots(Robot("Robot A", 1, 3, logic_a, controller), Robot("Robot B", 7, 3, logic_b, controller))
+    snapshots = [controller.snapshot(include_rng=False)]
+    while not controller.is_game_over():
+        controller.play_turn()
+        snapshots.append(controller.snapshot(include_rng=False))
+    return controller.game_state, snapshots
+
+
+def test_replay_positions_restore_engine_state():
+    pool = load_robot_pool()
+    game_state, snapshots = play(pool["robot_11_phantom_Jumper"], pool["robot_09_trapster"])
+    replayed = [controller.snapshot(include_rng=False) for _, controller in replay_positions(game_state)]
+    assert len(replayed) == len(snapshots)
+    for snapshot, expected in zip(replayed, snapshots):
+        assert (snapshot.turn, snapshot.robots, snapshot.traps) == (expected.turn, expected.robots, expected.traps)
+
+
+def test_deterministic_position_needs_one_rollout():
+    pool = load_robot_pool()
+    game_state, _ = play(pool["robot_07_basic_bot"], pool["robot_01_rest_only"])
+    controller = controller_from_replay(game_state, 10)
+    result = estimate_win_probability(controller, ("robot_07_basic_bot", "robot_01_rest_only"), rollouts=500)
+    assert result.deterministic
+    assert result.rollouts == 1
+    assert (result.win, result.draw, result.loss) == (1.0, 0.0, 0.0)
+
+
+def test_random_position_has_intervals():
+    pool = load_robot_pool()
+    game_state, _ = play(pool["robot_03_random_walker"], pool["robot_11_phantom_Jumper"])
+    controller = controller_from_replay(game_state, 4)
+    sources = ("robot_03_random_walker", "robot_11_phantom_Jumper")
+    result = estimate_win_probability(controller, sources, rollouts=200, batch_size=64)
+    assert not result.deterministic
+    assert result.rollouts == 200
+    assert abs(result.win + result.draw + result.loss - 1) < 1e-9
+    for outcome in ("win", "draw", "loss"):
+        low, high = result.intervals[outcome]
+        assert low <= getattr(result, outcome) <= high
+    # シードが同じなら同じ見積もりになる
+    again = estimate_win_probability(controller, sources, rollouts=200, batch_size=64)
+    assert (again.win, again.draw, again.loss) == (result.win, result.draw, result.loss)
+    assert wilson_interval(0, 0) == (0.0, 1.0)
+    assert wilson_interval(50, 100)[0] < 0.5 < wilson_interval(50, 100)[1]
+
+
+def test_curve_reuses_one_pool(monkeypatch):
+    import win_probability
+
+    pools = []
+
+    class Pool(ThreadPoolExecutor):
+        def __init__(self, max_workers):
+            super().__init__(max_workers)
+            pools.append(self)
+
+    monkeypatch.setattr(win_probability, "ProcessPoolExecutor", Pool)
+    pool = load_robot_pool()
+    game_state, _ = play(pool["robot_03_random_walker"], pool["robot_11_phantom_Jumper"])
+    sources = ("robot_03_random_walker", "robot_11_phantom_Jumper")
+    # スレッドは random を共有するので 1 つだけ
+    curve = win_probability_curve(game_state, sources, rollouts=50, every=5, workers=1, batch_size=16)
+    assert len(pools) == 1
+    expected = win_probability_curve(game_state, sources, rollouts=50, every=5, batch_size=16)
+    assert [(turn, result.win, result.loss) for turn, result in curve] == \
+        [(turn, result.win, result.loss) for turn, result in expected]
@@ -0,0 +1,78 @@
+import sys
+
+sys.path.append('./pcrb')
+
+import random
+
+from arena import load_robot_pool
+from controller import GameController
+from robot import Robot
+from zobrist import TranspositionTable
+from zobrist import ZobristHasher
+
+
+def create_controller(logic_a=None, logic_b=None):
+    controller = GameController(max_turn=100, verbose=False, log_path=None, game_state_path=None)
+    robot1 = Robot("Robot A", 1, 3, logic_a, controller)
+    robot2 = Robot("Robot B", 7, 3, logic_b, controller)
+    controller.set_robots(robot1, robot2)
+    controller.enable_hashing()
+    return controller
+
+
+def full_hash(controller):
+    """状態をすべて数え直したハッシュ値"""
+    hasher = ZobristHasher()
+    for robot in controller.robots:
+        hasher.toggle_state(robot._board_id, list(robot._state))
+        for position in robot.trap.traps:
+            hasher.toggle_trap(robot._board_id, position)
+    return hasher.hash(controller.turn)
+
+
+def test_incremental_hash_matches_full_recount():
+    pool = load_robot_pool()
+    random.seed(2)
+    controller = create_controller(pool["robot_09_trapster"], pool["robot_11_phantom_Jumper"])
+    seen = set()
+    while not controller.is_game_over():
+        robot = controller.next_robot()
+        controller.run_logic(robot)
+        controller.turn += 1
+        assert controller.state_hash() == full_hash(controller)
+        seen.add(controller.state_hash())
+    assert len(seen) > 10
+
+
+def test_hash_identifies_transpositions():
+    controller = create_controller()
+    robot1, robot2 = controller.robots
+    start = controller.state_hash()
+
+    robot1.move("up", 1)
+    robot1.move("down", 1)
+    robot1.recovery_sp(10)  # 移動 2 回分の SP を戻す
+    assert controller.state_hash() == start
+
+    robot2.trap("trap_left", 1)
+    with_trap = controller.state_hash()
+    assert with_trap != start
+
+    snapshot = controller.snapshot()
+    robot2.camouflage(2)
+    controller.turn += 1
+    assert controller.state_hash() not in (start, with_trap)
+    controller.restore(snapshot)
+    assert controller.state_hash() == with_trap
+
+
+def test_transposition_table_is_bounded():
+    table = TranspositionTable(capacity=2)
+    table.put(1, "a")
+    table.put(2, "b")
+    assert table.get(1) == "a"  # 1 が最近使われた側になる
+    table.put(3, "c")
+    assert 2 not in table
+    assert len(table) == 2
+    assert table.get(2) is None
+    assert (table.hits, table.misses) == (1, 1)